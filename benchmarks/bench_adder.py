@@ -0,0 +1,58 @@
+import sys
+import os
+import time
+
+root = os.path.normpath(os.path.join(__file__, "./../.."))
+sys.path.append(root)  # allows us to fetch files from the project root
+
+from modules.bool_circ import *
+
+
+def legacy_adder(n: int) -> BoolCirc:
+    """The previous recursive construction, merging two copies of adder(n - 1)"""
+    if n == 0:
+        return BoolCirc.adder_0().copy
+    c1 = legacy_adder(n - 1)
+    c2 = legacy_adder(n - 1)
+
+    carry_out = None
+    for node_id in c1.get_output_ids:
+        out_node = c1[node_id]
+        if c1[out_node.get_parent_ids[0]].get_label == "|":
+            carry_out = out_node
+
+    carry_in = None
+    for node_id in c2.get_input_ids:
+        in_node = c2[node_id]
+        cp_node = c2[in_node.get_children_ids[0]]
+        for child_id in cp_node.get_children_ids:
+            if c2[child_id].get_children_ids[0] in c2.outputs:
+                carry_in = in_node
+
+    c2.shift_indices(c1.new_id - c2.min_id)
+    for node in c2.get_nodes:
+        c1.nodes[node.id] = node
+    c1.add_edge(carry_out.get_parent_ids[0], carry_in.get_children_ids[0])
+    c1.remove_node_by_id(carry_out.get_id, carry_in.get_id)
+    c1.inputs += c2.inputs
+    c1.inputs.remove(carry_in.get_id)
+    c1.outputs += c2.outputs
+    return c1
+
+
+def timed(function, *args) -> float:
+    start = time.perf_counter()
+    function(*args)
+    return time.perf_counter() - start
+
+
+if __name__ == "__main__":
+    assert str(legacy_adder(4)) == str(BoolCirc.adder(4))
+    print(f"legacy adder(8):            {timed(legacy_adder, 8):.2f} s")
+    print(f"adder(8):                   {timed(BoolCirc.adder, 8):.2f} s")
+    for adder in [BoolCirc.adder, BoolCirc.carry_lookahead_adder, BoolCirc.kogge_stone_adder]:
+        circ = adder(10)
+        print(
+            f"{adder.__name__ + '(10):':27} {timed(adder, 10):.2f} s,"
+            f" {len(circ.nodes)} nodes, depth {circ.depth}"
+        )
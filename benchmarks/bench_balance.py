@@ -0,0 +1,30 @@
+import sys
+import os
+import time
+
+root = os.path.normpath(os.path.join(__file__, "./../.."))
+sys.path.append(root)  # allows us to fetch files from the project root
+
+from modules.bool_circ import *
+
+
+def chain(n: int, operator: str) -> str:
+    """Returns the formula (x0) op ((x1) op (... (x{n-1})))"""
+    formula = f"(x{n - 1})"
+    for i in range(n - 2, -1, -1):
+        formula = f"(x{i}){operator}({formula})"
+    return formula
+
+
+if __name__ == "__main__":
+    for n in [10**3, 10**4]:
+        for operator in ["&", "^"]:
+            circ = BoolCirc(parse_parenthesis(chain(n, operator)))
+            reference = circ.copy
+            start = time.perf_counter()
+            before, after = circ.balance()
+            elapsed = time.perf_counter() - start
+            print(
+                f"{operator} chain of {n} inputs: depth {before} -> {after} in {elapsed:.2f} s, "
+                f"equivalent: {circ.equivalent(reference)}"
+            )
@@ -0,0 +1,42 @@
+import sys
+import os
+import tempfile
+import time
+
+root = os.path.normpath(os.path.join(__file__, "./../.."))
+sys.path.append(root)  # allows us to fetch files from the project root
+
+from modules.bool_circ import BoolCirc
+from modules.compact_digraph import *
+
+
+def timed(function, *args) -> float:
+    start = time.perf_counter()
+    function(*args)
+    return time.perf_counter() - start
+
+
+def load_and_materialize(path: str) -> OpenDigraph:
+    graph = CompactDigraph.load(path)
+    digraph = graph.to_open_digraph()
+    graph.close()
+    return digraph
+
+
+if __name__ == "__main__":
+    adder = BoolCirc.adder(10)
+    directory = tempfile.mkdtemp()
+    dot_path = os.path.join(directory, "adder.dot")
+    binary_path = os.path.join(directory, "adder.odg")
+    adder.save_sa_dot_file(dot_path)
+    CompactDigraph.from_open_digraph(adder).save(binary_path)
+
+    print(f"1024 bits adder, {len(adder.nodes)} nodes")
+    print(f"dot file:    {os.path.getsize(dot_path) / 1e6:.2f} MB")
+    print(f"binary file: {os.path.getsize(binary_path) / 1e6:.2f} MB")
+    print(f"from_dot_file:              {timed(OpenDigraph.from_dot_file, dot_path):.3f} s")
+    print(f"load (memory-mapped):       {timed(CompactDigraph.load, binary_path):.3f} s")
+    print(f"load and materialize:       {timed(load_and_materialize, binary_path):.3f} s")
+    assert str(load_and_materialize(binary_path)) == str(adder)
+    os.remove(dot_path)
+    os.remove(binary_path)
@@ -0,0 +1,45 @@
+import sys
+import os
+import time
+
+root = os.path.normpath(os.path.join(__file__, "./../.."))
+sys.path.append(root)  # allows us to fetch files from the project root
+
+from modules.bool_circ import *
+
+
+def timed(function, *args) -> float:
+    """Returns the time of a single call to function"""
+    start = time.perf_counter()
+    function(*args)
+    return time.perf_counter() - start
+
+
+def edge_by_edge(matrix: Matrix) -> OpenDigraph:
+    """Builds the graph of matrix with add_node and add_edge, like graph_from_adjacency_matrix used to"""
+    digraph = OpenDigraph.empty()
+    for i in range(len(matrix)):
+        digraph.add_node()
+    for i, row in enumerate(matrix):
+        for j, multi in enumerate(row):
+            for k in range(multi):
+                digraph.add_edge(i, j)
+    return digraph
+
+
+if __name__ == "__main__":
+    matrix = random_matrix(600, 3)
+    print(f"600 x 600 matrix, add_edge:          {timed(edge_by_edge, matrix):.2f} s")
+    print(f"600 x 600 matrix, from_edges:        {timed(OpenDigraph.graph_from_adjacency_matrix, matrix):.2f} s")
+
+    bits = "".join(random.choice("01") for i in range(1 << 14))
+    print(f"construct_op on 2^14 bits:           {timed(binary_mx.construct_op, bits):.2f} s")
+
+    digraph = OpenDigraph.from_edges(range(10**5), [])
+    edges = [(i, i + 1) for i in range(10**5 - 1)] * 2
+    start = time.perf_counter()
+    for src, tgt in edges:
+        digraph.add_edge(src, tgt)
+    print(f"2 x 10^5 edges, add_edge:            {time.perf_counter() - start:.2f} s")
+    digraph = OpenDigraph.from_edges(range(10**5), [])
+    print(f"2 x 10^5 edges, add_edges_bulk:      {timed(digraph.add_edges_bulk, edges):.2f} s")
@@ -0,0 +1,41 @@
+import sys
+import os
+import time
+
+root = os.path.normpath(os.path.join(__file__, "./../.."))
+sys.path.append(root)  # allows us to fetch files from the project root
+
+from modules.open_digraph import *
+
+
+def timed(function, *args) -> float:
+    """Returns the time of a single call to function"""
+    start = time.perf_counter()
+    function(*args)
+    return time.perf_counter() - start
+
+
+if __name__ == "__main__":
+    n = 10**6
+    chain = OpenDigraph.from_edges(range(n), [(i, i + 1) for i in range(n - 1)], [0], [n - 1])
+    print(f"{n} nodes chain, connected_components: {timed(lambda: chain.connected_components):.2f} s")
+    print(f"{n} nodes chain, cached query:         {timed(lambda: chain.connected_components):.2f} s")
+
+    # The chain is built edge by edge on n isolated nodes, querying as it grows
+    forest = OpenDigraph.from_edges(range(n), [])
+    forest.components
+    start = time.perf_counter()
+    for i in range(n - 1):
+        forest.add_edge(i, i + 1)
+        if i % 1000 == 0:
+            forest.components.count
+    print(f"{n} incremental add_edge with queries: {time.perf_counter() - start:.2f} s")
+    assert forest.components.count == 1
+
+    short = OpenDigraph.from_edges(range(10**4), [(i, i + 1) for i in range(10**4 - 1)], [0])
+    try:
+        visited, component = set(), []
+        short.dfs(visited, short[0], component)
+        print(f"10^4 nodes chain, iterative dfs: {len(component)} nodes")
+    except RecursionError:
+        print("10^4 nodes chain, dfs: RecursionError")
@@ -0,0 +1,31 @@
+import sys
+import os
+import random
+import time
+
+root = os.path.normpath(os.path.join(__file__, "./../.."))
+sys.path.append(root)  # allows us to fetch files from the project root
+
+from modules.bool_circ import *
+
+
+def timed(function, *args):
+    """Returns the result of function(*args) and the time it took"""
+    start = time.perf_counter()
+    result = function(*args)
+    return result, time.perf_counter() - start
+
+
+if __name__ == "__main__":
+    random.seed(0)
+    for n in [12, 14, 16]:
+        for density in [0.5, 0.9]:
+            bits = "".join("1" if random.random() < density else "0" for i in range(2**n))
+            for form in CONSTRUCT_FORMS:
+                circ, built = timed(binary_mx.construct_op, bits, form)
+                circ = BoolCirc(circ)
+                _, evaluated = timed(circ.truth_table)
+                print(
+                    f"{n} inputs, {density:.0%} ones, {form}: {len(circ.nodes)} nodes, "
+                    f"built in {built:.2f} s, truth table in {evaluated:.2f} s"
+                )
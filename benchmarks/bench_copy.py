@@ -0,0 +1,30 @@
+import sys
+import os
+import time
+from copy import deepcopy
+
+root = os.path.normpath(os.path.join(__file__, "./../.."))
+sys.path.append(root)  # allows us to fetch files from the project root
+
+from modules.bool_circ import *
+
+
+def timed(function, *args, repeat: int = 5) -> float:
+    """Returns the best time of repeat calls to function"""
+    best = None
+    for i in range(repeat):
+        start = time.perf_counter()
+        function(*args)
+        elapsed = time.perf_counter() - start
+        best = elapsed if best is None else min(best, elapsed)
+    return best
+
+
+if __name__ == "__main__":
+    circ = BoolCirc.adder(10)
+    assert str(circ.copy) == str(deepcopy(circ))
+    print(f"1024 bits adder, {len(circ.nodes)} nodes")
+    print(f"deepcopy:      {timed(deepcopy, circ) * 1000:.1f} ms")
+    print(f"copy:          {timed(lambda: circ.copy) * 1000:.1f} ms")
+    print(f"copy_on_write: {timed(lambda: circ.copy_on_write) * 1000:.3f} ms")
+    print(f"parallel:      {timed(lambda: circ.parallel(BoolCirc.adder_0())) * 1000:.1f} ms")
@@ -0,0 +1,67 @@
+import sys
+import os
+import tempfile
+import time
+
+root = os.path.normpath(os.path.join(__file__, "./../.."))
+sys.path.append(root)  # allows us to fetch files from the project root
+
+from modules.open_digraph import *
+
+
+def legacy_from_dot_file(path: str) -> OpenDigraph:
+    """The previous parser, reading the file twice with str.find"""
+    graph = OpenDigraph.empty()
+    with open(path, "r") as file:
+        lines = file.readlines()
+
+        for line in lines[1:]:
+            if "label" in line:
+                identity = int(line[line.find("v") + 1 : line.find("[") - 1])
+                label = line[line.find("=") + 2 : line.find("]") - 1]
+                node = Node(identity, label, {}, {})
+                graph.nodes[node.id] = node
+
+            if "color=blue" in line:
+                graph.add_input_id(int(line[line.find("v") + 1 : line.find("[") - 1]))
+
+            if "color=red" in line:
+                graph.add_output_id(int(line[line.find("v") + 1 : line.find("[") - 1]))
+
+        for line in lines[1:]:
+            if "->" in line:
+                src = int(line[line.find("v") + 1 : line.find("->") - 1])
+                tgt = int(line[line.find("->") + 4 : line.find(";")])
+                graph.add_edge(src, tgt)
+
+    return graph
+
+
+def write_random_file(path: str, n: int, out_degree: int) -> None:
+    """Writes a dot file of n nodes with out_degree edges each"""
+    with open(path, "w") as file:
+        file.write("digraph G {\n")
+        for i in range(n):
+            file.write(f'    v{i} [label="&"];\n')
+            for k in range(out_degree):
+                file.write(f"    v{i} -> v{random.randrange(n)};\n")
+        file.write("}")
+
+
+def timed(function, *args) -> float:
+    start = time.perf_counter()
+    function(*args)
+    return time.perf_counter() - start
+
+
+if __name__ == "__main__":
+    random.seed(0)
+    encoder = os.path.join(root, "modules", "encoder.dot")
+    assert str(legacy_from_dot_file(encoder)) == str(OpenDigraph.from_dot_file(encoder))
+
+    path = os.path.join(tempfile.mkdtemp(), "random.dot")
+    write_random_file(path, 100000, 5)
+    print(f"file of 500000 edges, {os.path.getsize(path) / 1e6:.1f} MB")
+    print(f"streaming parser: {timed(OpenDigraph.from_dot_file, path):.2f} s")
+    print(f"legacy parser:    {timed(legacy_from_dot_file, path):.2f} s")
+    os.remove(path)
@@ -0,0 +1,59 @@
+import sys
+import os
+import tempfile
+import time
+
+root = os.path.normpath(os.path.join(__file__, "./../.."))
+sys.path.append(root)  # allows us to fetch files from the project root
+
+from modules.open_digraph import *
+
+
+def legacy_save_sa_dot_file(graph: OpenDigraph, path: str) -> None:
+    """The previous writer, one write per line and list lookups for the boundary"""
+    with open(path, "w") as file:
+        file.write("digraph G {\n")
+        for node_id in graph.nodes:
+            node = graph.get_node_by_id(node_id)
+            if node_id in graph.inputs:
+                file.write(f"    v{node_id} [color=blue];\n")
+            if node_id in graph.outputs:
+                file.write(f"    v{node_id} [color=red];\n")
+            file.write(f'    v{node_id} [label="{node.get_label}"];\n')
+            for child_id in node.children:
+                for multiplicity in range(node.children[child_id]):
+                    file.write(f"    v{node_id} -> v{child_id};\n")
+        file.write("}")
+
+
+def random_graph(n: int, out_degree: int, boundary: int) -> OpenDigraph:
+    """Returns a graph of n nodes with out_degree edges each, boundary of which are inputs"""
+    nodes = [Node(i, "&", {}, {}) for i in range(n)]
+    for node in nodes:
+        for k in range(out_degree):
+            child = nodes[random.randrange(n)]
+            node.add_child_id(child.id, node.children.get(child.id, 0) + 1)
+            child.add_parent_id(node.id, child.parents.get(node.id, 0) + 1)
+    return OpenDigraph(list(range(boundary)), [], nodes)
+
+
+def timed(function, *args) -> float:
+    start = time.perf_counter()
+    function(*args)
+    return time.perf_counter() - start
+
+
+if __name__ == "__main__":
+    random.seed(0)
+    graph = random_graph(100000, 5, 2000)
+    directory = tempfile.mkdtemp()
+    path = os.path.join(directory, "random.dot")
+
+    print("100000 nodes, 500000 edges, 2000 inputs")
+    print(f"buffered writer: {timed(graph.save_sa_dot_file, path):.2f} s")
+    new = open(path).read()
+    print(f"gzip writer:     {timed(graph.save_sa_dot_file, path + '.gz'):.2f} s")
+    print(f"legacy writer:   {timed(legacy_save_sa_dot_file, graph, path):.2f} s")
+    assert open(path).read() == new
+    os.remove(path)
+    os.remove(path + ".gz")
@@ -0,0 +1,36 @@
+import sys
+import os
+import time
+
+root = os.path.normpath(os.path.join(__file__, "./../.."))
+sys.path.append(root)  # allows us to fetch files from the project root
+
+from modules.open_digraph import *
+
+
+def build(n: int) -> float:
+    """Returns the time taken to build a chain of n nodes with add_node"""
+    start = time.perf_counter()
+    digraph = OpenDigraph.empty()
+    previous = digraph.add_node()
+    for i in range(n - 1):
+        previous = digraph.add_node(parents={previous: 1})
+    return time.perf_counter() - start
+
+
+def build_max(n: int) -> float:
+    """Same as build but allocating ids with max(nodes) + 1 like before"""
+    start = time.perf_counter()
+    nodes = {}
+    for i in range(n):
+        new_id = max(nodes) + 1 if nodes else 0
+        nodes[new_id] = Node(new_id, "", {}, {})
+    return time.perf_counter() - start
+
+
+if __name__ == "__main__":
+    print("nodes      counter (s)  per node (us)  max() (s)")
+    for n in [10**3, 10**4, 3 * 10**4, 10**5, 10**6]:
+        elapsed = build(n)
+        legacy = f"{build_max(n):.3f}" if n <= 3 * 10**4 else "-"
+        print(f"{n:<10} {elapsed:<12.3f} {elapsed / n * 1e6:<14.2f} {legacy}")
@@ -0,0 +1,52 @@
+import sys
+import os
+import time
+import tracemalloc
+
+root = os.path.normpath(os.path.join(__file__, "./../.."))
+sys.path.append(root)  # allows us to fetch files from the project root
+
+from modules.node import Node
+
+
+class LegacyNode:
+    """The previous Node, without __slots__ and summing the dicts for the degrees"""
+
+    def __init__(self, identity, label, parents, children):
+        self.id = identity
+        self.label = label
+        self.parents = parents
+        self.children = children
+
+    @property
+    def in_degree(self) -> int:
+        degree = 0
+        for parent_id in self.parents:
+            degree += self.parents[parent_id]
+        return degree
+
+
+def chain(cls, n: int) -> list:
+    """Returns a chain of n nodes of class cls"""
+    return [
+        cls(i, "&", {i - 1: 1} if i > 0 else {}, {i + 1: 1} if i < n - 1 else {})
+        for i in range(n)
+    ]
+
+
+def measure(cls, n: int) -> None:
+    tracemalloc.start()
+    nodes = chain(cls, n)
+    size, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    start = time.perf_counter()
+    for k in range(10):
+        total = sum(node.in_degree for node in nodes)
+    elapsed = time.perf_counter() - start
+    print(f"{cls.__name__:11} {size / 1e6:7.1f} MB, 10 in_degree sweeps in {elapsed:.2f} s")
+
+
+if __name__ == "__main__":
+    measure(LegacyNode, 10**6)
+    measure(Node, 10**6)
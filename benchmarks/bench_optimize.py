@@ -0,0 +1,63 @@
+import sys
+import os
+import random
+import time
+
+root = os.path.normpath(os.path.join(__file__, "./../.."))
+sys.path.append(root)  # allows us to fetch files from the project root
+
+from modules.bool_circ import *
+
+
+def random_circuit(gates: int, inputs: int, constants: int) -> BoolCirc:
+    """Returns a circuit of random gates over inputs and constants, with some redundancy"""
+    builder = CircBuilder()
+    signals = [builder.input() for i in range(inputs)]
+    signals += [builder.constant(random.randint(0, 1)) for i in range(constants)]
+    for i in range(gates):
+        label = random.choice(["&", "|", "^", "~", "~~"])
+        if label == "~":
+            signals.append(builder.not_(random.choice(signals)))
+        elif label == "~~":
+            signals.append(builder.not_(builder.not_(random.choice(signals))))
+        else:
+            operands = [random.choice(signals[-50:]) for k in range(random.randint(2, 4))]
+            signals.append(builder.gate(label, *operands))
+    for signal in signals[-16:]:
+        builder.output(signal)
+    return builder.build(BoolCirc)
+
+
+def copy_chain(n: int) -> BoolCirc:
+    """Returns a chain of n copy nodes each read by a NOT, the ids decreasing down the chain"""
+    nodes = {4 * n: ""}
+    edges = []
+    outputs = []
+    parent_id = 4 * n
+    for k in range(n):
+        copy_id = 4 * (n - k) - 1
+        nodes.update({copy_id: "", copy_id - 1: "~", copy_id - 2: ""})
+        edges += [(parent_id, copy_id), (copy_id, copy_id - 1), (copy_id - 1, copy_id - 2)]
+        outputs.append(copy_id - 2)
+        parent_id = copy_id
+    nodes = dict(sorted(nodes.items()))
+    return BoolCirc(OpenDigraph.from_edges(nodes, edges, [4 * n], outputs))
+
+
+if __name__ == "__main__":
+    random.seed(0)
+    for gates in [10**4, 10**5]:
+        circ = random_circuit(gates, 64, 64)
+        size = len(circ.nodes)
+        start = time.perf_counter()
+        stats = circ.optimize()
+        elapsed = time.perf_counter() - start
+        print(f"{gates} gates, {size} -> {len(circ.nodes)} nodes in {elapsed:.2f} s")
+        print(f"    {stats}")
+
+    for n in [10**4, 10**5]:
+        circ = copy_chain(n)
+        start = time.perf_counter()
+        stats = circ.optimize()
+        elapsed = time.perf_counter() - start
+        print(f"copy chain of {n} links: {stats['copies']} copies merged in {elapsed:.2f} s")
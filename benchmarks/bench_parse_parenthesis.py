@@ -0,0 +1,24 @@
+import sys
+import os
+import time
+
+root = os.path.normpath(os.path.join(__file__, "./../.."))
+sys.path.append(root)  # allows us to fetch files from the project root
+
+from modules.bool_circ import *
+
+
+def formula(terms: int, variables: int) -> str:
+    """Returns an OR of terms products of two literals over the given number of variables"""
+    return "|".join(
+        f"((x{i % variables})&(~(x{(7 * i + 1) % variables})))" for i in range(terms)
+    )
+
+
+if __name__ == "__main__":
+    for terms in [1000, 10000, 50000]:
+        text = formula(terms, 64)
+        start = time.perf_counter()
+        circ = parse_parenthesis(text)
+        elapsed = time.perf_counter() - start
+        print(f"{terms} terms, {len(text)} characters, {len(circ.nodes)} nodes: {elapsed:.2f} s")
@@ -0,0 +1,58 @@
+import sys
+import os
+import time
+
+root = os.path.normpath(os.path.join(__file__, "./../.."))
+sys.path.append(root)  # allows us to fetch files from the project root
+
+from modules.open_digraph import *
+
+
+def wide_graph(n: int) -> OpenDigraph:
+    """Returns n disjoint input -> node -> output chains"""
+    nodes = []
+    for k in range(n):
+        nodes += [
+            Node(3 * k, "", {}, {3 * k + 1: 1}),
+            Node(3 * k + 1, "&", {3 * k: 1}, {3 * k + 2: 1}),
+            Node(3 * k + 2, "", {3 * k + 1: 1}, {}),
+        ]
+    return OpenDigraph([3 * k for k in range(n)], [3 * k + 2 for k in range(n)], nodes)
+
+
+def remove_all(graph: OpenDigraph, n: int) -> None:
+    """Removes every inner node, which removes its input and output too"""
+    for k in range(n):
+        graph.remove_node_by_id(3 * k + 1)
+
+
+def remove_and_index(ports: PortList, n: int) -> None:
+    """Removes n ports, looking up the position of a port after each removal"""
+    for k in range(n):
+        ports.remove(2 * k)
+        ports.index(2 * k + 1)
+        ports[k]
+
+
+def timed(function, *args) -> float:
+    start = time.perf_counter()
+    function(*args)
+    return time.perf_counter() - start
+
+
+if __name__ == "__main__":
+    n = 20000
+    graph = wide_graph(n)
+    print(f"{n} inputs and outputs")
+    print(f"is_well_formed:             {timed(lambda: graph.is_well_formed):.2f} s")
+    print(f"write_dot:                  {timed(graph.save_sa_dot_file, os.devnull):.2f} s")
+    print(f"remove the {n} inner nodes: {timed(remove_all, graph, n):.2f} s")
+
+    # the same removals with plain lists
+    graph = wide_graph(n)
+    graph._inputs = list(graph.inputs)
+    graph._outputs = list(graph.outputs)
+    print(f"same with plain lists:      {timed(remove_all, graph, n):.2f} s")
+
+    ports = PortList(range(n))
+    print(f"{n // 2} remove + index pairs:  {timed(remove_and_index, ports, n // 2):.2f} s")
@@ -0,0 +1,27 @@
+import sys
+import os
+import time
+
+root = os.path.normpath(os.path.join(__file__, "./../.."))
+sys.path.append(root)  # allows us to fetch files from the project root
+
+from modules.bool_circ import *
+
+
+def timed(function, *args, **kwargs) -> float:
+    """Returns the time of a single call to function"""
+    start = time.perf_counter()
+    function(*args, **kwargs)
+    return time.perf_counter() - start
+
+
+if __name__ == "__main__":
+    n = 1000
+    print(f"{n} nodes, dense DAG:  {timed(OpenDigraph.random, n, 1, form='DAG'):.2f} s")
+    print(f"{n} nodes, sparse DAG: {timed(OpenDigraph.random, n, 1, form='DAG', p=2 / n):.3f} s")
+
+    for n in [10**5, 10**6]:
+        print(f"{n} nodes, G(n, p) with n edges: {timed(OpenDigraph.random, n, 1, form='loop-free', p=1 / n):.2f} s")
+        print(f"{n} nodes, DAG of out degree 2:  {timed(OpenDigraph.random, n, 1, form='DAG', out_degree=2):.2f} s")
+    n = 10**5
+    print(f"{n} nodes, random BoolCirc:      {timed(BoolCirc.random, n, 1, 64, 64, out_degree=2):.2f} s")
@@ -0,0 +1,37 @@
+import sys
+import os
+import time
+import tracemalloc
+
+root = os.path.normpath(os.path.join(__file__, "./../.."))
+sys.path.append(root)  # allows us to fetch files from the project root
+
+from modules.open_digraph import *
+
+
+def measured(function) -> tuple:
+    """Returns the time and the peak memory in MB of a call to function"""
+    tracemalloc.start()
+    start = time.perf_counter()
+    function()
+    elapsed = time.perf_counter() - start
+    peak = tracemalloc.get_traced_memory()[1] / 2**20
+    tracemalloc.stop()
+    return elapsed, peak
+
+
+if __name__ == "__main__":
+    for n in [2000, 5000]:
+        graph = OpenDigraph.random(n, 1, form="DAG", out_degree=4)
+        for name in ["adjency_matrix", "coo_matrix", "csr_matrix"]:
+            elapsed, peak = measured(lambda: getattr(graph, name))
+            print(f"{n} nodes, {name:15} {elapsed:.3f} s {peak:8.1f} MB")
+
+    n = 10**5
+    graph = OpenDigraph.random(n, 1, form="DAG", out_degree=4)
+    for name in ["coo_matrix", "csr_matrix"]:
+        elapsed, peak = measured(lambda: getattr(graph, name))
+        print(f"{n} nodes, {name:15} {elapsed:.3f} s {peak:8.1f} MB")
+    coo = graph.coo_matrix
+    elapsed, peak = measured(lambda: OpenDigraph.graph_from_sparse(coo, n=n))
+    print(f"{n} nodes, graph_from_sparse {elapsed:.3f} s")
@@ -0,0 +1,31 @@
+import sys
+import os
+import random
+import time
+
+root = os.path.normpath(os.path.join(__file__, "./../.."))
+sys.path.append(root)  # allows us to fetch files from the project root
+
+from modules.bool_circ import *
+
+
+def timed(function, *args):
+    """Returns the result of function(*args) and the time it took"""
+    start = time.perf_counter()
+    result = function(*args)
+    return result, time.perf_counter() - start
+
+
+if __name__ == "__main__":
+    random.seed(0)
+    for n in [8, 10, 12]:
+        bits = "".join(random.choice("01") for i in range(2**n))
+        circ = BoolCirc(binary_mx.construct_op(bits))
+        size = len(circ.nodes)
+        _, before = timed(circ.truth_table)
+        merged, elapsed = timed(circ.structural_hashing)
+        _, after = timed(circ.truth_table)
+        print(
+            f"construct_op {n} inputs: {size} -> {len(circ.nodes)} nodes, "
+            f"{merged} merged in {elapsed:.2f} s, truth table {before:.2f} s -> {after:.2f} s"
+        )
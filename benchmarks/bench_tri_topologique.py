@@ -0,0 +1,60 @@
+import sys
+import os
+import time
+
+root = os.path.normpath(os.path.join(__file__, "./../.."))
+sys.path.append(root)  # allows us to fetch files from the project root
+
+from modules.open_digraph import *
+
+
+def legacy_tri_topologique(digraph: OpenDigraph) -> List[List[int]]:
+    """The previous implementation, peeling roots from a deep copy"""
+    digraph_copy = digraph.copy
+    for input in digraph.inputs:
+        digraph_copy.remove_node_by_id(input)
+    for output in digraph.outputs:
+        digraph_copy.remove_node_by_id(output)
+
+    sort = []
+    while digraph_copy.nodes != {}:
+        roots = []
+        for node_id in digraph_copy.nodes:
+            if digraph_copy.get_node_by_id(node_id).in_degree == 0:
+                roots.append(node_id)
+        sort.append(roots)
+        for root in roots:
+            digraph_copy.remove_node_by_id(root)
+    return sort
+
+
+def random_dag(n: int, width: int) -> OpenDigraph:
+    """Returns a DAG of n nodes where each node has two parents among the width previous ones"""
+    digraph = OpenDigraph.empty()
+    for i in range(n):
+        digraph.add_node()
+        if i > 0:
+            digraph.add_edge(random.randint(max(0, i - width), i - 1), i)
+            digraph.add_edge(random.randint(max(0, i - width), i - 1), i)
+    return digraph
+
+
+def timed(function, *args) -> float:
+    start = time.perf_counter()
+    function(*args)
+    return time.perf_counter() - start
+
+
+if __name__ == "__main__":
+    random.seed(0)
+    print("nodes    depth   kahn (s)   legacy (s)")
+    for n in [10**3, 3 * 10**3, 10**4, 10**5]:
+        digraph = random_dag(n, 50)
+        sort = digraph.tri_topologique
+        if n <= 10**4:
+            assert legacy_tri_topologique(digraph) == sort
+            legacy = f"{timed(legacy_tri_topologique, digraph):.3f}"
+        else:
+            legacy = "-"
+        kahn = timed(lambda: digraph.tri_topologique)
+        print(f"{n:<8} {len(sort):<7} {kahn:<10.3f} {legacy}")
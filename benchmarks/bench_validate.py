@@ -0,0 +1,35 @@
+import sys
+import os
+import time
+
+root = os.path.normpath(os.path.join(__file__, "./../.."))
+sys.path.append(root)  # allows us to fetch files from the project root
+
+from modules.bool_circ import *
+
+
+def legacy_is_well_formed(graph: OpenDigraph) -> None:
+    """The boundary checks of the previous validator, scanning get_nodes for each port"""
+    for node_id in graph.inputs:
+        if not (graph.get_node_by_id(node_id) in graph.get_nodes):
+            raise Exception(f"Input node {node_id} isn't in the graph")
+    for node_id in graph.outputs:
+        if not (graph.get_node_by_id(node_id) in graph.get_nodes):
+            raise Exception(f"Output node {node_id} isn't in the graph")
+
+
+def timed(function, *args) -> float:
+    start = time.perf_counter()
+    function(*args)
+    return time.perf_counter() - start
+
+
+if __name__ == "__main__":
+    for n in [6, 8, 10]:
+        circ = BoolCirc.adder(n)
+        graph = OpenDigraph(circ.inputs, circ.outputs, circ.nodes.values())
+        print(f"{1 << n} bits adder, {len(graph.nodes)} nodes")
+        print(f"  previous boundary checks alone: {timed(legacy_is_well_formed, graph):.3f} s")
+        print(f"  OpenDigraph.validate:           {timed(graph.validate):.3f} s")
+        print(f"  BoolCirc.validate:              {timed(circ.validate):.3f} s")
+        print(f"  BoolCirc(graph):                {timed(BoolCirc, graph):.3f} s")
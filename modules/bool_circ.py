@@ -1,15 +1,26 @@
 from __future__ import annotations
 
+from typing import Iterator, Tuple
+import os
 import random
+import re
 import string
 
 
 from modules.open_digraph import *
-from modules.bool_circ_mx.binary_mx import binary_mx
+from modules.bool_circ_mx.binary_mx import binary_mx, CONSTRUCT_FORMS
 from modules.bool_circ_mx.evaluation_mx import evaluation_mx
+from modules.bool_circ_mx.compile_mx import compile_mx, CompiledCirc
+from modules.bool_circ_mx.optimize_mx import optimize_mx, OPTIMIZE_STATS
+from modules.circ_builder import CircBuilder
 
+MODULES_DIR = os.path.dirname(os.path.abspath(__file__))
+GATE_NAMES = {"&": "AND", "|": "OR", "^": "XOR"}
+FORMULA_OPERATORS = ["&", "|", "^", "~"]
+FORMULA_TOKEN = re.compile(r"\s*(?:(?P<paren>[()])|(?P<op>[&|^~])|(?P<name>[^()&|^~\s]+))")
 
-class BoolCirc(OpenDigraph, binary_mx, evaluation_mx):
+
+class BoolCirc(OpenDigraph, binary_mx, evaluation_mx, compile_mx, optimize_mx):
     def __init__(self, g: OpenDigraph) -> BoolCirc:
         """Constructor.
 
@@ -17,80 +28,112 @@ class BoolCirc(OpenDigraph, binary_mx, evaluation_mx):
         ----------
         g: OpenDigraph
             Graphe à transformer en matrice booléenne circulaire.
+
+        Raises
+        ------
+        IntegrityError
+            If g isn't a well formed boolean circuit (see BoolCirc.validate)
         """
         if isinstance(g, OpenDigraph):
-            if g.is_well_formed:  # Returns None if the graph is well formed
-                raise Exception(
-                    f"Invalid argument: the argument isn't a well formed boolean circuit"
-                )
-                super().__init__(g.inputs, g.outputs, g.nodes.values())
-            else:
-                super().__init__(g.inputs, g.outputs, g.nodes.values())
+            super().__init__(g.inputs, g.outputs, g.nodes.values())
+            violations = self.validate()
+            if violations:
+                raise IntegrityError(violations)
+            if g._shared is not None:
+                # g shares its nodes since copy_on_write, so does the circuit
+                g._shared[0] += 1
+                self._shared = g._shared
         else:
             raise Exception(f"Invalid argument: argument must be an OpenDigraph")
 
-    @property
-    def is_well_formed(self) -> None:
-        """Returns True if the digraph is well formed.
-
-        Raises:
-        ------
-        Exception:
-            If the digraph is not well formed with the description of the problem.
+    @classmethod
+    def _from_valid(cls, g: OpenDigraph) -> BoolCirc:
+        """Wraps g without checking it, only for the constructors of the class
+        (and CircBuilder) whose circuits are well formed by construction"""
+        output = cls.__new__(cls)
+        OpenDigraph.__init__(output, g.inputs, g.outputs, g.nodes.values())
+        return output
+
+    def validate(self) -> List[Tuple[int, str]]:
+        """Checks that the boolean circuit is well formed, reporting every violation
+
+        On top of the checks of OpenDigraph.validate, the circuit must be acyclic
+        and each inner node must have a valid label and the degrees it requires.
+
+        Returns
+        -------
+        violations : List[Tuple[int, str]]
+            The id of the node at fault and a description of every violation,
+            empty if the circuit is well formed
         """
-        # Checks if the graph is acyclic
-        if self.is_cyclic:
-            raise Exception(f"The graph is cyclic")
+        violations = super().validate()
 
-        # Checks if ann nodes respect their degree requirement
+        # The cycle search needs a consistent graph
+        if violations == []:
+            cycle = self.find_cycle()
+            if cycle is not None:
+                violations.append((cycle[0], f"The graph is cyclic: {cycle}"))
+
+        # Checks if all nodes respect their degree requirement
         valid_labels = ["0", "1", "", "&", "|", "^", "~"]
-        for node_id in self.nodes:
-            node = self.get_node_by_id(node_id)
-            label = node.get_label
+        for node_id, node in self.nodes.items():
+            if node_id in self.inputs or node_id in self.outputs:
+                continue
+            label = node.label
 
             if not (label in valid_labels):
-                raise Exception(
-                    f"The label of node {node_id} is invalid. Valid labels are {valid_labels}"
+                violations.append(
+                    (
+                        node_id,
+                        f"The label of node {node_id} is invalid. Valid labels are {valid_labels}",
+                    )
                 )
 
             if label == "0" or label == "1":
                 if node.in_degree != 0 or node.out_degree != 1:
-                    raise Exception(
-                        f"primitive node {node_id} must must have an in degree of exactly 0 and out degree of exactly 1"
+                    violations.append(
+                        (
+                            node_id,
+                            f"primitive node {node_id} must must have an in degree of exactly 0 and out degree of exactly 1",
+                        )
                     )
 
             if label == "":
                 if node.in_degree != 1:
-                    raise Exception(
-                        f"COPY node {node_id} must have an in degree of exactly 1"
-                    )
-
-            if label == "&":
-                if node.out_degree != 1:
-                    raise Exception(
-                        f"AND node {node_id} must have an out degree of exactly 1"
-                    )
-
-            if label == "|":
-                if node.out_degree != 1:
-                    raise Exception(
-                        f"OR node {node_id} must have an out degree of exactly 1"
+                    violations.append(
+                        (node_id, f"COPY node {node_id} must have an in degree of exactly 1")
                     )
 
-            if label == "^":
+            if label in GATE_NAMES:
                 if node.out_degree != 1:
-                    raise Exception(
-                        f"XOR node {node_id} must have an out degree of exactly 1"
+                    violations.append(
+                        (
+                            node_id,
+                            f"{GATE_NAMES[label]} node {node_id} must have an out degree of exactly 1",
+                        )
                     )
 
             if label == "~":
                 if node.in_degree != 1 or node.out_degree != 1:
-                    raise Exception(
-                        f"NOT node {node_id} must have an in degree and out degree of exactly 1"
+                    violations.append(
+                        (
+                            node_id,
+                            f"NOT node {node_id} must have an in degree and out degree of exactly 1",
+                        )
                     )
 
+        return violations
+
     @classmethod
-    def random(cls, n: int, bound: int, inputs: int = 0, outputs: int = 0) -> BoolCirc:
+    def random(
+        cls,
+        n: int,
+        bound: int,
+        inputs: int = 0,
+        outputs: int = 0,
+        p: float = None,
+        out_degree: int = None,
+    ) -> BoolCirc:
         """Returns a random boolean circuit of n nodes between 0 and bound with a given number of inputs and outputs.
 
         Parameters:
@@ -106,6 +149,11 @@ class BoolCirc(OpenDigraph, binary_mx, evaluation_mx):
             The number of inputs of the circuit.
         outputs: int
             The number of outputs of the circuit.
+        p: float
+            If given, the underlying DAG is drawn sparsely, each edge existing with probability p.
+        out_degree: int
+            If given, each node of the underlying DAG gets out_degree children.
+            With p or out_degree, circuits of 10^5 to 10^6 nodes can be generated.
 
         Returns:
         --------
@@ -113,7 +161,8 @@ class BoolCirc(OpenDigraph, binary_mx, evaluation_mx):
             A random boolean circuit.
 
         """
-        circ = OpenDigraph.random(n, bound, form="DAG")
+        circ = OpenDigraph.random(n, bound, form="DAG", p=p, out_degree=out_degree)
+        operators = circ.get_node_ids
         for node in circ.get_nodes:
             if not (node.has_parents):
                 circ.add_input_node(node.get_id)
@@ -122,32 +171,37 @@ class BoolCirc(OpenDigraph, binary_mx, evaluation_mx):
 
         if inputs != 0 and outputs != 0:
             while inputs > len(circ.inputs):
-                circ.add_input_node(circ.random_op)
-            while inputs < len(circ.inputs):
-                input_1 = circ[circ.random_input]
-                other = circ.inputs.copy()
-                other.remove(input_1.get_id)
-                input_2 = circ[random.choice(other)]
+                circ.add_input_node(random.choice(operators))
+            # The merged port is swapped with the last one of the pool, so each merge is O(1)
+            pool = list(circ.inputs)
+            while inputs < len(pool):
+                k = random.randrange(len(pool))
+                pool[k], pool[-1] = pool[-1], pool[k]
+                input_2 = circ[pool.pop()]
+                input_1 = circ[random.choice(pool)]
                 input_1_child = circ[input_1.get_children_ids[0]]
                 new_id = circ.add_node(
                     parents={input_1.id: 1},
                     children=input_1.children | input_2.children,
                 )
+                operators.append(new_id)
                 circ.remove_parallel_edges((input_1.get_id, input_1_child.get_id))
                 circ.remove_node_by_id(input_2.get_id)
 
             while outputs > len(circ.outputs):
-                circ.add_output_node(circ.random_op)
-            while outputs < len(circ.outputs):
-                output_1 = circ[circ.random_output]
-                other = circ.outputs.copy()
-                other.remove(output_1.get_id)
-                output_2 = circ[random.choice(other)]
+                circ.add_output_node(random.choice(operators))
+            pool = list(circ.outputs)
+            while outputs < len(pool):
+                k = random.randrange(len(pool))
+                pool[k], pool[-1] = pool[-1], pool[k]
+                output_2 = circ[pool.pop()]
+                output_1 = circ[random.choice(pool)]
                 output_1_parent = circ[output_1.get_parent_ids[0]]
                 new_id = circ.add_node(
                     parents=output_1.parents | output_2.parents,
                     children={output_1.id: 1},
                 )
+                operators.append(new_id)
                 circ.remove_parallel_edges((output_1_parent.get_id, output_1.get_id))
                 circ.remove_node_by_id(output_2.get_id)
 
@@ -194,124 +248,314 @@ class BoolCirc(OpenDigraph, binary_mx, evaluation_mx):
 
     @classmethod
     def adder(cls, n: int) -> BoolCirc:
-        if n == 0:
-            return cls.adder_0().copy
-        else:
-            c1 = cls.adder(n - 1)
-            c2 = cls.adder(n - 1)
-
-            carry_out = None
-            for node_id in c1.get_output_ids:
-                out_node = c1[node_id]
-                if c1[out_node.get_parent_ids[0]].get_label == "|":
-                    carry_out = out_node
-
-            carry_in = None
-            for node_id in c2.get_input_ids:
-                in_node = c2[node_id]
-                cp_node = c2[in_node.get_children_ids[0]]
-                for child_id in cp_node.get_children_ids:
-                    child_node = c2[child_id]
-                    if child_node.get_children_ids[0] in c2.outputs:
-                        carry_in = in_node
+        """Returns a ripple-carry adder of two 2^n bits integers and a carry
 
-            c2.shift_indices(c1.max_id - c2.min_id + 1)
-            for node in c2.get_nodes:
-                c1.nodes[node.id] = node
+        Copies of adder_0 are stamped side by side, the copy of bit k taking the
+        ids 14k to 14k + 13, and the carry out of each copy is wired to the
+        carry in of the next one.
 
-            c1.add_edge(carry_out.get_parent_ids[0], carry_in.get_children_ids[0])
-            c1.remove_node_by_id(carry_out.get_id, carry_in.get_id)
-
-            c1.inputs += c2.inputs
-            c1.inputs.remove(carry_in.get_id)
-            c1.outputs += c2.outputs
+        Parameters
+        ----------
+        n : int
+            Log2 of the number of bits
 
-            return c1
+        Returns
+        -------
+        circ : BoolCirc
+            The adder, whose inputs are [a0, b0, c, a1, b1, ...] and outputs are
+            [r0, ..., r_{N-2}, carry, r_{N-1}] with N = 2^n
+        """
+        template = [
+            (node.id, node.label, node.parents, node.children)
+            for node in cls.adder_0().get_nodes
+        ]
+        bits = 1 << n
+        size = 14
+
+        nodes = []
+        inputs = [9, 10, 11]
+        outputs = []
+        for k in range(bits):
+            base = size * k
+            for node_id, label, parents, children in template:
+                if node_id == 11 and k > 0:
+                    continue  # the carry in comes from the previous bit
+                if node_id == 12 and k < bits - 1:
+                    continue  # the carry out goes to the next bit
+                parents = {base + parent_id: 1 for parent_id in parents}
+                children = {base + child_id: 1 for child_id in children}
+                if node_id == 4 and k > 0:
+                    parents = {base - size + 8: 1}
+                if node_id == 8 and k < bits - 1:
+                    children = {base + size + 4: 1}
+                nodes.append(Node(base + node_id, label, parents, children))
+            if k > 0:
+                inputs += [base + 9, base + 10]
+            outputs.append(base + 13)
+        outputs.insert(-1, size * (bits - 1) + 12)
+
+        return cls._from_valid(OpenDigraph(inputs, outputs, nodes))
 
     @classmethod
     def half_adder(cls, n: int) -> BoolCirc:
+        """Returns an adder of two 2^n bits integers whose carry in is 0"""
         circ = cls.adder(n)
-        circ.nodes[11].set_label("0")
-        circ.inputs.remove(11)
+        carry = circ.inputs[2]
+        circ.nodes[carry].set_label("0")
+        circ.inputs.remove(carry)
         return circ
 
+    @classmethod
+    def _prefix_adder(cls, n: int, carries) -> BoolCirc:
+        """Builds an adder with the ports of adder(n), carries(builder, g, p, c)
+        returning the carries c_1, ..., c_N of the generate and propagate signals"""
+        builder = CircBuilder()
+        a, b = [], []
+        c = None
+        for k in range(1 << n):
+            a.append(builder.input())
+            b.append(builder.input())
+            if k == 0:
+                c = builder.input()
+
+        g = [builder.and_(x, y) for x, y in zip(a, b)]
+        p = [builder.xor(x, y) for x, y in zip(a, b)]
+        c_out = carries(builder, g, p, c)
+        r = [builder.xor(p[0], c)] + [
+            builder.xor(p_k, c_k) for p_k, c_k in zip(p[1:], c_out)
+        ]
+
+        for signal in r[:-1] + [c_out[-1], r[-1]]:
+            builder.output(signal)
+        return builder.build(cls)
+
+    @classmethod
+    def carry_lookahead_adder(cls, n: int, block: int = 4) -> BoolCirc:
+        """Returns a carry-lookahead adder with the same ports as adder(n)
+
+        The bits are grouped in blocks whose carries are computed in two levels
+        of logic from the carry in of the block, the carries in of the blocks
+        being computed the same way one level up, so the depth is O(log N).
+
+        Parameters
+        ----------
+        n : int
+            Log2 of the number of bits
+
+        Optionnal Parameters
+        ----------
+        block : int (default 4)
+            The number of bits of each lookahead block, at least 2
+
+        Raises
+        ------
+        ValueError
+            Raises a ValueError if block is smaller than 2
+        """
+        if block < 2:
+            raise ValueError(f"block must be at least 2, not {block}")
+
+        def carries(builder, g, p, c):
+            # c_{i+1} = g_i | p_i g_{i-1} | ... | p_i ... p_0 c
+            def flat(g, p, c):
+                output = []
+                for i in range(len(g)):
+                    terms = [c] + g[:i + 1]
+                    terms = [
+                        builder.and_(term, *p[j:i + 1]) for j, term in enumerate(terms)
+                    ]
+                    output.append(builder.or_(*terms))
+                return output
+
+            if len(g) <= block:
+                return flat(g, p, c)
+
+            groups = range(0, len(g), block)
+            big_g = [
+                builder.or_(
+                    *[
+                        builder.and_(g[i], *p[i + 1 : j + block])
+                        for i in range(j, min(j + block, len(g)))
+                    ]
+                )
+                for j in groups
+            ]
+            big_p = [builder.and_(*p[j : j + block]) for j in groups]
+            group_carries = [c] + carries(builder, big_g, big_p, c)
+
+            output = []
+            for k, j in enumerate(groups):
+                end = min(j + block, len(g)) - 1
+                inner = flat(g[j:end], p[j:end], group_carries[k])
+                output += inner + [group_carries[k + 1]]
+            return output
+
+        return cls._prefix_adder(n, carries)
+
+    @classmethod
+    def kogge_stone_adder(cls, n: int) -> BoolCirc:
+        """Returns a Kogge-Stone parallel prefix adder with the same ports as adder(n)
+
+        The generate and propagate signals of spans of 1, 2, 4... bits are
+        combined in log2(N) levels, every bit being computed at every level.
+        """
+
+        def carries(builder, g, p, c):
+            g = [builder.or_(g[0], builder.and_(p[0], c))] + g[1:]
+            distance = 1
+            while distance < len(g):
+                g, p = (
+                    g[:distance]
+                    + [
+                        builder.or_(g[i], builder.and_(p[i], g[i - distance]))
+                        for i in range(distance, len(g))
+                    ],
+                    p[:distance]
+                    + [builder.and_(p[i], p[i - distance]) for i in range(distance, len(p))],
+                )
+                distance *= 2
+            return g
+
+        return cls._prefix_adder(n, carries)
+
     @classmethod
     def encoder(cls) -> BoolCirc:
-        return BoolCirc(OpenDigraph.from_dot_file("encoder.dot"))
+        return BoolCirc(OpenDigraph.from_dot_file(os.path.join(MODULES_DIR, "encoder.dot")))
 
     @classmethod
     def decoder(cls) -> BoolCirc:
-        return BoolCirc(OpenDigraph.from_dot_file("decoder.dot"))
+        return BoolCirc(OpenDigraph.from_dot_file(os.path.join(MODULES_DIR, "decoder.dot")))
 
 
-def parse_parenthesis(*args: string) -> BoolCirc:
-    """Returns a boolean circuit from a string.
+def tokenize_formula(formula: str) -> Iterator[Tuple[str, str, int]]:
+    """Splits a formula into tokens
 
     Parameters
     ----------
-    *args : string
-        The string to parse.
+    formula : str
+        The formula, whitespace being ignored
+
     Returns
     -------
-    BoolCirc : BoolCirc
-        The boolean circuit.
-
+    tokens : Iterator[Tuple[str, str, int]]
+        Tuples (kind, value, position). kind is "(", ")", "op" for one of the
+        operators "&", "|", "^" and "~", or "name" for a variable
     """
-    operator = ["", "&", "|", "^", "~"]
-    output_graph = OpenDigraph.empty()
-
-    for s in args:
-        o0 = Node(1, "", {0: 1}, {})
-        n0 = Node(0, "", {}, {1: 1})
-        g = OpenDigraph([], [1], [o0, n0])
-        current_id = 0
-        s2 = ""
-        for char in s:
-            if char == "(":
-                current_node = g[current_id]
-                if s2 != "":
-                    labels = {node.label: node.id for node in g.get_nodes}
-                    if not (s2 in operator) and s2 in labels:
-                        g.fusion(current_id, labels[s2])
-                    current_node.set_label(s2)
-                new_id = g.add_node(g.new_id)
-                g.add_edge(new_id, current_id)
-                current_id = new_id
-                s2 = ""
-            elif char == ")":
-                current_node = g[current_id]
-                if s2 != "":
-                    labels = {node.label: node.id for node in g.get_nodes}
-                    if not (s2 in operator) and s2 in labels:
-                        g.fusion(current_id, labels[s2])
-                    current_node.set_label(s2)
-                current_id = g[current_node.get_children_ids[0]].id
-                s2 = ""
-            else:
-                s2 += char
-
-        if s == args[0]:
-            output_graph = g
+    for match in FORMULA_TOKEN.finditer(formula):
+        kind = match.lastgroup
+        if kind == "paren":
+            yield match[kind], match[kind], match.start(kind)
         else:
-            output_labels = {node.label: node.id for node in output_graph.get_nodes}
-            n = output_graph.new_id
+            yield kind, match[kind], match.start(kind)
 
-            output_graph.iparallel([g])
 
-            component_nodes = []
-            for node in output_graph.get_nodes:
-                if node.id >= n:
-                    component_nodes.append(node)
+def parse_parenthesis(*args: string) -> OpenDigraph:
+    """Returns a boolean circuit from formulas.
 
-            for node in component_nodes:
-                label = node.get_label
-                if not (label in operator) and label in output_labels:
-                    output_graph.fusion(node.get_id, output_labels[label])
+    Each formula is an operand tree where every operand is between parentheses
+    and the operator of a node is written between its operands (or before its
+    single operand for "~"), for example "((x0)&(x1))|(~(x2))". Anything else
+    than an operator is a variable. The formulas are read in a single pass and
+    the circuit is built in bulk: each formula gives an output, in order, and
+    each variable gives an input, in order of first appearance, shared by all
+    the formulas.
 
-    for node in output_graph.get_nodes:
-        if not (node.has_parents):
-            input_id = output_graph.add_input_node(node.get_id)
-            output_graph[input_id].set_label(node.get_label)
-            node.set_label("")
-
-    return output_graph
+    Parameters
+    ----------
+    *args : string
+        The formulas to parse.
+    Returns
+    -------
+    OpenDigraph : OpenDigraph
+        The circuit, whose input nodes are labelled by the names of the variables.
+
+    Raises
+    ------
+    ParseError
+        Raises a ParseError with the line and column of the first syntax error
+        in its formula, the message giving the number of the formula if there
+        are several.
+    """
+    nodes = {}
+    edges = []
+    inputs = []
+    outputs = []
+    variables = {}
+
+    def new_node(label: str) -> int:
+        node_id = len(nodes)
+        nodes[node_id] = label
+        return node_id
+
+    for k, formula in enumerate(args):
+
+        def error(message: str, position: int) -> ParseError:
+            line = formula.count("\n", 0, position) + 1
+            column = position - formula.rfind("\n", 0, position)
+            if len(args) > 1:
+                message = f"formula {k + 1}: {message}"
+            return ParseError(message, line, column)
+
+        def close(entry: list) -> None:
+            # entry is [node id or None, label or None, position, number of operands,
+            # position of the operator or None]
+            node_id, label, position, operands, operator_position = entry
+            if label is not None and not (label in FORMULA_OPERATORS):
+                if not (label in variables):
+                    input_id = new_node(label)
+                    variables[label] = new_node("")
+                    edges.append((input_id, variables[label]))
+                    inputs.append(input_id)
+                node_id = variables[label]
+            elif label is None and operands == 0:
+                raise error("empty parentheses", position)
+            elif label is None and operands > 1:
+                raise error("missing operator", position)
+            elif label == "~" and operands != 1:
+                raise error(f"~ must have exactly one operand, not {operands}", position)
+            elif label in FORMULA_OPERATORS and operands == 0:
+                raise error(f"operator {label} has no operand", position)
+            elif label in GATE_NAMES and operands == 1:
+                raise error(f"operator {label} must have at least two operands", operator_position)
+            elif node_id is None:
+                node_id = new_node("" if label is None else label)
+            else:
+                nodes[node_id] = "" if label is None else label
+            parent = stack[-1]
+            if parent[0] is None:
+                parent[0] = new_node("")
+            edges.append((node_id, parent[0]))
+
+        output_id = new_node("")
+        outputs.append(output_id)
+        stack = [[output_id, None, 0, 1, None], [None, None, 0, 0, None]]
+        for kind, value, position in tokenize_formula(formula):
+            entry = stack[-1]
+            if kind == "(":
+                if entry[1] is not None and not (entry[1] in FORMULA_OPERATORS):
+                    raise error(f"variable {entry[1]} can't have operands", position)
+                entry[3] += 1
+                stack.append([None, None, position, 0, None])
+            elif kind == ")":
+                if len(stack) == 2:
+                    raise error("unmatched )", position)
+                close(stack.pop())
+            elif kind == "op":
+                if entry[1] is not None and entry[1] != value:
+                    if entry[1] in FORMULA_OPERATORS:
+                        raise error(
+                            f"operators {entry[1]} and {value} mixed without parentheses", position
+                        )
+                    raise error(f"unexpected operator {value} after variable {entry[1]}", position)
+                if entry[1] is None:
+                    entry[4] = position
+                entry[1] = value
+            else:
+                if entry[1] is not None or entry[3] != 0:
+                    raise error(f"unexpected variable {value}, operands must be between parentheses", position)
+                entry[1] = value
+        if len(stack) > 2:
+            raise error("unclosed (", stack[-1][2])
+        close(stack.pop())
+
+    return OpenDigraph.from_edges(nodes, edges, inputs, outputs)
@@ -1,13 +1,236 @@
 from __future__ import annotations
 from typing import Dict, List, Tuple
+import heapq
 
 from math import log2
 from modules.open_digraph import *
 
+# A cube (value, mask) is the set of the assignments i with i & ~mask == value,
+# the bits of mask being the positions left free
+Cube = Tuple[int, int]
+
+# Forms of circuit construct_op can build
+CONSTRUCT_FORMS = ["dnf", "sop", "esop"]
+# Largest number of inputs for which the "sop" form enumerates every prime implicant,
+# above it the primes are found by expand_primes
+EXACT_SOP_INPUTS = 10
+
+
+def prime_implicants(n: int, ones: List[int]) -> List[Cube]:
+    """Returns the prime implicants of a function with the Quine-McCluskey method
+
+    Parameters
+    ----------
+    n : int
+        The number of variables
+    ones : List[int]
+        The assignments where the function is 1
+
+    Returns
+    -------
+    primes : List[Cube]
+        The cubes contained in the function and contained in no larger such cube
+    """
+    current = {(value, 0) for value in ones}
+    primes = []
+    while current:
+        merged = set()
+        used = set()
+        for value, mask in current:
+            for p in range(n):
+                bit = 1 << p
+                if not (value & bit) and not (mask & bit) and (value | bit, mask) in current:
+                    merged.add((value, mask | bit))
+                    used.add((value, mask))
+                    used.add((value | bit, mask))
+        primes += [cube for cube in current if not (cube in used)]
+        current = merged
+    return sorted(primes)
+
+
+def cube_minterms(cube: Cube) -> List[int]:
+    """Returns the assignments of the cube"""
+    value, mask = cube
+    minterms = []
+    sub = mask
+    while True:
+        minterms.append(value | sub)
+        if sub == 0:
+            return minterms
+        sub = (sub - 1) & mask
+
+
+def expand_primes(n: int, ones: List[int]) -> List[Cube]:
+    """Returns prime implicants covering a function, expanded one at a time
+
+    Like the expand step of Espresso, each assignment not covered yet is grown
+    into a prime implicant by freeing one position at a time, choosing the
+    position whose freed half covers the most assignments left uncovered.
+    Only the primes needed to cover the function are built, so unlike
+    prime_implicants the cost doesn't blow up on dense functions.
+
+    Parameters
+    ----------
+    n : int
+        The number of variables
+    ones : List[int]
+        The assignments where the function is 1
+
+    Returns
+    -------
+    primes : List[Cube]
+        Prime implicants covering every assignment of ones, to be reduced by greedy_cover
+    """
+    on = bytearray(1 << n)
+    for minterm in ones:
+        on[minterm] = 1
+    covered = bytearray(1 << n)
+    primes = []
+    for minterm in ones:
+        if covered[minterm]:
+            continue
+        value, mask = minterm, 0
+        while True:
+            best, best_gain = 0, -1
+            for p in range(n):
+                bit = 1 << p
+                if mask & bit:
+                    continue
+                # freeing p adds the half of the cube on the other side of p
+                half = cube_minterms((value ^ bit, mask))
+                if all(on[other] for other in half):
+                    gain = sum(1 for other in half if not covered[other])
+                    if gain > best_gain:
+                        best, best_gain = bit, gain
+            if best_gain < 0:
+                break
+            value &= ~best
+            mask |= best
+        primes.append((value, mask))
+        for other in cube_minterms((value, mask)):
+            covered[other] = 1
+    return sorted(primes)
+
+
+def greedy_cover(ones: List[int], primes: List[Cube]) -> List[Cube]:
+    """Returns a small subset of primes covering every assignment of ones
+
+    Essential primes are taken first, then the prime covering the most assignments
+    left, and primes made redundant by later choices are dropped at the end.
+
+    Parameters
+    ----------
+    ones : List[int]
+        The assignments to cover
+    primes : List[Cube]
+        The prime implicants of the function
+
+    Returns
+    -------
+    cover : List[Cube]
+        The chosen primes, sorted
+    """
+    minterms = [cube_minterms(cube) for cube in primes]
+    covering = {minterm: [] for minterm in ones}
+    for k, cube_ones in enumerate(minterms):
+        for minterm in cube_ones:
+            covering[minterm].append(k)
+
+    chosen = []
+    covered = set()
+
+    def choose(k: int) -> None:
+        chosen.append(k)
+        covered.update(minterms[k])
+
+    for minterm in ones:
+        if not (minterm in covered) and len(covering[minterm]) == 1:
+            choose(covering[minterm][0])
+
+    # Lazy greedy: the gain of a prime only decreases, so a stale gain is an upper bound
+    heap = [(-len(cube_ones), k) for k, cube_ones in enumerate(minterms)]
+    heapq.heapify(heap)
+    while len(covered) < len(covering):
+        _, k = heapq.heappop(heap)
+        gain = sum(1 for minterm in minterms[k] if not (minterm in covered))
+        if gain == 0:
+            continue
+        if heap and gain < -heap[0][0]:
+            heapq.heappush(heap, (-gain, k))
+        else:
+            choose(k)
+
+    counts = dict.fromkeys(covering, 0)
+    for k in chosen:
+        for minterm in minterms[k]:
+            counts[minterm] += 1
+    cover = []
+    for k in reversed(chosen):
+        if all(counts[minterm] > 1 for minterm in minterms[k]):
+            for minterm in minterms[k]:
+                counts[minterm] -= 1
+        else:
+            cover.append(primes[k])
+    return sorted(cover)
+
+
+def _low_masks(n: int) -> List[int]:
+    """Returns for each position p the 2^n bit mask of the assignments whose bit p is 0"""
+    size = 1 << n
+    masks = []
+    for p in range(n):
+        shift = 1 << p
+        block = (1 << shift) - 1
+        masks.append(block * (((1 << size) - 1) // ((1 << (2 * shift)) - 1)))
+    return masks
+
+
+def reed_muller(n: int, table: int, polarity: int = 0) -> int:
+    """Returns the Reed-Muller spectrum of a function, as a 2^n bit integer
+
+    Bit s of the result is set if the AND of the literals of the positions of s
+    is a term of the XOR equal to the function, the literal of position p being
+    negated if bit p of polarity is set (polarity 0 gives the positive form).
+
+    Parameters
+    ----------
+    n : int
+        The number of variables
+    table : int
+        The truth table, bit i being the value of the function on assignment i
+
+    Optionnal Parameters
+    ----------
+    polarity : int (default 0)
+        The positions whose literals are negated
+    """
+    for p, low in enumerate(_low_masks(n)):
+        shift = 1 << p
+        if (polarity >> p) & 1:
+            table = ((table & low) << shift) | ((table >> shift) & low)
+        table ^= (table & low) << shift
+    return table
+
+
+def esop_polarity(n: int, table: int) -> int:
+    """Returns a polarity giving few Reed-Muller terms, flipping one position at a time"""
+    polarity = 0
+    best = bin(reed_muller(n, table)).count("1")
+    improved = True
+    while improved:
+        improved = False
+        for p in range(n):
+            terms = bin(reed_muller(n, table, polarity ^ (1 << p))).count("1")
+            if terms < best:
+                polarity ^= 1 << p
+                best = terms
+                improved = True
+    return polarity
+
 
 class binary_mx:
     @classmethod
-    def construct_op(cls, bits: str) -> BoolCirc:
+    def construct_op(cls, bits: str, form: str = "dnf") -> BoolCirc:
         """Constructs a boolean circuit from a binary string.
 
         Parameters
@@ -15,33 +238,100 @@ class binary_mx:
         bits: str
             A binary string.
 
+        Optionnal Parameters
+        ----------
+        form: str (default "dnf")
+            "dnf" gives one AND of all the literals per 1 of bits, and one NOT per
+            negated literal.
+            "sop" gives an OR of prime implicants chosen by a greedy cover, among
+            all of them (Quine-McCluskey) up to EXACT_SOP_INPUTS inputs and among
+            the ones found by expand_primes above.
+            "esop" gives a XOR of ANDs, the Reed-Muller form of the polarity found
+            by esop_polarity.
+            Both minimized forms share one NOT per negated input.
+
         Returns
         -------
         circ: BoolCirc
             A boolean circuit.
         """
+        if not (form in CONSTRUCT_FORMS):
+            raise Exception(f"Unknown form {form}, valid forms are {CONSTRUCT_FORMS}")
         length = len(bits)
         if (length != 0) and ((length & (length - 1)) == 0):
-            n0 = Node(0, "", {1: 1}, {})
-            n1 = Node(1, "|", {}, {0: 1})
-            op = OpenDigraph([], [0], [n0, n1])
+            # 0 is the output, 1 the OR, and input x is the node 2x + 3 copied by 2x + 2
             n = int(log2(length))
-            for i in range(n):
-                copy_id = op.add_node()
-                op.add_input_node(copy_id)
+            nodes = {0: "", 1: "^" if form == "esop" else "|"}
+            edges = [(1, 0)]
+            for x in range(n):
+                nodes[2 * (x + 1)] = ""
+                nodes[2 * x + 3] = ""
+                edges.append((2 * x + 3, 2 * (x + 1)))
+            inputs = [2 * x + 3 for x in range(n)]
+
+            if form != "dnf":
+                if form == "sop":
+                    ones = [i for i, bit in enumerate(bits) if bit == "1"]
+                    if n <= EXACT_SOP_INPUTS:
+                        primes = prime_implicants(n, ones)
+                    else:
+                        primes = expand_primes(n, ones)
+                    terms = [
+                        (~mask & (length - 1), ~value & ~mask & (length - 1))
+                        for value, mask in greedy_cover(ones, primes)
+                    ]
+                else:
+                    table = int(bits[::-1], 2)
+                    polarity = esop_polarity(n, table)
+                    spectrum = reed_muller(n, table, polarity)
+                    terms = [
+                        (s, s & polarity) for s in range(length) if (spectrum >> s) & 1
+                    ]
+
+                negations = {}
+
+                def literal(p: int, negated: bool) -> int:
+                    """Returns the signal of the literal of position p"""
+                    copy_id = 2 * (n - p)
+                    if not negated:
+                        return copy_id
+                    if not (p in negations):
+                        not_id = len(nodes)
+                        nodes[not_id] = "~"
+                        nodes[not_id + 1] = ""
+                        edges.append((copy_id, not_id))
+                        edges.append((not_id, not_id + 1))
+                        negations[p] = not_id + 1
+                    return negations[p]
+
+                # A term is the positions of its literals and the negated ones among them
+                for positions, negated in terms:
+                    signals = [
+                        literal(p, bool((negated >> p) & 1))
+                        for p in range(n)
+                        if (positions >> p) & 1
+                    ]
+                    if len(signals) == 1:
+                        edges.append((signals[0], 1))
+                        continue
+                    term_id = len(nodes)
+                    nodes[term_id] = "&" if signals else "1"
+                    edges.append((term_id, 1))
+                    edges += [(signal, term_id) for signal in signals]
+                return OpenDigraph.from_edges(nodes, edges, inputs, [0])
 
             for i, bit in enumerate(bits):
                 if bit == "1":
-                    and_id = op.add_node(label="&", children={1: 1})
-                    bin_i = bin(i)[2:]
-                    for x, bit_i in enumerate("0" * (n - len(bin_i)) + bin_i):
+                    and_id = len(nodes)
+                    nodes[and_id] = "&"
+                    edges.append((and_id, 1))
+                    for x in range(n):
                         copy_id = 2 * (x + 1)
-                        if bit_i == "1":
-                            op.add_node(
-                                label="~",
-                                parents={copy_id: 1},
-                                children={and_id: 1},
-                            )
+                        if not ((i >> (n - 1 - x)) & 1):
+                            not_id = len(nodes)
+                            nodes[not_id] = "~"
+                            edges.append((copy_id, not_id))
+                            edges.append((not_id, and_id))
                         else:
-                            op.add_edge(copy_id, and_id)
-            return op
+                            edges.append((copy_id, and_id))
+            return OpenDigraph.from_edges(nodes, edges, inputs, [0])
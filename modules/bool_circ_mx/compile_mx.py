@@ -0,0 +1,280 @@
+from __future__ import annotations
+from typing import Dict, List, Tuple
+import random
+
+Instruction = Tuple[str, int, Tuple[int, ...]]
+
+
+class CompiledCirc:
+    def __init__(
+        self,
+        n_slots: int,
+        input_slots: List[int],
+        output_slots: List[int],
+        instructions: List[Instruction],
+    ) -> CompiledCirc:
+        """
+        Parameters
+        ----------
+        n_slots : int
+            The number of value slots used by the program
+        input_slots : List[int]
+            The slot of each input of the circuit, in the order of the circuit's inputs
+        output_slots : List[int]
+            The slot read by each output of the circuit, in the order of the circuit's outputs
+        instructions : List[Instruction]
+            Tuples (label, dest, sources) in topological order. label is one of
+            "0", "1", "&", "|", "^" or "~", dest is the slot written and sources
+            are the slots read (repeated according to the edge multiplicities)
+        """
+        self.n_slots = n_slots
+        self.input_slots = input_slots
+        self.output_slots = output_slots
+        self.instructions = instructions
+
+    def __len__(self) -> int:
+        """Returns the number of instructions of the program"""
+        return len(self.instructions)
+
+    def evaluate(self, inputs: List[int], width: int = 1) -> List[int]:
+        """Evaluates the circuit without modifying it
+
+        Each input is a word of width bits, bit k of every word belonging to the
+        k-th assignment, so a single pass evaluates width assignments at once.
+
+        Parameters
+        ----------
+        inputs : List[int]
+            The value of each input of the circuit
+
+        Optionnal Parameters
+        ----------
+        width : int (default 1)
+            The number of assignments packed in each word
+
+        Returns
+        -------
+        outputs : List[int]
+            The value of each output of the circuit, packed like the inputs
+
+        Raises
+        ------
+        Exception
+            Raises an exception if the number of inputs doesn't match the circuit
+        """
+        if len(inputs) != len(self.input_slots):
+            raise Exception(
+                f"Expected {len(self.input_slots)} inputs but {len(inputs)} were given"
+            )
+        mask = (1 << width) - 1
+        values = [0] * self.n_slots
+        for slot, word in zip(self.input_slots, inputs):
+            values[slot] = word & mask
+
+        for label, dest, sources in self.instructions:
+            if label == "&":
+                word = mask
+                for src in sources:
+                    word &= values[src]
+            elif label == "|":
+                word = 0
+                for src in sources:
+                    word |= values[src]
+            elif label == "^":
+                word = 0
+                for src in sources:
+                    word ^= values[src]
+            elif label == "~":
+                word = values[sources[0]] ^ mask
+            elif label == "1":
+                word = mask
+            else:
+                word = 0
+            values[dest] = word
+
+        return [values[slot] for slot in self.output_slots]
+
+    def evaluate_many(self, assignments: List[List[int]]) -> List[List[int]]:
+        """Evaluates the circuit on several assignments in a single bit-parallel pass
+
+        Parameters
+        ----------
+        assignments : List[List[int]]
+            Each assignment is a list of bits, one per input of the circuit
+
+        Returns
+        -------
+        results : List[List[int]]
+            The output bits of each assignment
+        """
+        words = [0] * len(self.input_slots)
+        for k, assignment in enumerate(assignments):
+            if len(assignment) != len(words):
+                raise Exception(
+                    f"Expected {len(words)} inputs but {len(assignment)} were given"
+                )
+            for i, bit in enumerate(assignment):
+                if bit:
+                    words[i] |= 1 << k
+
+        outputs = self.evaluate(words, width=len(assignments))
+        return [[(word >> k) & 1 for word in outputs] for k in range(len(assignments))]
+
+
+class compile_mx:
+    def compile(self) -> CompiledCirc:
+        """Lowers the circuit into a flat program that can be evaluated many times
+
+        Copy nodes don't produce instructions, they share the slot of their parent.
+
+        Returns
+        -------
+        program : CompiledCirc
+            The compiled circuit
+
+        Raises
+        ------
+        Exception
+            Raises an exception if a node has an invalid label or degree
+        """
+        slots = {}
+        input_slots = []
+        for input_id in self.inputs:
+            slots[input_id] = len(input_slots)
+            input_slots.append(len(input_slots))
+        n_slots = len(input_slots)
+
+        instructions = []
+        for level in self.tri_topologique:
+            for node_id in level:
+                node = self.get_node_by_id(node_id)
+                label = node.get_label
+                sources = []
+                for parent_id, multi in node.parents.items():
+                    if not (parent_id in slots):
+                        raise Exception(
+                            f"Parent {parent_id} of node {node_id} isn't computable"
+                        )
+                    sources.extend([slots[parent_id]] * multi)
+
+                if label == "":
+                    if len(sources) != 1:
+                        raise Exception(
+                            f"COPY node {node_id} must have an in degree of exactly 1"
+                        )
+                    slots[node_id] = sources[0]
+                    continue
+                if label == "~" and len(sources) != 1:
+                    raise Exception(
+                        f"NOT node {node_id} must have an in degree of exactly 1"
+                    )
+                if not (label in ["0", "1", "&", "|", "^", "~"]):
+                    raise Exception(f"The label of node {node_id} is invalid")
+
+                instructions.append((label, n_slots, tuple(sources)))
+                slots[node_id] = n_slots
+                n_slots += 1
+
+        output_slots = []
+        for output_id in self.outputs:
+            parent_ids = self.get_node_by_id(output_id).get_parent_ids
+            if len(parent_ids) != 1 or not (parent_ids[0] in slots):
+                raise Exception(f"Output node {output_id} isn't computable")
+            output_slots.append(slots[parent_ids[0]])
+
+        return CompiledCirc(n_slots, input_slots, output_slots, instructions)
+
+    def truth_table(self, chunk_bits: int = 16) -> List[int]:
+        """Computes the truth table of every output of the circuit
+
+        All the 2^n assignments are simulated bit-sliced, 2^chunk_bits at a time,
+        so the memory used by the simulation doesn't depend on n.
+        Assignment i gives to the input x the bit (i >> (n - 1 - x)) & 1,
+        like the strings read by construct_op.
+
+        Optionnal Parameters
+        ----------
+        chunk_bits : int (default 16)
+            Log2 of the number of assignments simulated by each pass, at least 3
+            (a byte) when the circuit has 3 inputs or more
+
+        Returns
+        -------
+        tables : List[int]
+            A bitset per output, bit i being the value of the output for assignment i
+        """
+        program = self.compile()
+        n = len(program.input_slots)
+        k = n if n < 3 else max(3, min(n, chunk_bits))
+        width = 1 << k
+        mask = (1 << width) - 1
+
+        # patterns[p] has bit j set iff bit p of j is set, for p < k
+        patterns = []
+        for p in range(k):
+            pattern = mask ^ ((1 << (1 << p)) - 1)
+            length = 1 << (p + 1)
+            pattern &= (1 << length) - 1
+            while length < width:
+                pattern |= pattern << length
+                length *= 2
+            patterns.append(pattern)
+
+        if n < 3:
+            inputs = [patterns[n - 1 - x] for x in range(n)]
+            return program.evaluate(inputs, width=width)
+
+        chunks = [bytearray() for output in program.output_slots]
+        for c in range(1 << (n - k)):
+            inputs = []
+            for x in range(n):
+                p = n - 1 - x
+                if p < k:
+                    inputs.append(patterns[p])
+                else:
+                    inputs.append(mask if (c >> (p - k)) & 1 else 0)
+            for chunk, word in zip(chunks, program.evaluate(inputs, width=width)):
+                chunk += word.to_bytes(width // 8, "little")
+
+        return [int.from_bytes(chunk, "little") for chunk in chunks]
+
+    def truth_table_bits(self, chunk_bits: int = 16) -> List[str]:
+        """Returns the truth table of every output as a string usable by construct_op"""
+        length = 1 << len(self.inputs)
+        return [
+            format(table, "0" + str(length) + "b")[::-1]
+            for table in self.truth_table(chunk_bits)
+        ]
+
+    def equivalent(self, other: compile_mx, samples: int = 1024) -> bool:
+        """Checks on random assignments that other computes the same function
+
+        Both circuits are compiled and evaluated bit-sliced on the same samples
+        random assignments, so a False answer is certain while a True answer is
+        only likely.
+
+        Parameters
+        ----------
+        other : BoolCirc
+            A circuit with the same number of inputs and outputs
+
+        Optionnal Parameters
+        ----------
+        samples : int (default 1024)
+            The number of random assignments
+
+        Returns
+        -------
+        equivalent : bool
+            True if the outputs of the circuits match on every assignment
+        """
+        program = self.compile()
+        other_program = other.compile()
+        if len(program.input_slots) != len(other_program.input_slots) or len(
+            program.output_slots
+        ) != len(other_program.output_slots):
+            return False
+        inputs = [random.getrandbits(samples) for slot in program.input_slots]
+        return program.evaluate(inputs, width=samples) == other_program.evaluate(
+            inputs, width=samples
+        )
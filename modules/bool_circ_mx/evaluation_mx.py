@@ -7,14 +7,17 @@ from modules.open_digraph import *
 class evaluation_mx:
     @classmethod
     def circ_from_int(cls, n: int, bin_size: int = 8) -> BoolCirc:
-        output = OpenDigraph.empty()
         b = bin(n)[2:]
         while len(b) < bin_size:
             b = "0" + b
-        for digit in b:
-            copy_id = output.add_node()
-            output.add_input_node(copy_id, label=digit)
-        return output
+        # Digit k is the input 2k + 1 feeding the copy node 2k
+        nodes = {}
+        for k, digit in enumerate(b):
+            nodes[2 * k] = ""
+            nodes[2 * k + 1] = digit
+        edges = [(2 * k + 1, 2 * k) for k in range(len(b))]
+        inputs = [2 * k + 1 for k in range(len(b))]
+        return OpenDigraph.from_edges(nodes, edges, inputs)
 
     def copy_rule(self, primitive_id: int, op_id: int) -> None:
         bit = self[primitive_id].get_label
@@ -73,6 +76,7 @@ class evaluation_mx:
             op.set_label("1")
 
     def simplify(self, primitive_id: int, op_id: int, label: str) -> None:
+        self._start_edit()
         if label == "":
             self.copy_rule(primitive_id, op_id)
         if label == "~":
@@ -87,6 +91,7 @@ class evaluation_mx:
             self.neutral_rule(op_id)
 
     def evaluate(self) -> None:
+        self._start_edit()
         # 1) on simplifie les inputs pour pouvoir utiliser le tri
         # topologique
         for input_id in self.get_input_ids.copy():
@@ -0,0 +1,406 @@
+from __future__ import annotations
+from collections import deque
+from heapq import heappop, heappush
+from typing import Dict, Optional, Tuple
+
+from modules.node import Node
+
+# Statistics reported by optimize
+OPTIMIZE_STATS = [
+    "constant_folds",
+    "double_negations",
+    "idempotent_inputs",
+    "xor_pairs",
+    "copies",
+    "dead_nodes",
+    "removed_nodes",
+    "removed_edges",
+]
+
+
+class optimize_mx:
+    def optimize(self) -> Dict[str, int]:
+        """Simplifies the circuit in place without changing the function it computes
+
+        A worklist holds the nodes to look at, and a node is queued again only when
+        one of its neighbours changes, so the pass runs in near-linear time.
+        The rewrites are:
+
+        - constant propagation, even when only some inputs of a gate are constant:
+          neutral constants are dropped, absorbing ones turn the gate into a
+          constant, a 1 read by a XOR becomes a NOT after it, a NOT of a constant
+          becomes a constant
+        - double negations are removed
+        - the repeated inputs of an AND or an OR are read once (idempotence)
+        - the inputs read twice by a XOR cancel each other
+        - gates left with no input become their neutral constant and gates left
+          with one input become copy nodes
+        - copy nodes of copy nodes are merged, copy nodes with a single child
+          are bypassed, and nodes whose value isn't read anymore are removed
+
+        Inputs and outputs are never removed.
+
+        Returns
+        -------
+        stats : Dict[str, int]
+            The number of times each rewrite was applied (see OPTIMIZE_STATS),
+            and the number of nodes and edges removed in total
+        """
+        self._start_edit()
+        nodes = self.nodes
+        inputs = set(self.inputs)
+        boundary = inputs | set(self.outputs)
+        stats = dict.fromkeys(OPTIMIZE_STATS, 0)
+        nodes_before = len(nodes)
+        edges_before = sum(node.out_degree for node in nodes.values())
+
+        # Seeded in topological order, so a copy node is merged into a parent which
+        # is already the root of its copy chain and doesn't gather the children twice
+        order = [node_id for level in self.tri_topologique for node_id in level]
+        seeded = set(order)
+        order += [node_id for node_id in nodes if not (node_id in seeded) and not (node_id in boundary)]
+        worklist = deque(order)
+        queued = set(worklist)
+
+        def push(node_id: int) -> None:
+            if node_id in nodes and not (node_id in boundary) and not (node_id in queued):
+                queued.add(node_id)
+                worklist.append(node_id)
+
+        def link(src: int, tgt: int, multi: int = 1) -> None:
+            src_node = nodes[src]
+            tgt_node = nodes[tgt]
+            src_node.add_child_id(tgt, src_node.children.get(tgt, 0) + multi)
+            tgt_node.add_parent_id(src, tgt_node.parents.get(src, 0) + multi)
+
+        def unlink(src: int, tgt: int) -> None:
+            nodes[src].remove_child_id(tgt)
+            nodes[tgt].remove_parent_id(src)
+            push(src)
+            push(tgt)
+            if src in inputs and nodes[src].out_degree == 0:
+                # an input keeps a child, an unread copy node
+                copy_id = nodes.next_id
+                nodes[copy_id] = Node(copy_id, "", {}, {})
+                link(src, copy_id)
+
+        def is_unread_input(node: Node) -> bool:
+            """Returns True if node is a copy node reading an input"""
+            return node.label == "" and node.in_degree == 1 and next(iter(node.parents)) in inputs
+
+        def remove(node_id: int) -> None:
+            node = nodes[node_id]
+            for parent_id in list(node.parents):
+                unlink(parent_id, node_id)
+            for child_id in list(node.children):
+                unlink(node_id, child_id)
+            del nodes[node_id]
+
+        def constant(node_id: int) -> Optional[str]:
+            """Returns the constant read through node_id and its copy nodes, or None"""
+            node = nodes[node_id]
+            while node.label == "" and not (node.id in boundary) and node.in_degree == 1:
+                node = nodes[next(iter(node.parents))]
+            if node.label in ("0", "1") and not (node.id in boundary):
+                return node.label
+            return None
+
+        while worklist:
+            node_id = worklist.popleft()
+            queued.discard(node_id)
+            if not (node_id in nodes):
+                continue
+            node = nodes[node_id]
+            label = node.label
+
+            if node.out_degree == 0:
+                if is_unread_input(node):
+                    continue
+                remove(node_id)
+                stats["dead_nodes"] += 1
+
+            elif label == "":
+                if node.in_degree != 1:
+                    continue
+                parent_id = next(iter(node.parents))
+                if parent_id in boundary:
+                    continue
+                if nodes[parent_id].label == "" or node.out_degree == 1:
+                    # the parent takes the children of the copy node
+                    children = node.children.copy()
+                    remove(node_id)
+                    for child_id, multi in children.items():
+                        link(parent_id, child_id, multi)
+                    stats["copies"] += 1
+
+            elif label == "~":
+                if node.in_degree != 1:
+                    continue
+                parent_id = next(iter(node.parents))
+                bit = constant(parent_id)
+                parent = nodes[parent_id]
+                if bit is not None:
+                    unlink(parent_id, node_id)
+                    node.set_label("0" if bit == "1" else "1")
+                    stats["constant_folds"] += 1
+                    for child_id in node.children:
+                        push(child_id)
+                elif (
+                    parent.label == "~"
+                    and not (parent_id in boundary)
+                    and parent.in_degree == 1
+                    and node.out_degree == 1
+                ):
+                    grand_parent_id = next(iter(parent.parents))
+                    child_id = next(iter(node.children))
+                    multi = node.children[child_id]
+                    link(grand_parent_id, child_id, multi)
+                    remove(node_id)
+                    remove(parent_id)
+                    stats["double_negations"] += 1
+
+            elif label in ("&", "|", "^"):
+                absorbing = None
+                parity = 0
+                for parent_id, multi in list(node.parents.items()):
+                    bit = constant(parent_id)
+                    if bit is not None:
+                        unlink(parent_id, node_id)
+                        stats["constant_folds"] += 1
+                        if (label == "&" and bit == "0") or (label == "|" and bit == "1"):
+                            absorbing = bit
+                        elif label == "^" and bit == "1":
+                            parity ^= multi & 1
+                    elif multi > 1:
+                        keep = 1 if label != "^" else multi % 2
+                        if keep:
+                            nodes[parent_id].add_child_id(node_id, keep)
+                            node.add_parent_id(parent_id, keep)
+                        else:
+                            unlink(parent_id, node_id)
+                        if label == "^":
+                            stats["xor_pairs"] += multi // 2
+                        else:
+                            stats["idempotent_inputs"] += multi - 1
+
+                if absorbing is not None:
+                    for parent_id in list(node.parents):
+                        unlink(parent_id, node_id)
+                    node.set_label(absorbing)
+                    for child_id in node.children:
+                        push(child_id)
+                    continue
+
+                if parity and node.out_degree == 1:
+                    # x ^ 1 = ~x, the NOT is inserted between the gate and its child
+                    child_id = next(iter(node.children))
+                    multi = node.children[child_id]
+                    not_id = nodes.next_id
+                    nodes[not_id] = Node(not_id, "~", {}, {})
+                    unlink(node_id, child_id)
+                    link(node_id, not_id)
+                    link(not_id, child_id, multi)
+                    push(not_id)
+
+                if node.in_degree == 0:
+                    node.set_label("1" if label == "&" else "0")
+                    stats["constant_folds"] += 1
+                    for child_id in node.children:
+                        push(child_id)
+                elif node.in_degree == 1:
+                    node.set_label("")
+                    push(node_id)
+
+        self.invalidate_levels()
+        self.invalidate_components()
+        stats["removed_nodes"] = nodes_before - len(nodes)
+        stats["removed_edges"] = edges_before - sum(node.out_degree for node in nodes.values())
+        return stats
+
+    def structural_hashing(self) -> int:
+        """Merges the identical gates of the circuit in a single topological sweep
+
+        Two nodes are identical when they have the same label and read the same
+        multiset of signals, a signal being the node read through copy nodes.
+        Every node keeps the first node found identical to it, whose value is
+        fanned out to the readers of the others through a copy node.
+        Copy nodes left without children are kept, optimize removes them.
+
+        Returns
+        -------
+        merged : int
+            The number of nodes merged into an identical one
+        """
+        self._start_edit()
+        nodes = self.nodes
+        boundary = set(self.inputs) | set(self.outputs)
+        table = {}
+        merged = 0
+
+        def link(src: int, tgt: int, multi: int = 1) -> None:
+            src_node = nodes[src]
+            tgt_node = nodes[tgt]
+            src_node.add_child_id(tgt, src_node.children.get(tgt, 0) + multi)
+            tgt_node.add_parent_id(src, tgt_node.parents.get(src, 0) + multi)
+
+        def unlink(src: int, tgt: int) -> None:
+            nodes[src].remove_child_id(tgt)
+            nodes[tgt].remove_parent_id(src)
+
+        def signal(node_id: int) -> int:
+            """Returns the node read through node_id and its copy nodes"""
+            node = nodes[node_id]
+            while node.label == "" and not (node.id in boundary) and node.in_degree == 1:
+                node = nodes[next(iter(node.parents))]
+            return node.id
+
+        def fanout(node_id: int) -> int:
+            """Returns a copy node reading node_id, which can take more children"""
+            node = nodes[node_id]
+            if node.out_degree == 1:
+                child_id = next(iter(node.children))
+                if nodes[child_id].label == "" and not (child_id in boundary):
+                    return child_id
+            copy_id = nodes.next_id
+            nodes[copy_id] = Node(copy_id, "", {}, {})
+            for child_id, multi in list(node.children.items()):
+                unlink(node_id, child_id)
+                link(copy_id, child_id, multi)
+            link(node_id, copy_id)
+            return copy_id
+
+        for level in self.tri_topologique:
+            for node_id in level:
+                if not (node_id in nodes):
+                    continue
+                node = nodes[node_id]
+                label = node.label
+                if not (label in ("0", "1", "&", "|", "^", "~")):
+                    continue
+                counts = {}
+                for parent_id, multi in node.parents.items():
+                    parent_signal = signal(parent_id)
+                    counts[parent_signal] = counts.get(parent_signal, 0) + multi
+                key = (label, tuple(sorted(counts.items())))
+                existing = table.setdefault(key, node_id)
+                if existing == node_id:
+                    continue
+
+                copy_id = fanout(existing)
+                for child_id, multi in list(node.children.items()):
+                    unlink(node_id, child_id)
+                    link(copy_id, child_id, multi)
+                for parent_id in list(node.parents):
+                    unlink(parent_id, node_id)
+                del nodes[node_id]
+                merged += 1
+
+        self.invalidate_levels()
+        self.invalidate_components()
+        return merged
+
+    def balance(self, arity: Optional[int] = 2) -> Tuple[int, int]:
+        """Rebuilds the chains of AND, OR and XOR gates as balanced trees
+
+        A tree is a gate and the gates of the same label read only by it, through
+        edges of multiplicity 1. The tree is rebuilt by merging first its leaves
+        available the earliest, so a chain like x0 & (x1 & (x2 & ...)) becomes a
+        tree of logarithmic depth. A tree is only rebuilt if its root gets earlier.
+        The function of the circuit doesn't change.
+
+        Optionnal Parameters
+        ----------
+        arity : int (default 2)
+            The maximum number of inputs of the rebuilt gates, None for no maximum
+            (a tree then becomes a single gate)
+
+        Returns
+        -------
+        depths : Tuple[int, int]
+            The depth of the circuit before and after the pass
+        """
+        if arity is not None and arity < 2:
+            raise Exception(f"The arity must be at least 2, not {arity}")
+        depth_before = self.depth
+        levels = self.tri_topologique
+        self._start_edit()
+        nodes = self.nodes
+        boundary = set(self.inputs) | set(self.outputs)
+        # the level of each node, the inputs being just above the first level
+        arrival = dict.fromkeys(self.inputs, -1)
+
+        def is_absorbed(node) -> bool:
+            """Returns True if node belongs to the tree of its only child"""
+            if node.out_degree != 1 or node.id in boundary:
+                return False
+            child_id, multi = next(iter(node.children.items()))
+            return multi == 1 and nodes[child_id].label == node.label and not (child_id in boundary)
+
+        for level in levels:
+            for node_id in level:
+                node = nodes[node_id]
+                arrival[node_id] = max((arrival[parent_id] for parent_id in node.parents), default=-1) + 1
+                if not (node.label in ("&", "|", "^")) or is_absorbed(node):
+                    continue
+
+                gates = []
+                leaves = []
+                stack = [node_id]
+                while stack:
+                    gate_id = stack.pop()
+                    gates.append(gate_id)
+                    for parent_id, multi in nodes[gate_id].parents.items():
+                        parent = nodes[parent_id]
+                        if parent.label == node.label and is_absorbed(parent):
+                            stack.append(parent_id)
+                        else:
+                            leaves += [parent_id] * multi
+                if len(gates) == 1:
+                    continue
+
+                # Huffman-like merge of the leaves by arrival, giving the root arrival
+                heap = [(arrival[leaf_id], k, leaf_id) for k, leaf_id in enumerate(leaves)]
+                groups = []
+                root_arrival = 0
+                while True:
+                    size = len(heap) if arity is None else min(arity, len(heap))
+                    group = [heappop(heap) for i in range(size)]
+                    root_arrival = max((item[0] for item in group), default=-1) + 1
+                    groups.append(group)
+                    if not heap:
+                        break
+                    heappush(heap, (root_arrival, len(leaves) + len(groups), -len(groups)))
+                if root_arrival >= arrival[node_id]:
+                    continue
+
+                for gate_id in gates:
+                    for parent_id in list(nodes[gate_id].parents):
+                        nodes[parent_id].remove_child_id(gate_id)
+                        nodes[gate_id].remove_parent_id(parent_id)
+                # the signal -(k + 1) is the gate reading groups[k], the last one is the root
+                spare = [gate_id for gate_id in gates if gate_id != node_id]
+                gate_ids = []
+                for k, group in enumerate(groups):
+                    if k == len(groups) - 1:
+                        gate_id = node_id
+                    elif spare:
+                        gate_id = spare.pop()
+                    else:
+                        gate_id = nodes.next_id
+                        nodes[gate_id] = Node(gate_id, node.label, {}, {})
+                    gate_ids.append(gate_id)
+                    gate = nodes[gate_id]
+                    for _, _, signal in group:
+                        src_id = signal if signal >= 0 else gate_ids[-signal - 1]
+                        src = nodes[src_id]
+                        src.add_child_id(gate_id, src.children.get(gate_id, 0) + 1)
+                        gate.add_parent_id(src_id, gate.parents.get(src_id, 0) + 1)
+                    arrival[gate_id] = max((item[0] for item in group), default=-1) + 1
+                for gate_id in spare:
+                    for child_id in list(nodes[gate_id].children):
+                        nodes[child_id].remove_parent_id(gate_id)
+                    del nodes[gate_id]
+
+        self.invalidate_levels()
+        self.invalidate_components()
+        return depth_before, self.depth
@@ -0,0 +1,151 @@
+from __future__ import annotations
+from typing import Dict, List
+
+from modules.node import Node
+from modules.open_digraph import OpenDigraph
+
+GATE_LABELS = ["&", "|", "^", "~"]
+
+
+class CircBuilder:
+    """Builds a boolean circuit gate by gate without going through OpenDigraph edits
+
+    Every signal is a copy node, so a signal can feed any number of gates and
+    outputs while each gate keeps an out degree of exactly 1.
+    Ids are allocated consecutively from 0.
+    The labels, arities and signals given to the builder are checked, so the
+    circuits it builds are well formed and aren't validated again by BoolCirc.
+    """
+
+    def __init__(self, hash_consing: bool = False) -> CircBuilder:
+        """
+        Optionnal Parameters
+        ----------
+        hash_consing : bool (default False)
+            If True, a gate or constant identical to one already built (same label
+            and same multiset of signals) isn't added again, its signal is reused
+        """
+        self.nodes = {}
+        self.inputs = []
+        self.outputs = []
+        self.hash_consing = hash_consing
+        self._table = {}
+        self._signals = set()
+
+    def _node(self, label: str, parents: Dict[int, int]) -> int:
+        """Adds a node of given label and parents, returns its id"""
+        node_id = len(self.nodes)
+        self.nodes[node_id] = Node(node_id, label, parents, {})
+        for parent_id, multi in parents.items():
+            self.nodes[parent_id].add_child_id(node_id, multi)
+        return node_id
+
+    def _signal(self, label: str, parents: Dict[int, int]) -> int:
+        """Adds a node of given label and parents followed by a copy node, returns the copy node"""
+        signal = self._node("", {self._node(label, parents): 1})
+        self._signals.add(signal)
+        return signal
+
+    def _check_signals(self, signals: List[int]) -> None:
+        """Raises a ValueError if one of signals wasn't returned by the builder"""
+        for signal in signals:
+            if not (signal in self._signals):
+                raise ValueError(f"{signal} isn't a signal of the circuit")
+
+    def input(self) -> int:
+        """Adds an input to the circuit and returns its signal"""
+        input_id = self._node("", {})
+        self.inputs.append(input_id)
+        signal = self._node("", {input_id: 1})
+        self._signals.add(signal)
+        return signal
+
+    def output(self, signal: int) -> int:
+        """Adds an output reading signal to the circuit and returns its id"""
+        self._check_signals([signal])
+        output_id = self._node("", {signal: 1})
+        self.outputs.append(output_id)
+        return output_id
+
+    def _consed_signal(self, label: str, parents: Dict[int, int]) -> int:
+        """Same as _signal, reusing the signal of an identical node if hash_consing is on"""
+        if not self.hash_consing:
+            return self._signal(label, parents)
+        key = (label, tuple(sorted(parents.items())))
+        if not (key in self._table):
+            self._table[key] = self._signal(label, parents)
+        return self._table[key]
+
+    def constant(self, bit: int) -> int:
+        """Returns a signal of constant value bit, 0 or 1"""
+        if not (bit in [0, 1]):
+            raise ValueError(f"Invalid constant {bit}, expected 0 or 1")
+        return self._consed_signal(str(bit), {})
+
+    def gate(self, label: str, *signals: int) -> int:
+        """Adds a gate of given label reading signals and returns its output signal
+
+        Parameters
+        ----------
+        label : str
+            One of "&", "|", "^" or "~"
+        signals : int
+            The signals read by the gate, repeated signals become multiplicities
+
+        Returns
+        -------
+        signal : int
+            The output signal of the gate. A single signal given to "&", "|" or "^"
+            is returned as is. With hash_consing, an identical gate built before
+            gives its signal
+
+        Raises
+        ------
+        ValueError
+            Raises a ValueError if label is unknown, if "~" isn't given exactly
+            one signal or if a signal wasn't returned by the builder
+        """
+        if not (label in GATE_LABELS):
+            raise ValueError(f"Invalid gate label {label!r}, expected one of {GATE_LABELS}")
+        if label == "~" and len(signals) != 1:
+            raise ValueError(f"A NOT gate reads exactly 1 signal, not {len(signals)}")
+        self._check_signals(signals)
+        if len(signals) == 1 and label != "~":
+            return signals[0]
+        parents = {}
+        for signal in signals:
+            parents[signal] = parents.get(signal, 0) + 1
+        return self._consed_signal(label, parents)
+
+    def and_(self, *signals: int) -> int:
+        """Returns the signal of the AND of signals"""
+        return self.gate("&", *signals)
+
+    def or_(self, *signals: int) -> int:
+        """Returns the signal of the OR of signals"""
+        return self.gate("|", *signals)
+
+    def xor(self, *signals: int) -> int:
+        """Returns the signal of the XOR of signals"""
+        return self.gate("^", *signals)
+
+    def not_(self, signal: int) -> int:
+        """Returns the signal of the negation of signal"""
+        return self.gate("~", signal)
+
+    def build(self, cls: type = OpenDigraph) -> OpenDigraph:
+        """Returns the circuit built so far
+
+        Optionnal Parameters
+        ----------
+        cls : type (default OpenDigraph)
+            The class of the returned graph, OpenDigraph or BoolCirc (or a subclass),
+            which doesn't check the circuit again
+
+        Returns
+        -------
+        OpenDigraph
+            The circuit, sharing its nodes with the builder
+        """
+        graph = OpenDigraph(list(self.inputs), list(self.outputs), self.nodes.values())
+        return graph if cls is OpenDigraph else cls._from_valid(graph)
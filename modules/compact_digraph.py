@@ -0,0 +1,562 @@
+from __future__ import annotations
+from array import array
+from collections.abc import Mapping
+from typing import Dict, Iterator, List
+import mmap
+import operator
+import struct
+import sys
+
+from modules.node import Node
+from modules.open_digraph import OpenDigraph
+from modules.open_digraph_mx.matrix_mx import matrix_mx
+from modules.open_digraph_mx.depth_mx import depth_mx
+
+# Binary format: a 64 bytes header followed by the arrays below, each padded to
+# a multiple of 8 bytes, all integers being little-endian
+BINARY_MAGIC = b"ODGB"
+BINARY_VERSION = 1
+BINARY_HEADER = struct.Struct("<4sI5Q")
+BINARY_HEADER_SIZE = 64
+# (attribute, typecode, length) where the length is computed from the counts
+# n_nodes, n_edges, n_labels, n_inputs and n_outputs of the header
+BINARY_SECTIONS = [
+    ("ids", "q", lambda n, m, l, i, o: n),
+    ("label_index", "i", lambda n, m, l, i, o: n),
+    ("out_offsets", "q", lambda n, m, l, i, o: n + 1),
+    ("out_targets", "i", lambda n, m, l, i, o: m),
+    ("out_multis", "i", lambda n, m, l, i, o: m),
+    ("in_offsets", "q", lambda n, m, l, i, o: n + 1),
+    ("in_sources", "i", lambda n, m, l, i, o: m),
+    ("in_multis", "i", lambda n, m, l, i, o: m),
+    ("inputs", "q", lambda n, m, l, i, o: i),
+    ("outputs", "q", lambda n, m, l, i, o: o),
+    ("label_offsets", "q", lambda n, m, l, i, o: l + 1),
+]
+
+
+def padding(size: int) -> int:
+    """Returns the number of bytes needed to align size on 8 bytes"""
+    return -size % 8
+
+
+def valid_offsets(offsets, total: int) -> bool:
+    """Returns True if offsets start at 0, never decrease and end at total"""
+    return (
+        offsets[0] == 0
+        and offsets[-1] == total
+        and all(map(operator.le, offsets[:-1], offsets[1:]))
+    )
+
+
+def valid_indices(indices, bound: int) -> bool:
+    """Returns True if all the indices are between 0 and bound - 1"""
+    return len(indices) == 0 or (min(indices) >= 0 and max(indices) < bound)
+
+
+class CompactNode:
+    """Read-only view of a node of a CompactDigraph, offering the accessors of Node"""
+
+    __slots__ = ("graph", "index")
+
+    def __init__(self, graph: CompactDigraph, index: int) -> CompactNode:
+        """
+        Parameters
+        ----------
+        graph : CompactDigraph
+            The graph the node belongs to
+        index : int
+            The position of the node in the arrays of the graph
+        """
+        self.graph = graph
+        self.index = index
+
+    def __str__(self) -> str:
+        """Returns a string representation of the node"""
+        return str(self.graph.node_at(self.index))
+
+    def __repr__(self) -> str:
+        """Returns a string representation of the node"""
+        return str(self)
+
+    def _neighbours(self, offsets, targets, multis) -> Dict[int, int]:
+        """Maps the ids of the neighbours stored in the CSR arrays to their multiplicity"""
+        ids = self.graph.ids
+        return {
+            ids[targets[k]]: multis[k]
+            for k in range(offsets[self.index], offsets[self.index + 1])
+        }
+
+    @property
+    def id(self) -> int:
+        """Returns the id of the node"""
+        return self.graph.ids[self.index]
+
+    @property
+    def label(self) -> str:
+        """Returns the label of the node"""
+        return self.graph.labels[self.graph.label_index[self.index]]
+
+    @property
+    def parents(self) -> Dict[int, int]:
+        """Maps the ids of the parents of the node to their multiplicity"""
+        graph = self.graph
+        return self._neighbours(graph.in_offsets, graph.in_sources, graph.in_multis)
+
+    @property
+    def children(self) -> Dict[int, int]:
+        """Maps the ids of the children of the node to their multiplicity"""
+        graph = self.graph
+        return self._neighbours(graph.out_offsets, graph.out_targets, graph.out_multis)
+
+    @property
+    def get_id(self) -> int:
+        """Returns the id of the node"""
+        return self.id
+
+    @property
+    def get_label(self) -> str:
+        """Returns the label of the node"""
+        return self.label
+
+    @property
+    def get_parent_ids(self) -> List[int]:
+        """Returns a list of the ids of all the parents of the node"""
+        graph = self.graph
+        ids = graph.ids
+        sources = graph.in_sources
+        offsets = graph.in_offsets
+        return [ids[sources[k]] for k in range(offsets[self.index], offsets[self.index + 1])]
+
+    @property
+    def get_children_ids(self) -> List[int]:
+        """Returns a list of the ids of all the children of the node"""
+        graph = self.graph
+        ids = graph.ids
+        targets = graph.out_targets
+        offsets = graph.out_offsets
+        return [ids[targets[k]] for k in range(offsets[self.index], offsets[self.index + 1])]
+
+    @property
+    def has_parents(self) -> bool:
+        """Returns True if the node has parents"""
+        return self.graph.in_offsets[self.index] != self.graph.in_offsets[self.index + 1]
+
+    @property
+    def has_children(self) -> bool:
+        """Returns True if the node has children"""
+        return self.graph.out_offsets[self.index] != self.graph.out_offsets[self.index + 1]
+
+    @property
+    def in_degree(self) -> int:
+        """Returns the in-degree of the node"""
+        offsets = self.graph.in_offsets
+        return sum(self.graph.in_multis[offsets[self.index] : offsets[self.index + 1]])
+
+    @property
+    def out_degree(self) -> int:
+        """Returns the out-degree of the node"""
+        offsets = self.graph.out_offsets
+        return sum(self.graph.out_multis[offsets[self.index] : offsets[self.index + 1]])
+
+    @property
+    def degree(self) -> int:
+        """Returns the degree of the node"""
+        return self.out_degree + self.in_degree
+
+    @property
+    def copy(self) -> Node:
+        """Returns a mutable Node copy of the node"""
+        return self.graph.node_at(self.index)
+
+
+class CompactNodeMap(Mapping):
+    """Read-only mapping from the node ids of a CompactDigraph to CompactNode views"""
+
+    def __init__(self, graph: CompactDigraph) -> CompactNodeMap:
+        """
+        Parameters
+        ----------
+        graph : CompactDigraph
+            The graph whose nodes are mapped
+        """
+        self.graph = graph
+
+    def __getitem__(self, node_id: int) -> CompactNode:
+        """Returns a view of the node of id node_id"""
+        return CompactNode(self.graph, self.graph.position(node_id))
+
+    def __contains__(self, node_id: int) -> bool:
+        """Returns True if the graph has a node of id node_id"""
+        try:
+            self.graph.position(node_id)
+        except KeyError:
+            return False
+        return True
+
+    def __iter__(self) -> Iterator[int]:
+        """Iterates over the node ids in order"""
+        return iter(self.graph.ids)
+
+    def __len__(self) -> int:
+        """Returns the number of nodes"""
+        return len(self.graph.ids)
+
+
+class CompactDigraph(matrix_mx, depth_mx):
+    """Read-only open digraph storing its edges in CSR (children) and CSC (parents) arrays
+
+    Node i of the arrays has id ids[i] and label labels[label_index[i]].
+    Its children are the positions out_targets[out_offsets[i]:out_offsets[i + 1]]
+    with multiplicities out_multis[...], and likewise for its parents with the in_ arrays.
+    """
+
+    def __init__(
+        self,
+        ids: array,
+        labels: List[str],
+        label_index: array,
+        out_offsets: array,
+        out_targets: array,
+        out_multis: array,
+        in_offsets: array,
+        in_sources: array,
+        in_multis: array,
+        inputs: List[int],
+        outputs: List[int],
+    ) -> CompactDigraph:
+        """
+        Parameters
+        ----------
+        ids : array
+            The id of the node at each position
+        labels : List[str]
+            The interned labels
+        label_index : array
+            The index in labels of the label of the node at each position
+        out_offsets, out_targets, out_multis : array
+            The CSR arrays of the children
+        in_offsets, in_sources, in_multis : array
+            The CSC arrays of the parents
+        inputs : List[int]
+            The ids of the nodes that are inputs
+        outputs : List[int]
+            The ids of the nodes that are outputs
+        """
+        self.ids = ids
+        self.labels = labels
+        self.label_index = label_index
+        self.out_offsets = out_offsets
+        self.out_targets = out_targets
+        self.out_multis = out_multis
+        self.in_offsets = in_offsets
+        self.in_sources = in_sources
+        self.in_multis = in_multis
+        self.inputs = inputs
+        self.outputs = outputs
+
+        # When the ids are contiguous positions are computed instead of stored
+        n = len(ids)
+        if all(ids[i] == ids[0] + i for i in range(n)):
+            self._base = ids[0] if n else 0
+            self._positions = None
+        else:
+            self._base = None
+            self._positions = {node_id: i for i, node_id in enumerate(ids)}
+        self._nodes = CompactNodeMap(self)
+        self._buffer = None
+
+    @classmethod
+    def from_open_digraph(cls, digraph: OpenDigraph) -> CompactDigraph:
+        """Creates a compact copy of an open digraph
+
+        Parameters
+        ----------
+        digraph : OpenDigraph
+            The open digraph to convert
+
+        Returns
+        -------
+        CompactDigraph
+            The compact digraph, whose nodes and neighbours keep the order of digraph
+        """
+        ids = array("q", digraph.nodes)
+        positions = {node_id: i for i, node_id in enumerate(ids)}
+
+        labels = []
+        interned = {}
+        label_index = array("i")
+        out_offsets, out_targets, out_multis = array("q", [0]), array("i"), array("i")
+        in_offsets, in_sources, in_multis = array("q", [0]), array("i"), array("i")
+        for node in digraph.nodes.values():
+            label = node.label
+            if not (label in interned):
+                interned[label] = len(labels)
+                labels.append(label)
+            label_index.append(interned[label])
+
+            for child_id, multi in node.children.items():
+                out_targets.append(positions[child_id])
+                out_multis.append(multi)
+            out_offsets.append(len(out_targets))
+
+            for parent_id, multi in node.parents.items():
+                in_sources.append(positions[parent_id])
+                in_multis.append(multi)
+            in_offsets.append(len(in_sources))
+
+        return cls(
+            ids,
+            labels,
+            label_index,
+            out_offsets,
+            out_targets,
+            out_multis,
+            in_offsets,
+            in_sources,
+            in_multis,
+            list(digraph.inputs),
+            list(digraph.outputs),
+        )
+
+    def to_open_digraph(self, cls: type = OpenDigraph) -> OpenDigraph:
+        """Materializes the compact digraph into an open digraph
+
+        Optionnal Parameters
+        ----------
+        cls : type (default OpenDigraph)
+            The class of the returned graph, must be OpenDigraph or a subclass
+
+        Returns
+        -------
+        OpenDigraph
+            A mutable copy of the compact digraph
+        """
+        ids = list(self.ids)
+        labels = [self.labels[k] for k in self.label_index]
+        out_offsets, out_multis = list(self.out_offsets), list(self.out_multis)
+        in_offsets, in_multis = list(self.in_offsets), list(self.in_multis)
+        out_ids = [ids[k] for k in self.out_targets]
+        in_ids = [ids[k] for k in self.in_sources]
+
+        nodes = []
+        for i in range(len(ids)):
+            a, b = in_offsets[i], in_offsets[i + 1]
+            c, d = out_offsets[i], out_offsets[i + 1]
+            parents = dict(zip(in_ids[a:b], in_multis[a:b]))
+            children = dict(zip(out_ids[c:d], out_multis[c:d]))
+            nodes.append(Node(ids[i], labels[i], parents, children))
+
+        digraph = OpenDigraph(list(self.inputs), list(self.outputs), nodes)
+        return digraph if cls is OpenDigraph else cls(digraph)
+
+    def save(self, path: str) -> None:
+        """Saves the compact digraph in the binary format
+
+        The file starts with a header holding BINARY_MAGIC, BINARY_VERSION and the
+        number of nodes, edges, labels, inputs and outputs, followed by the arrays
+        of BINARY_SECTIONS and the utf-8 encoded labels, each aligned on 8 bytes.
+
+        Parameters
+        ----------
+        path : str
+            The path of the file
+        """
+        encoded = [label.encode("utf-8") for label in self.labels]
+        label_offsets = array("q", [0])
+        for label in encoded:
+            label_offsets.append(label_offsets[-1] + len(label))
+        header = BINARY_HEADER.pack(
+            BINARY_MAGIC,
+            BINARY_VERSION,
+            len(self.ids),
+            len(self.out_targets),
+            len(self.labels),
+            len(self.inputs),
+            len(self.outputs),
+        )
+
+        with open(path, "wb") as file:
+            file.write(header + bytes(BINARY_HEADER_SIZE - len(header)))
+            for name, typecode, length in BINARY_SECTIONS:
+                values = label_offsets if name == "label_offsets" else getattr(self, name)
+                data = array(typecode, values)
+                if sys.byteorder == "big":
+                    data.byteswap()
+                file.write(data)
+                file.write(bytes(padding(len(data) * data.itemsize)))
+            file.write(b"".join(encoded))
+
+    @classmethod
+    def load(cls, path: str) -> CompactDigraph:
+        """Loads a compact digraph saved with save
+
+        The file is memory-mapped and the arrays of the graph are read-only views
+        of the mapping, so loading doesn't copy nor parse the edges.
+        On big-endian machines the arrays are copied and byte-swapped instead.
+
+        Parameters
+        ----------
+        path : str
+            The path of the file
+
+        Returns
+        -------
+        CompactDigraph
+            The read-only compact digraph, use to_open_digraph to get a mutable copy
+
+        Raises
+        ------
+        Exception
+            Raises an exception if the file isn't in the binary format, has
+            an unsupported version, is truncated or if its arrays are inconsistent
+            (offsets out of order, edges or labels out of range)
+        """
+        with open(path, "rb") as file:
+            file.seek(0, 2)
+            if file.tell() < BINARY_HEADER_SIZE:
+                raise Exception(f"{path} isn't a binary digraph file")
+            buffer = mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ)
+        view = memoryview(buffer)
+        views = [view]
+        try:
+            if view[:4] != BINARY_MAGIC:
+                raise Exception(f"{path} isn't a binary digraph file")
+            magic, version, *counts = BINARY_HEADER.unpack_from(view)
+            if version != BINARY_VERSION:
+                raise Exception(f"Unsupported binary digraph version {version}")
+
+            sections = {}
+            offset = BINARY_HEADER_SIZE
+            for name, typecode, length in BINARY_SECTIONS:
+                size = length(*counts) * array(typecode).itemsize
+                if offset + size > len(view):
+                    raise Exception(f"{path} is truncated")
+                views.append(view[offset : offset + size])
+                sections[name] = views[-1].cast(typecode)
+                views.append(sections[name])
+                if sys.byteorder == "big":
+                    sections[name] = array(typecode, sections[name])
+                    sections[name].byteswap()
+                offset += size + padding(size)
+
+            label_offsets = sections.pop("label_offsets")
+            if offset + label_offsets[-1] > len(view):
+                raise Exception(f"{path} is truncated")
+            n_nodes, n_edges, n_labels = counts[:3]
+            if not (
+                valid_offsets(sections["out_offsets"], n_edges)
+                and valid_offsets(sections["in_offsets"], n_edges)
+                and valid_offsets(label_offsets, label_offsets[-1])
+                and valid_indices(sections["out_targets"], n_nodes)
+                and valid_indices(sections["in_sources"], n_nodes)
+                and valid_indices(sections["label_index"], n_labels)
+            ):
+                raise Exception(f"{path} isn't a valid binary digraph file")
+            blob = view[offset : offset + label_offsets[-1]]
+            views.append(blob)
+            labels = [
+                str(blob[label_offsets[k] : label_offsets[k + 1]], "utf-8")
+                for k in range(len(label_offsets) - 1)
+            ]
+            sections["inputs"] = list(sections["inputs"])
+            sections["outputs"] = list(sections["outputs"])
+        except BaseException:
+            # the mapping can only be closed once every view of it is released
+            for values in reversed(views):
+                values.release()
+            buffer.close()
+            raise
+
+        graph = cls(labels=labels, **sections)
+        graph._buffer = buffer
+        return graph
+
+    def close(self) -> None:
+        """Releases the memory mapping of a compact digraph returned by load
+
+        The compact digraph mustn't be used afterwards.
+        """
+        if self._buffer is None:
+            return
+        for name, typecode, length in BINARY_SECTIONS[:-1]:
+            values = getattr(self, name)
+            if isinstance(values, memoryview):
+                values.release()
+        self._buffer.close()
+        self._buffer = None
+
+    def position(self, node_id: int) -> int:
+        """Returns the position in the arrays of the node of id node_id
+
+        Raises
+        ------
+        KeyError
+            Raises a KeyError if there is no node of id node_id
+        """
+        if self._positions is not None:
+            return self._positions[node_id]
+        i = node_id - self._base
+        if not (0 <= i < len(self.ids)):
+            raise KeyError(node_id)
+        return i
+
+    def node_at(self, i: int) -> Node:
+        """Returns a mutable Node copy of the node at position i"""
+        view = CompactNode(self, i)
+        return Node(view.id, view.label, view.parents, view.children)
+
+    def __getitem__(self, node_id: int) -> CompactNode:
+        """Returns the node of id node_id in the compact digraph"""
+        return self.nodes[node_id]
+
+    def __str__(self) -> str:
+        """Returns a string representation of the compact digraph"""
+        return str(self.to_open_digraph())
+
+    def __repr__(self) -> str:
+        """Returns a string representation of the compact digraph"""
+        return str(self)
+
+    @property
+    def nodes(self) -> CompactNodeMap:
+        """Maps the id of each node of the compact digraph to a view of the node"""
+        return self._nodes
+
+    @property
+    def is_empty(self) -> bool:
+        """Returns True if the compact digraph is empty"""
+        return len(self.ids) == 0
+
+    @property
+    def copy(self) -> OpenDigraph:
+        """Returns a mutable OpenDigraph copy of the compact digraph"""
+        return self.to_open_digraph()
+
+    @property
+    def get_input_ids(self) -> List[int]:
+        """Returns the inputs of the compact digraph"""
+        return self.inputs
+
+    @property
+    def get_output_ids(self) -> List[int]:
+        """Returns the outputs of the compact digraph"""
+        return self.outputs
+
+    @property
+    def get_nodes(self) -> List[CompactNode]:
+        """Returns a list of all the nodes in the compact digraph"""
+        return [CompactNode(self, i) for i in range(len(self.ids))]
+
+    @property
+    def get_node_ids(self) -> List[int]:
+        """Returns a list of all the nodes id in the compact digraph"""
+        return list(self.ids)
+
+    def get_node_by_id(self, node_id: int) -> CompactNode:
+        """Returns the node of id node_id in the compact digraph"""
+        return self.nodes[node_id]
+
+    def get_nodes_by_ids(self, ids: List[int]) -> List[CompactNode]:
+        """Returns a list of the nodes of given ids in the compact digraph"""
+        return [self.get_node_by_id(node_id) for node_id in ids]
@@ -0,0 +1,393 @@
+from __future__ import annotations
+from collections.abc import MutableSequence
+from typing import Dict, Iterable, Iterator, List
+
+
+class NodeMap(dict):
+    """Dict mapping node ids to nodes which keeps track of a fresh id
+
+    next_id only grows: it is bumped whenever a key greater or equal to it is
+    inserted, so it is never the id of a node of the map, even after direct edits.
+    version is incremented by every insertion or deletion, so caches built from
+    the map can tell when they are outdated.
+    """
+
+    next_id = 0
+    version = 0
+
+    def __init__(self, *args, **kwargs) -> NodeMap:
+        """Takes the same arguments as dict"""
+        super().__init__(*args, **kwargs)
+        self.next_id = max(self, default=-1) + 1
+
+    def __setitem__(self, node_id: int, node) -> None:
+        """Maps node_id to node and bumps next_id if needed"""
+        super().__setitem__(node_id, node)
+        self.version += 1
+        if node_id >= self.next_id:
+            self.next_id = node_id + 1
+
+    def __delitem__(self, node_id: int) -> None:
+        """Removes node_id from the map"""
+        super().__delitem__(node_id)
+        self.version += 1
+
+    def pop(self, *args):
+        """Same as dict.pop"""
+        self.version += 1
+        return super().pop(*args)
+
+    def popitem(self):
+        """Same as dict.popitem"""
+        self.version += 1
+        return super().popitem()
+
+    def clear(self) -> None:
+        """Same as dict.clear"""
+        self.version += 1
+        super().clear()
+
+    def update(self, *args, **kwargs) -> None:
+        """Same as dict.update, bumping next_id if needed"""
+        for node_id, node in dict(*args, **kwargs).items():
+            self[node_id] = node
+
+    def setdefault(self, node_id: int, node=None):
+        """Same as dict.setdefault, bumping next_id if needed"""
+        if not (node_id in self):
+            self[node_id] = node
+        return self[node_id]
+
+    def copy(self) -> NodeMap:
+        """Returns a shallow copy of the map keeping its next_id"""
+        output = NodeMap(self)
+        output.next_id = self.next_id
+        return output
+
+
+_REMOVED = object()
+
+
+class PortList(MutableSequence):
+    """List of the ids of the inputs or outputs of an open digraph
+
+    A dict maps each id to its slot in the list, so membership and removal are
+    O(1). Removed ids leave a tombstone, counted in a Fenwick tree over the slots,
+    so the position of an id and the id at a position are found in O(log n).
+    The tombstones are swept away once they fill half of the slots.
+    The ids are unique: unlike a list, adding an id already in the list raises
+    a ValueError. A PortList compares equal to the list of its ids.
+    version is incremented by every change of the list, so caches depending on
+    the ports can tell when they are outdated.
+    """
+
+    version = 0
+
+    def __init__(self, ids: Iterable[int] = ()) -> PortList:
+        """
+        Optionnal Parameters
+        ----------
+        ids : Iterable[int] (default ())
+            The ids of the ports, in order
+        """
+        self._items = []
+        self._positions = {}
+        self._tree = [0]
+        self._removed = 0
+        self.extend(ids)
+
+    def _compact(self) -> None:
+        """Sweeps away the tombstones left by remove"""
+        if self._removed:
+            self._items = [port_id for port_id in self._items if port_id is not _REMOVED]
+            self._positions = {port_id: i for i, port_id in enumerate(self._items)}
+            self._tree = [0] * (len(self._items) + 1)
+            self._removed = 0
+
+    def _removed_before(self, slot: int) -> int:
+        """Returns the number of tombstones in the slots before slot"""
+        tree = self._tree
+        count = 0
+        while slot > 0:
+            count += tree[slot]
+            slot -= slot & -slot
+        return count
+
+    def _slot(self, i: int) -> int:
+        """Returns the slot of the id at position i, in O(log n)"""
+        i = range(len(self._positions))[i]
+        if not self._removed:
+            return i
+        tree = self._tree
+        slot = 0
+        remaining = i + 1
+        step = 1 << (len(tree) - 1).bit_length()
+        while step:
+            upper = slot + step
+            if upper < len(tree) and step - tree[upper] < remaining:
+                slot = upper
+                remaining -= step - tree[upper]
+            step >>= 1
+        return slot
+
+    def __len__(self) -> int:
+        """Returns the number of ports"""
+        return len(self._positions)
+
+    def __iter__(self) -> Iterator[int]:
+        """Iterates over the ids in order, as they were when the iteration started"""
+        self._compact()
+        return iter(self._items.copy())
+
+    def __contains__(self, port_id: int) -> bool:
+        """Returns True if port_id is in the list, in O(1)"""
+        return port_id in self._positions
+
+    def __getitem__(self, i):
+        """Returns the id at position i, or a list of ids if i is a slice"""
+        if isinstance(i, slice):
+            self._compact()
+            return self._items[i]
+        return self._items[self._slot(i)]
+
+    def __setitem__(self, i, port_id: int) -> None:
+        """Replaces the id at position i by port_id
+
+        Raises
+        ------
+        ValueError
+            Raises a ValueError if port_id is already elsewhere in the list
+        """
+        if isinstance(i, slice):
+            self._compact()
+            items = self._items.copy()
+            items[i] = port_id
+            self.clear()
+            self.extend(items)
+            return
+        slot = self._slot(i)
+        old_id = self._items[slot]
+        if port_id != old_id and port_id in self._positions:
+            raise ValueError(f"{port_id} is already a port")
+        del self._positions[old_id]
+        self.version += 1
+        self._items[slot] = port_id
+        self._positions[port_id] = slot
+
+    def __delitem__(self, i) -> None:
+        """Removes the id at position i, or the ids of the slice i"""
+        removed = self[i]
+        for port_id in removed if isinstance(i, slice) else [removed]:
+            self.remove(port_id)
+
+    def __eq__(self, other) -> bool:
+        """Returns True if other is a list or PortList of the same ids in the same order"""
+        if isinstance(other, (list, PortList)):
+            return list(self) == list(other)
+        return NotImplemented
+
+    __hash__ = None
+
+    def __add__(self, other: Iterable[int]) -> List[int]:
+        """Returns the list of the ids of self followed by other"""
+        return list(self) + list(other)
+
+    def __iadd__(self, other: Iterable[int]) -> PortList:
+        """Appends the ids of other"""
+        self.extend(other)
+        return self
+
+    def __str__(self) -> str:
+        """Returns a string representation of the list"""
+        return str(list(self))
+
+    def __repr__(self) -> str:
+        """Returns a string representation of the list"""
+        return str(self)
+
+    def insert(self, i: int, port_id: int) -> None:
+        """Inserts port_id before position i, in O(n)
+
+        Raises
+        ------
+        ValueError
+            Raises a ValueError if port_id is already in the list
+        """
+        if port_id in self._positions:
+            raise ValueError(f"{port_id} is already a port")
+        self._compact()
+        self.version += 1
+        self._items.insert(i, port_id)
+        self._positions = {port_id: i for i, port_id in enumerate(self._items)}
+        self._tree = [0] * (len(self._items) + 1)
+
+    def append(self, port_id: int) -> None:
+        """Adds port_id at the end of the list
+
+        Raises
+        ------
+        ValueError
+            Raises a ValueError if port_id is already in the list
+        """
+        if port_id in self._positions:
+            raise ValueError(f"{port_id} is already a port")
+        self.version += 1
+        self._positions[port_id] = len(self._items)
+        self._items.append(port_id)
+        # the new node of the tree covers the slots (size - lowbit(size), size]
+        size = len(self._items)
+        if self._removed:
+            self._tree.append(self._removed_before(size - 1) - self._removed_before(size - (size & -size)))
+        else:
+            self._tree.append(0)
+
+    def extend(self, ids: Iterable[int]) -> None:
+        """Adds the ids at the end of the list"""
+        for port_id in list(ids):
+            self.append(port_id)
+
+    def remove(self, port_id: int) -> None:
+        """Removes port_id from the list in O(log n)
+
+        Raises
+        ------
+        ValueError
+            Raises a ValueError if port_id isn't in the list, like list.remove
+        """
+        if not (port_id in self._positions):
+            raise ValueError(f"{port_id} is not in the list")
+        self.version += 1
+        slot = self._positions.pop(port_id)
+        items = self._items
+        tree = self._tree
+        items[slot] = _REMOVED
+        self._removed += 1
+        slot += 1
+        while slot < len(tree):
+            tree[slot] += 1
+            slot += slot & -slot
+        while items and items[-1] is _REMOVED:
+            items.pop()
+            tree.pop()
+            self._removed -= 1
+        if 2 * self._removed > len(items):
+            self._compact()
+
+    def index(self, port_id: int, *args) -> int:
+        """Returns the position of port_id, in O(log n)
+
+        Raises
+        ------
+        ValueError
+            Raises a ValueError if port_id isn't in the list, like list.index
+        """
+        if not (port_id in self._positions):
+            raise ValueError(f"{port_id} is not in the list")
+        slot = self._positions[port_id]
+        return slot - self._removed_before(slot)
+
+    def pop(self, i: int = -1) -> int:
+        """Removes and returns the id at position i"""
+        port_id = self[i]
+        self.remove(port_id)
+        return port_id
+
+    def clear(self) -> None:
+        """Removes all the ids"""
+        self.version += 1
+        self._items = []
+        self._positions = {}
+        self._tree = [0]
+        self._removed = 0
+
+    def copy(self) -> PortList:
+        """Returns a copy of the list"""
+        return PortList(self)
+
+    def reverse(self) -> None:
+        """Reverses the list in place"""
+        self._compact()
+        self.version += 1
+        self._items.reverse()
+        self._positions = {port_id: i for i, port_id in enumerate(self._items)}
+
+    def sort(self, *args, **kwargs) -> None:
+        """Sorts the list in place, takes the same arguments as list.sort"""
+        self._compact()
+        self.version += 1
+        self._items.sort(*args, **kwargs)
+        self._positions = {port_id: i for i, port_id in enumerate(self._items)}
+
+
+class UnionFind:
+    """Disjoint sets over hashable items, with union by size and path compression
+
+    find and union run in quasi-constant amortized time and never recurse, so
+    they work on components of any size. Items are added on the fly by find
+    and union.
+    """
+
+    def __init__(self, items: Iterable = ()) -> None:
+        """
+        Optionnal Parameters
+        ----------
+        items : Iterable (default ())
+            The items, each one in its own set
+        """
+        self._parent = {item: item for item in items}
+        self._size = dict.fromkeys(self._parent, 1)
+        self.count = len(self._parent)
+
+    def __len__(self) -> int:
+        """Returns the number of items"""
+        return len(self._parent)
+
+    def __contains__(self, item) -> bool:
+        """Returns True if item is in one of the sets"""
+        return item in self._parent
+
+    def add(self, item) -> None:
+        """Adds item in its own set if it isn't in a set yet"""
+        if not (item in self._parent):
+            self._parent[item] = item
+            self._size[item] = 1
+            self.count += 1
+
+    def find(self, item):
+        """Returns the representative of the set of item, compressing the path to it"""
+        parent = self._parent
+        if not (item in parent):
+            self.add(item)
+            return item
+        root = item
+        while parent[root] != root:
+            root = parent[root]
+        while parent[item] != root:
+            parent[item], item = root, parent[item]
+        return root
+
+    def union(self, a, b) -> bool:
+        """Merges the sets of a and b, returns False if they were already the same set"""
+        a = self.find(a)
+        b = self.find(b)
+        if a == b:
+            return False
+        size = self._size
+        if size[a] < size[b]:
+            a, b = b, a
+        self._parent[b] = a
+        size[a] += size.pop(b)
+        self.count -= 1
+        return True
+
+    def connected(self, a, b) -> bool:
+        """Returns True if a and b are in the same set"""
+        return self.find(a) == self.find(b)
+
+    def copy(self) -> UnionFind:
+        """Returns a copy of the sets"""
+        output = UnionFind()
+        output._parent = self._parent.copy()
+        output._size = self._size.copy()
+        output.count = self.count
+        return output
@@ -1,2 +1,30 @@
-class IntegrityError(Exception()):
-    pass
+from typing import List, Tuple
+
+
+class IntegrityError(Exception):
+    def __init__(self, violations: List[Tuple[int, str]]) -> None:
+        """
+        Parameters
+        ----------
+        violations : List[Tuple[int, str]]
+            The id of the node at fault and the description of every violation found
+        """
+        super().__init__("\n".join(description for node_id, description in violations))
+        self.violations = violations
+
+
+class ParseError(Exception):
+    def __init__(self, message: str, line: int, column: int) -> None:
+        """
+        Parameters
+        ----------
+        message : str
+            The description of the error
+        line : int
+            The line of the error, starting at 1
+        column : int
+            The column of the error, starting at 1
+        """
+        super().__init__(f"line {line}, column {column}: {message}")
+        self.line = line
+        self.column = column
@@ -1,9 +1,17 @@
 from __future__ import annotations
-from copy import deepcopy
 from typing import Dict, List
 
 
 class Node:
+    """Node of an open digraph
+
+    The in and out degrees are kept up to date by the methods of the node, so
+    the parents and children dicts must only be modified through them
+    (or replaced as a whole).
+    """
+
+    __slots__ = ("id", "label", "_parents", "_children", "_in_degree", "_out_degree")
+
     def __init__(
         self,
         identity: int,
@@ -29,6 +37,28 @@ class Node:
         self.parents = parents
         self.children = children
 
+    @property
+    def parents(self) -> Dict[int, int]:
+        """Maps the ids of the parents of the node to their multiplicity"""
+        return self._parents
+
+    @parents.setter
+    def parents(self, new_parents: Dict[int, int]) -> None:
+        """Replaces the parents of the node, recomputing its in degree"""
+        self._parents = new_parents
+        self._in_degree = sum(new_parents.values())
+
+    @property
+    def children(self) -> Dict[int, int]:
+        """Maps the ids of the children of the node to their multiplicity"""
+        return self._children
+
+    @children.setter
+    def children(self, new_children: Dict[int, int]) -> None:
+        """Replaces the children of the node, recomputing its out degree"""
+        self._children = new_children
+        self._out_degree = sum(new_children.values())
+
     def __str__(self) -> str:
         """Returns a string representation of the node"""
         return (
@@ -59,8 +89,15 @@ class Node:
 
     @property
     def copy(self) -> Node:
-        """Returns a copy of the node"""
-        return deepcopy(self)
+        """Returns a copy of the node, its parents and children dicts being copied"""
+        output = Node.__new__(Node)
+        output.id = self.id
+        output.label = self.label
+        output._parents = self._parents.copy()
+        output._children = self._children.copy()
+        output._in_degree = self._in_degree
+        output._out_degree = self._out_degree
+        return output
 
     @property
     def get_id(self) -> int:
@@ -100,49 +137,47 @@ class Node:
 
     def add_child_id(self, new_child_id: int, multi: int = 1) -> None:
         """Adds a new child to the node of id new_child_id and multiplicty multi (default is 1)"""
-        self.children[new_child_id] = multi
+        self._out_degree += multi - self._children.get(new_child_id, 0)
+        self._children[new_child_id] = multi
 
     def add_parent_id(self, new_parent_id: int, multi: int = 1) -> None:
         """Adds a new parent to the node of id new_parent_id and multiplicty multi (default is 1)"""
-        self.parents[new_parent_id] = multi
+        self._in_degree += multi - self._parents.get(new_parent_id, 0)
+        self._parents[new_parent_id] = multi
 
     def remove_parent_once(self, parent_id: int) -> None:
         """Reduces by 1 the multiplicty of the node's parent of id parent_id or removes it if the multiplicity was 1"""
-        if self.parents[parent_id] > 1:
-            self.parents[parent_id] -= 1
+        if self._parents[parent_id] > 1:
+            self._parents[parent_id] -= 1
         else:
-            del self.parents[parent_id]
+            del self._parents[parent_id]
+        self._in_degree -= 1
 
     def remove_child_once(self, child_id: int) -> None:
         """Reduces by 1 the multiplicty of the node's child of id child_id or removes it if the multiplicity was 1"""
-        if self.children[child_id] > 2:
-            self.children[child_id] -= 1
+        if self._children[child_id] > 1:
+            self._children[child_id] -= 1
         else:
-            del self.children[child_id]
+            del self._children[child_id]
+        self._out_degree -= 1
 
     def remove_parent_id(self, parent_id: int) -> None:
         """Removes the parent of id parent_id from the node's parents"""
-        del self.parents[parent_id]
+        self._in_degree -= self._parents.pop(parent_id)
 
     def remove_child_id(self, child_id: int) -> None:
         """Removes the child of id child_id from the node's children"""
-        del self.children[child_id]
+        self._out_degree -= self._children.pop(child_id)
 
     @property
     def in_degree(self) -> int:
         """Returns the in-degree of the node"""
-        degree = 0
-        for parent_id in self.parents:
-            degree += self.parents[parent_id]
-        return degree
+        return self._in_degree
 
     @property
     def out_degree(self) -> int:
         """Returns the out-degree of the node"""
-        degree = 0
-        for child_id in self.children:
-            degree += self.children[child_id]
-        return degree
+        return self._out_degree
 
     @property
     def degree(self) -> int:
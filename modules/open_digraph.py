@@ -1,7 +1,6 @@
 from __future__ import annotations
-from typing import Dict, List, Tuple
-from copy import deepcopy
-import itertools
+from array import array
+from typing import Dict, Iterable, List, Tuple, Union
 import sys
 import os
 
@@ -9,6 +8,7 @@ root = os.path.normpath(os.path.join(__file__, "./../.."))
 sys.path.append(root)
 
 from modules.node import *
+from modules.containers import *
 from modules.exception import *
 from modules.open_digraph_mx.matrix_mx import *
 from modules.open_digraph_mx.display_mx import *
@@ -16,6 +16,35 @@ from modules.open_digraph_mx.bool_circ_mx import *
 from modules.open_digraph_mx.depth_mx import *
 
 Matrix = List[List[int]]
+# An edge (src, tgt) of multiplicity 1 or (src, tgt, multi)
+Edge = Union[Tuple[int, int], Tuple[int, int, int]]
+
+
+def count_edges(edges: Union[Iterable[Edge], Dict[Tuple[int, int], int]]) -> Dict[Tuple[int, int], int]:
+    """Merges edges into a dict mapping each edge (src, tgt) to its total multiplicity
+
+    Parameters
+    ----------
+    edges : Iterable[Edge] or Dict[Tuple[int, int], int]
+        Pairs (src, tgt) counting once, triples (src, tgt, multi), or a dict
+        already mapping edges to multiplicities. Null multiplicities are dropped
+
+    Returns
+    -------
+    Dict[Tuple[int, int], int]
+        The multiplicity of each edge
+    """
+    if isinstance(edges, dict):
+        return {edge: multi for edge, multi in edges.items() if multi != 0}
+    counts = {}
+    for edge in edges:
+        if len(edge) == 2:
+            counts[edge] = counts.get(edge, 0) + 1
+        else:
+            src, tgt, multi = edge
+            if multi != 0:
+                counts[(src, tgt)] = counts.get((src, tgt), 0) + multi
+    return counts
 
 
 class OpenDigraph(
@@ -35,9 +64,46 @@ class OpenDigraph(
             The nodes of the open digraph
         """
 
+        self._shared = None
         self.inputs = inputs
         self.outputs = outputs
-        self.nodes = {node.id: node for node in nodes}
+        self.nodes = NodeMap((node.id, node) for node in nodes)
+
+    @property
+    def inputs(self) -> PortList:
+        """The ids of the input nodes, in order"""
+        return self._inputs
+
+    @inputs.setter
+    def inputs(self, new_inputs: List[int]) -> None:
+        """Sets the inputs of the open digraph, lists are wrapped into a PortList"""
+        self._inputs = new_inputs if isinstance(new_inputs, PortList) else PortList(new_inputs)
+        self.invalidate_levels()
+
+    @property
+    def outputs(self) -> PortList:
+        """The ids of the output nodes, in order"""
+        return self._outputs
+
+    @outputs.setter
+    def outputs(self, new_outputs: List[int]) -> None:
+        """Sets the outputs of the open digraph, lists are wrapped into a PortList"""
+        self._outputs = new_outputs if isinstance(new_outputs, PortList) else PortList(new_outputs)
+        self.invalidate_levels()
+
+    @property
+    def nodes(self) -> NodeMap:
+        """Maps the id of each node of the open digraph to the node"""
+        return self._nodes
+
+    @nodes.setter
+    def nodes(self, new_nodes: Dict[int, Node]) -> None:
+        """Sets the node map of the open digraph, keeping track of a fresh id"""
+        if self._shared is not None:
+            self._shared[0] -= 1
+            self._shared = None
+        self._nodes = new_nodes if isinstance(new_nodes, NodeMap) else NodeMap(new_nodes)
+        self.invalidate_levels()
 
     def __getitem__(self, node_id) -> Node:
         """Returns the node of id node_id in the open digraph"""
@@ -61,11 +127,22 @@ class OpenDigraph(
 
     @classmethod
     def random(
-        cls, n: int, bound: int, inputs: int = 0, outputs: int = 0, form: str = "free"
+        cls,
+        n: int,
+        bound: int,
+        inputs: int = 0,
+        outputs: int = 0,
+        form: str = "free",
+        p: float = None,
+        out_degree: int = None,
     ) -> OpenDigraph:
         """
         Returns a random open digraph with n nodes between 0 and bound and with inputs and outputs
 
+        By default every pair of nodes is drawn (dense generation, O(n^2)).
+        Given p or out_degree, only the edges of the graph are drawn, which allows
+        graphs of 10^5 to 10^6 nodes. In both cases the graph is built in bulk.
+
         Parameters
         ----------
         n : int
@@ -77,43 +154,136 @@ class OpenDigraph(
         outputs : int
             The number of outputs of the open digraph
         form : str
-            The form of the open digraph. It can be "free", "DAG", "loop-free", "undirected" or "loop-free-undirected"
+            The form of the open digraph. It can be "free", "DAG", "oriented", "loop-free", "undirected" or "loop-free undirected"
+
+        Optionnal Parameters
+        ----------
+        p : float (default None)
+            If given, each edge exists with probability p (Erdos-Renyi) and its
+            multiplicity is drawn between 1 and bound
+        out_degree : int (default None)
+            If given, form must be "DAG" and each node gets out_degree distinct
+            children among the nodes of greater id (or all of them if there are fewer)
 
         Returns
         -------
         OpenDigraph
             The random open digraph
+
+        Raises
+        ------
+        Exception
+            Raises an exception if form is unknown or doesn't allow out_degree
         """
-        if form == "free":
-            digraph = cls.graph_from_adjacency_matrix(random_matrix(n, bound))
-        elif form == "DAG":
-            digraph = cls.graph_from_adjacency_matrix(
-                random_matrix(n, bound, null_diag=True, triangular=True)
-            )
-        elif form == "oriented":
-            digraph = cls.graph_from_adjacency_matrix(
-                random_matrix(n, bound, oriented=True)
-            )
-        elif form == "loop-free":
-            digraph = cls.graph_from_adjacency_matrix(
-                random_matrix(n, bound, null_diag=True)
-            )
-        elif form == "undirected":
-            digraph = cls.graph_from_adjacency_matrix(
-                random_matrix(n, bound, symetric=True)
+        forms = ["free", "DAG", "oriented", "loop-free", "undirected", "loop-free undirected"]
+        if not (form in forms):
+            raise Exception(f"Unknown form {form}, expected one of {forms}")
+
+        if out_degree is not None:
+            if form != "DAG":
+                raise Exception(f"out_degree is only available for DAGs, not {form}")
+            edges = random_dag_edges(n, out_degree, bound)
+        elif p is not None:
+            edges = random_edges(
+                n,
+                p,
+                bound,
+                null_diag=form != "free",
+                triangular=form in ["DAG", "oriented", "undirected", "loop-free undirected"],
             )
-        elif form == "loop-free undirected":
-            digraph = cls.graph_from_adjacency_matrix(
-                random_matrix(n, bound, null_diag=True, symetric=True)
+            if form == "oriented":
+                edges = {
+                    ((i, j) if random.random() < 0.5 else (j, i)): multi
+                    for (i, j), multi in edges.items()
+                }
+            elif form in ["undirected", "loop-free undirected"]:
+                for (i, j), multi in list(edges.items()):
+                    edges[(j, i)] = multi
+                if form == "undirected":
+                    for i in range(n):
+                        if random.random() < p:
+                            edges[(i, i)] = random.randint(1, bound) if bound > 1 else 1
+        else:
+            matrix = random_matrix(
+                n,
+                bound,
+                null_diag=form in ["DAG", "loop-free", "loop-free undirected"],
+                symetric=form in ["undirected", "loop-free undirected"],
+                oriented=form == "oriented",
+                triangular=form == "DAG",
             )
+            edges = {
+                (i, j): multi
+                for i, row in enumerate(matrix)
+                for j, multi in enumerate(row)
+                if multi != 0
+            }
+
+        input_ids = list(range(n, n + inputs))
+        output_ids = list(range(n + inputs, n + inputs + outputs))
+        if n > 0:
+            for input_id in input_ids:
+                edges[(input_id, random.randrange(n))] = 1
+            for output_id in output_ids:
+                edges[(random.randrange(n), output_id)] = 1
+        return cls.from_edges(range(n + inputs + outputs), edges, input_ids, output_ids)
+
+    @classmethod
+    def from_edges(
+        cls,
+        nodes: Union[Dict[int, str], Iterable[int]],
+        edges: Union[Iterable[Edge], Dict[Tuple[int, int], int]],
+        inputs: List[int] = (),
+        outputs: List[int] = (),
+    ) -> OpenDigraph:
+        """Creates an open digraph in one pass from its nodes and edges
 
-        length = len(digraph.nodes) - 1
+        Repeated edges are merged into multiplicities before any node is built,
+        which is much faster than add_node and add_edge calls.
 
-        for input in range(inputs):
-            digraph.add_input_node(random.randint(0, length))
-        for output in range(outputs):
-            digraph.add_output_node(random.randint(0, length))
-        return digraph
+        Parameters
+        ----------
+        nodes : Dict[int, str] or Iterable[int]
+            The label of each node id, or the node ids if all the labels are empty
+        edges : Iterable[Edge] or Dict[Tuple[int, int], int]
+            The edges, see count_edges
+
+        Optionnal Parameters
+        ----------
+        inputs : List[int] (default ())
+            The ids of the nodes that are inputs
+        outputs : List[int] (default ())
+            The ids of the nodes that are outputs
+
+        Returns
+        -------
+        OpenDigraph
+            The open digraph, of class cls
+
+        Raises
+        ------
+        Exception
+            Raises an exception if an edge uses an unknown node
+        """
+        labels = nodes if isinstance(nodes, dict) else dict.fromkeys(nodes, "")
+        parents = {identity: {} for identity in labels}
+        children = {identity: {} for identity in labels}
+        counts = edges if isinstance(edges, dict) else count_edges(edges)
+        for (src, tgt), multi in counts.items():
+            if multi == 0:
+                continue
+            try:
+                children[src][tgt] = multi
+                parents[tgt][src] = multi
+            except KeyError:
+                raise Exception(f"Edge ({src}, {tgt}) uses an unknown node") from None
+
+        nodes = [
+            Node(identity, label, parents[identity], children[identity])
+            for identity, label in labels.items()
+        ]
+        graph = OpenDigraph(list(inputs), list(outputs), nodes)
+        return graph if cls is OpenDigraph else cls(graph)
 
     @classmethod
     def graph_from_adjacency_matrix(cls, matrix: Matrix) -> OpenDigraph:
@@ -129,56 +299,153 @@ class OpenDigraph(
         OpenDigraph
             The open digraph created from the adjacency matrix
         """
-        digraph = OpenDigraph.empty()
-        n = len(matrix)
-        for i in range(n):
-            digraph.add_node()
-        for i, j in itertools.product(range(n), range(n)):
-            multi = matrix[i][j]
-            if multi != 0:
-                for k in range(multi):
-                    digraph.add_edge(i, j)
-        return digraph
+        edges = (
+            (i, j, multi)
+            for i, row in enumerate(matrix)
+            for j, multi in enumerate(row)
+            if multi != 0
+        )
+        return OpenDigraph.from_edges(range(len(matrix)), edges)
+
+    @classmethod
+    def graph_from_sparse(
+        cls,
+        matrix: Tuple[array, array, array],
+        form: str = "coo",
+        n: int = None,
+        ids: List[int] = None,
+    ) -> OpenDigraph:
+        """Creates an open digraph from a sparse adjacency matrix, the inverse of coo_matrix and csr_matrix
+
+        Parameters
+        ----------
+        matrix : Tuple[array, array, array]
+            The (rows, columns, values) arrays of a COO matrix, or the
+            (offsets, columns, values) arrays of a CSR matrix. Any sequences of
+            integers are accepted. Repeated COO entries are summed
+
+        Optionnal Parameters
+        ----------
+        form : str (default "coo")
+            The form of matrix, "coo" or "csr"
+        n : int (default None)
+            The number of nodes. By default the number of rows of a CSR matrix,
+            or one more than the greatest index of a COO matrix
+        ids : List[int] (default None)
+            The id of the node of each index, range(n) by default. Giving
+            list(digraph.enumerate_digraph) gives back the ids of digraph
+
+        Returns
+        -------
+        OpenDigraph
+            The open digraph, without inputs nor outputs and with empty labels
+
+        Raises
+        ------
+        Exception
+            Raises an exception if form is unknown or if ids doesn't have n ids
+        """
+        first, columns, values = matrix
+        if form == "coo":
+            rows = first
+            if n is None:
+                n = max(max(rows, default=-1), max(columns, default=-1)) + 1
+        elif form == "csr":
+            if n is None:
+                n = len(first) - 1
+            rows = []
+            for i in range(len(first) - 1):
+                rows.extend([i] * (first[i + 1] - first[i]))
+        else:
+            raise Exception(f"Unknown sparse form {form}, expected coo or csr")
+        ids = range(n) if ids is None else ids
+        if len(ids) != n:
+            raise Exception(f"Expected {n} ids but {len(ids)} were given")
+
+        edges = zip(map(ids.__getitem__, rows), map(ids.__getitem__, columns), values)
+        return OpenDigraph.from_edges(ids, edges)
 
     @classmethod
     def from_dot_file(cls, path: str) -> OpenDigraph:
-        """Creates an open digraph from a dot file"""
-        graph = cls.empty()
-        with open(path, "r") as file:
-            lines = file.readlines()
-
-            for line in lines[1:]:
-                if "label" in line:
-                    identity = int(line[line.find("v") + 1 : line.find("[") - 1])
-                    label = line[line.find("=") + 2 : line.find("]") - 1]
-                    node = Node(identity, label, {}, {})
-                    graph.nodes[node.id] = node
-
-                if "color=blue" in line:
-                    input_id = int(line[line.find("v") + 1 : line.find("[") - 1])
-                    graph.add_input_id(input_id)
-
-                if "color=red" in line:
-                    output_id = int(line[line.find("v") + 1 : line.find("[") - 1])
-                    graph.add_output_id(output_id)
-
-            for line in lines[1:]:
-                if "->" in line:
-                    src = int(line[line.find("v") + 1 : line.find("->") - 1])
-                    tgt = int(line[line.find("->") + 4 : line.find(";")])
-                    graph.add_edge(src, tgt)
-
-        return graph
+        """Creates an open digraph from a dot file
+
+        The file is read in a single streaming pass (see parse_dot) and the
+        adjacency is built in bulk, parallel edges becoming multiplicities.
+        Files whose path ends with .gz are decompressed on the fly.
+
+        Raises
+        ------
+        ParseError
+            Raises a ParseError with the line and column of the first syntax error
+        """
+        with open_dot(path) as file:
+            labels, inputs, outputs, edges = parse_dot(file)
+        return cls.from_edges(labels, edges, inputs, outputs)
 
     @property
     def is_empty(self) -> bool:
         """Returns True if the open digraph is empty"""
         return self.nodes == {}
 
+    def _clone(self, nodes: NodeMap) -> OpenDigraph:
+        """Returns a graph of the same class and attributes as self with the given node map"""
+        output = object.__new__(type(self))
+        output.__dict__.update(self.__dict__)
+        output._inputs = self.inputs.copy()
+        output._outputs = self.outputs.copy()
+        output._nodes = nodes
+        return output
+
     @property
     def copy(self) -> OpenDigraph:
-        """Returns a copy of the open digraph"""
-        return deepcopy(self)
+        """Returns a copy of the open digraph
+
+        The node table and the adjacency dicts are copied directly, which is much
+        faster than deepcopy. The cached level index is kept.
+        """
+        nodes = NodeMap({node_id: node.copy for node_id, node in self.nodes.items()})
+        nodes.next_id = self.nodes.next_id
+        output = self._clone(nodes)
+        output._shared = None
+        index = self._cached_level_index()
+        output._level_cache = None if index is None else (output._levels_version(), dict(index))
+        return output
+
+    @property
+    def copy_on_write(self) -> OpenDigraph:
+        """Returns a copy of the open digraph sharing its nodes with self
+
+        The copy is made in O(inputs + outputs). The first graph modifying the
+        shared nodes through its methods takes its own copy of them beforehand
+        (see unshare), so read-only copies never pay for the node table.
+        Nodes of a shared graph mustn't be edited directly before calling unshare.
+        """
+        if self._shared is None:
+            self._shared = [1]
+        self._shared[0] += 1
+        return self._clone(self.nodes)
+
+    def _start_edit(self) -> None:
+        """Called first by the methods modifying the nodes: takes own nodes if they
+        are shared (see unshare)"""
+        if self._shared is not None:
+            self.unshare()
+
+    def unshare(self) -> None:
+        """Gives the open digraph its own nodes if it shares them since copy_on_write"""
+        shared = self._shared
+        if shared is None:
+            return
+        self._shared = None
+        shared[0] -= 1
+        if shared[0] == 0:
+            return  # the other graphs have dropped the nodes already
+
+        nodes = NodeMap({node_id: node.copy for node_id, node in self._nodes.items()})
+        nodes.next_id = self._nodes.next_id
+        index = self._cached_level_index()
+        self._nodes = nodes
+        self._level_cache = None if index is None else (self._levels_version(), dict(index))
 
     @property
     def get_input_ids(self) -> List[int]:
@@ -219,26 +486,27 @@ class OpenDigraph(
     def set_input_ids(self, new_inputs_ids: List[int]) -> None:
         """Sets the open digraph input ids to new_inputs_ids"""
         self.inputs = new_inputs_ids
+        self.invalidate_levels()
 
     def set_output_ids(self, new_outputs_ids: List[int]) -> None:
         """Sets the open digraph output ids to new_outputs_ids"""
         self.outputs = new_outputs_ids
+        self.invalidate_levels()
 
     def add_input_id(self, new_input_id: int) -> None:
         """Adds new_input_id to the open digraph's input ids"""
         self.inputs.append(new_input_id)
+        self.invalidate_levels()
 
     def add_output_id(self, new_output_id: int) -> None:
         """Adds new_output_id to the open digraph's output ids"""
         self.outputs.append(new_output_id)
+        self.invalidate_levels()
 
     @property
     def new_id(self) -> int:
         """Returns a new id unused by any node of the open digraph"""
-        if self.is_empty:
-            return 0
-        else:
-            return max(self.nodes) + 1
+        return self.nodes.next_id
 
     @property
     def random_op(self) -> Node:
@@ -266,14 +534,45 @@ class OpenDigraph(
         tgt : int
             The id of the target node
         """
+        self._start_edit()
         tgt_node = self[tgt]
         src_node = self[src]
-        if src in tgt_node.parents and tgt in src_node.children:
-            tgt_node.parents[src] += 1
-            src_node.children[tgt] += 1
-        else:
-            tgt_node.parents[src] = 1
-            src_node.children[tgt] = 1
+        tgt_node.add_parent_id(src, tgt_node.parents.get(src, 0) + 1)
+        src_node.add_child_id(tgt, src_node.children.get(tgt, 0) + 1)
+        self._levels_add_edge(src, tgt)
+        self._components_add_edge(src, tgt)
+
+    def add_edges_bulk(
+        self, edges: Union[Iterable[Edge], Dict[Tuple[int, int], int]]
+    ) -> None:
+        """Adds many edges at once, repeated edges being merged into multiplicities first
+
+        Parameters
+        ----------
+        edges : Iterable[Edge] or Dict[Tuple[int, int], int]
+            The edges to add, see count_edges
+
+        Raises
+        ------
+        Exception
+            Raises an exception if an edge uses an unknown node, in which case
+            no edge is added
+        """
+        self._start_edit()
+        counts = count_edges(edges)
+        nodes = self.nodes
+        for src, tgt in counts:
+            if not (src in nodes) or not (tgt in nodes):
+                raise Exception(f"Edge ({src}, {tgt}) uses an unknown node")
+
+        for (src, tgt), multi in counts.items():
+            tgt_node = nodes[tgt]
+            src_node = nodes[src]
+            tgt_node.add_parent_id(src, tgt_node.parents.get(src, 0) + multi)
+            src_node.add_child_id(tgt, src_node.children.get(tgt, 0) + multi)
+        for src, tgt in counts:
+            self._levels_add_edge(src, tgt)
+            self._components_add_edge(src, tgt)
 
     def add_node(
         self,
@@ -297,18 +596,21 @@ class OpenDigraph(
         node_id : int
             The id of the new node
         """
+        self._start_edit()
         parents = {} if parents is None else parents
         children = {} if children is None else children
 
         new_id = self.new_id
         new_node = Node(new_id, label, {}, {})
+        index = self._cached_level_index()
+        components = self._cached_components()
         self.nodes[new_id] = new_node
-        for parent_id in list(parents.keys()):
-            for multi in range(parents[parent_id]):
-                self.add_edge(parent_id, new_id)
-        for child_id in list(children.keys()):
-            for multi in range(children[child_id]):
-                self.add_edge(new_id, child_id)
+        self._levels_add_node(new_id, index)
+        self._components_add_node(new_id, components)
+        self.add_edges_bulk(
+            [(parent_id, new_id, multi) for parent_id, multi in parents.items()]
+            + [(new_id, child_id, multi) for child_id, multi in children.items()]
+        )
 
         return new_id
 
@@ -322,17 +624,16 @@ class OpenDigraph(
             Arguments should be tuples (src, tgt) where src is the id of the source node of the edge
             and tgt is the id of the target node where the edge points
         """
+        self._start_edit()
         for arg in args:
             src = arg[0]
             tgt = arg[1]
             src_node = self.get_node_by_id(src)
             tgt_node = self.get_node_by_id(tgt)
-            if tgt_node.parents[src] > 1 and src_node.children[tgt] > 1:
-                tgt_node.parents[src] -= 1
-                src_node.children[tgt] -= 1
-            else:
-                del tgt_node.parents[src]
-                del src_node.children[tgt]
+            tgt_node.remove_parent_once(src)
+            src_node.remove_child_once(tgt)
+        self.invalidate_levels()
+        self.invalidate_components()
 
     def remove_parallel_edges(self, *args: Tuple[int, int]) -> None:
         """Removes all edges between two target nodes
@@ -343,13 +644,16 @@ class OpenDigraph(
             Arguments should be tuples (src, tgt) where src is the id of the source node of the edge
             and tgt is the id of the target node where the edge points
         """
+        self._start_edit()
         for arg in args:
             src = arg[0]
             tgt = arg[1]
             src_node = self[src]
             tgt_node = self[tgt]
-            del src_node.children[tgt]
-            del tgt_node.parents[src]
+            src_node.remove_child_id(tgt)
+            tgt_node.remove_parent_id(src)
+        self.invalidate_levels()
+        self.invalidate_components()
 
     def remove_node_by_id(self, *args: int) -> None:
         """Removes nodes from the open digraph
@@ -359,6 +663,7 @@ class OpenDigraph(
         *args
             Arguments should be int, the ids of the target nodes
         """
+        self._start_edit()
         for arg in args:
             tgt_id = arg
             tgt_node = self.get_node_by_id(tgt_id)
@@ -379,7 +684,7 @@ class OpenDigraph(
                 # to keep it well formed otherwise the output node would be left with no parent
                 if child_id in self.outputs:
                     self.nodes.pop(child_id)
-                    self.inputs.remove(child_id)
+                    self.outputs.remove(child_id)
 
             if tgt_id in self.inputs:
                 self.inputs.remove(tgt_id)
@@ -388,62 +693,95 @@ class OpenDigraph(
                 self.outputs.remove(tgt_id)
 
             self.nodes.pop(tgt_id)
+        self.invalidate_levels()
 
-    @property
-    def is_well_formed(self) -> None:
-        """Verifies is the open digraph is well formed and returns None is so and
+    def validate(self) -> List[Tuple[int, str]]:
+        """Checks in a single O(V + E) pass that the open digraph is well formed
 
-        Raises
-        ------
-        Exception
-            Raises an exception if the open digraph isn't well formed with a description of the problem
+        Input nodes must have no parent and a single child of multiplicity 1,
+        output nodes a single parent of multiplicity 1 and no child. Every node
+        must be stored under its own id and every edge must be recorded with the
+        same multiplicity by both of its ends.
+
+        Returns
+        -------
+        violations : List[Tuple[int, str]]
+            The id of the node at fault and a description of every violation,
+            empty if the open digraph is well formed
         """
-        # Checks if all intput nodes are in the graph, have no parents and have a single child of multiplicity 1
+        nodes = self.nodes
+        violations = []
+
         for node_id in self.inputs:
-            input_node = self.get_node_by_id(node_id)
-            if not (input_node in self.get_nodes):
-                raise Exception(f"Input node {input_node} isn't in the graph")
+            input_node = nodes.get(node_id)
+            if input_node is None:
+                violations.append((node_id, f"Input node {node_id} isn't in the graph"))
+                continue
             if input_node.parents:
-                raise Exception(f"Input node {input_node} has parents")
+                violations.append((node_id, f"Input node {node_id} has parents"))
             if list(input_node.children.values()) != [1]:
-                raise Exception(
-                    f"Intput node {input_node} has more than 1 children or its multiplicity is greater than 1"
+                violations.append(
+                    (
+                        node_id,
+                        f"Input node {node_id} has more than 1 children or its multiplicity is greater than 1",
+                    )
                 )
 
-        # Checks if all output nodes are in the graph, have no children and have a single parent of multiplicity 1
         for node_id in self.outputs:
-            output_node = self.get_node_by_id(node_id)
-            if not (output_node in self.get_nodes):
-                raise Exception(f"Output node {input_node} isn't in the graph")
+            output_node = nodes.get(node_id)
+            if output_node is None:
+                violations.append((node_id, f"Output node {node_id} isn't in the graph"))
+                continue
             if output_node.children:
-                raise Exception(f"Output node {input_node} has children")
+                violations.append((node_id, f"Output node {node_id} has children"))
             if list(output_node.parents.values()) != [1]:
-                raise Exception(
-                    f"Output node {input_node} has more than 1 parent or its multiplicity is greater than 1"
+                violations.append(
+                    (
+                        node_id,
+                        f"Output node {node_id} has more than 1 parent or its multiplicity is greater than 1",
+                    )
                 )
 
-        # Checks if all the keys in nodes are paired with a node of id equal to the key
-        for node_id in self.nodes:
-            if self.nodes[node_id].id != node_id:
-                raise Exception(f"A key of <id,node> in nodes is invalid")
+        for node_id, node in nodes.items():
+            if node.id != node_id:
+                violations.append((node_id, f"The node stored under id {node_id} has id {node.id}"))
 
-        for node in self.get_nodes:
-            # Checks if all the children of all the nodes have that same node as a parent with their respective multiplicity
             for parent_id, multi in node.parents.items():
-                children = self.get_node_by_id(parent_id).children
-                if not (node.id in children) or not (multi == children[node.id]):
-                    raise Exception(
-                        f"Node {parent_id} isn't a parent of node {node_id} or their multiplicity are different"
+                parent = nodes.get(parent_id)
+                if parent is None or parent.children.get(node_id) != multi:
+                    violations.append(
+                        (
+                            node_id,
+                            f"Node {parent_id} isn't a parent of node {node_id} or their multiplicity are different",
+                        )
                     )
 
-            # Checks if all the parents of all the nodes have that same node as a child with their respective multiplicity
             for child_id, multi in node.children.items():
-                parents = self.get_node_by_id(child_id).parents
-                if not (node.id in parents) or not (multi == parents[node.id]):
-                    raise Exception(
-                        f"Node {child_id} isn't a child of node {node_id} or their multiplicity are different"
+                child = nodes.get(child_id)
+                if child is None or child.parents.get(node_id) != multi:
+                    violations.append(
+                        (
+                            node_id,
+                            f"Node {child_id} isn't a child of node {node_id} or their multiplicity are different",
+                        )
                     )
 
+        return violations
+
+    @property
+    def is_well_formed(self) -> None:
+        """Verifies is the open digraph is well formed and returns None is so
+
+        Raises
+        ------
+        IntegrityError
+            Raises an IntegrityError listing every violation (see validate)
+            if the open digraph isn't well formed
+        """
+        violations = self.validate()
+        if violations:
+            raise IntegrityError(violations)
+
     def add_input_node(self, child_id: int, label: str = "") -> int:
         # CHANGER LA DOC on return un id maintenant
         """Adds a new input node to the open digraph
@@ -458,15 +796,22 @@ class OpenDigraph(
         Exception
             Raises an exception if the target child node is already an input or isn't in the open digraph
         """
+        self._start_edit()
         if child_id in self.inputs:
             raise Exception(f"the target node of id {child_id} is already an input")
         if not (child_id in self.nodes):
             raise Exception(f"the target node of id {child_id} isn't in the graph")
         node_id = self.new_id
-        new_node = Node(node_id, label, {}, {child_id: 1})
+        new_node = Node(node_id, label, {}, {})
+        index = self._cached_level_index()
+        components = self._cached_components()
         self.nodes[node_id] = new_node
+        self._components_add_node(node_id, components)
         self.add_input_id(node_id)
         self.add_edge(node_id, child_id)
+        # a new input doesn't change the depth of the other nodes
+        if index is not None:
+            self._level_cache = (self._levels_version(), index)
         return node_id
 
     def add_output_node(self, parent_id: int, label: str = "") -> int:
@@ -483,15 +828,22 @@ class OpenDigraph(
         Exception
             Raises an exception if the target parent node is already an output or isn't in the open digraph
         """
+        self._start_edit()
         if parent_id in self.outputs:
             raise Exception(f"the target node of id {parent_id} is already an output")
         if not (parent_id in self.nodes):
             raise Exception(f"the target node of id {parent_id} isn't in the graph")
         node_id = self.new_id
-        new_node = Node(node_id, label, {parent_id: 1}, {})
+        new_node = Node(node_id, label, {}, {})
+        index = self._cached_level_index()
+        components = self._cached_components()
         self.nodes[node_id] = new_node
+        self._components_add_node(node_id, components)
         self.add_output_id(node_id)
         self.add_edge(parent_id, node_id)
+        # a new output doesn't change the depth of the other nodes
+        if index is not None:
+            self._level_cache = (self._levels_version(), index)
         return node_id
 
     def fusion(self, src: int, tgt: int, new_label: str = None) -> None:
@@ -1,40 +1,48 @@
 from __future__ import annotations
+from typing import List, Optional
+import itertools
+
+from modules.containers import UnionFind
 
 
 class bool_circ_mx:
-    def sub_is_cyclic(self, *args: List[int]) -> bool:
-        """Returns True if the subgraph defined by the nodes ids in args is cyclic.
+    def find_cycle(self) -> List[int]:
+        """Returns a cycle of the digraph or None if it is acyclic.
+
+        Iterative depth-first search with colour marking, in O(V + E) and without
+        copying or modifying the digraph. Inputs and outputs are ignored.
 
-        Parameters:
-        -----------
-        *args: List[int]
-            The list of the node ids.
         Returns:
         --------
-        bool
-            True if the subgraph is cyclic.
+        List[int]
+            The ids of the nodes of the cycle, each node having the next one as a
+            child and the last one having the first one as a child.
         """
-        if self.is_empty:
-            return False
-
-        leaves = []
-        for node_id in self.nodes:
-            node = self.get_node_by_id(node_id)
-            if node.out_degree == 0:
-                leaves.append(node)
-
-        if not leaves:
-            return True
-
-        for leaf in leaves.copy:
-            parents = self.get_nodes_by_ids(leaf.get_parent_ids)
-            for parent in parents:
-                if len(parent.children) == 1:
-                    leaves.append(parent)
-            leaves.remove(leaf)
-            self.remove_node_by_id(leaf.get_id)
-
-        return self.sub_is_cyclic(leaves)
+        boundary = set(self.inputs) | set(self.outputs)
+        done = set()
+        for start_id in self.nodes:
+            if start_id in boundary or start_id in done:
+                continue
+            # ids of the current path and their position in it (grey nodes)
+            path = [start_id]
+            position = {start_id: 0}
+            stack = [iter(self.get_node_by_id(start_id).get_children_ids)]
+            while stack:
+                for child_id in stack[-1]:
+                    if child_id in boundary or child_id in done:
+                        continue
+                    if child_id in position:
+                        return path[position[child_id] :]
+                    position[child_id] = len(path)
+                    path.append(child_id)
+                    stack.append(iter(self.get_node_by_id(child_id).get_children_ids))
+                    break
+                else:
+                    stack.pop()
+                    node_id = path.pop()
+                    del position[node_id]
+                    done.add(node_id)
+        return None
 
     @property
     def is_cyclic(self) -> bool:
@@ -44,13 +52,7 @@ class bool_circ_mx:
         --------
         bool
             True if the digraph is cyclic."""
-        digraph = self.copy
-        for input in self.inputs:
-            digraph.remove_node_by_id(input)
-        for output in self.outputs:
-            digraph.remove_node_by_id(output)
-
-        return digraph.sub_is_cyclic()
+        return self.find_cycle() is not None
 
     @property
     def min_id(self) -> int:
@@ -64,6 +66,8 @@ class bool_circ_mx:
 
     def shift_indices(self, n: int) -> None:
         """Shifts the indices of the digraph by n."""
+        self._start_edit()
+        next_id = self.new_id + n
         for id in self.nodes:
             node = self.get_node_by_id(id)
             node.set_id(id + n)
@@ -72,13 +76,11 @@ class bool_circ_mx:
                 {id + n: multi for id, multi in node.children.items()}
             )
 
-        for i in range(len(self.inputs)):
-            self.inputs[i] += n
-
-        for j in range(len(self.outputs)):
-            self.outputs[j] += n
+        self.inputs = [input_id + n for input_id in self.inputs]
+        self.outputs = [output_id + n for output_id in self.outputs]
 
         self.nodes = {node.id: node for node in self.nodes.values()}
+        self.nodes.next_id = max(self.nodes.next_id, next_id)
 
     def iparallel(self, args: List[OpenDigraph]) -> None:
         """Parallel composition of the digraph with the digraphs in args. modifies self.
@@ -89,8 +91,9 @@ class bool_circ_mx:
             The list of the digraphs to parallel compose with self.
         """
         "A TESTER"
+        self._start_edit()
         for g in args:
-            g.shift_indices(self.max_id - g.min_id + 1)
+            g.shift_indices(self.new_id - g.min_id)
             self.inputs.extend(g.inputs)
             self.outputs.extend(g.outputs)
             for node in g.get_nodes:
@@ -121,7 +124,8 @@ class bool_circ_mx:
         g: OpenDigraph
             The digraph to compose with self.
         """
-        g.shift_indices(self.max_id - g.min_id + 1)
+        self._start_edit()
+        g.shift_indices(self.new_id - g.min_id)
         if len(self.outputs) != len(g.inputs):
             raise Exception(f"Length of outputs of self are different from inputs of g")
 
@@ -156,48 +160,95 @@ class bool_circ_mx:
 
     def dfs(self, visited, node, component):
         """Depth-first search. Updates the visited list and the component list.
-        
+
+        The search is iterative, so it works on components of any size.
+
         Parameters:
         -----------
-        visited: List[bool]
-            The list of the visited nodes.
+        visited: Set[OpenDigraphNode]
+            The set of the visited nodes.
         node: OpenDigraphNode
             The node to start the search.
         component: List[OpenDigraphNode]
             The list of the nodes of the component
         """
-        if node not in visited:
+        stack = [node]
+        while stack:
+            node = stack.pop()
+            if node in visited:
+                continue
             visited.add(node)
             component.append(node.id)
-            voisins = node.get_parent_ids + node.get_children_ids
-            for voisin in voisins:
-                self.dfs(visited, self.get_node_by_id(voisin), component)
+            for voisin in itertools.chain(node.parents, node.children):
+                stack.append(self.get_node_by_id(voisin))
+
+    def _cached_components(self) -> Optional[UnionFind]:
+        """Returns the cached union-find of the components or None if it is missing or outdated"""
+        cache = getattr(self, "_component_cache", None)
+        if cache is None or cache[0] is not self.nodes or cache[1] != self.nodes.version:
+            return None
+        return cache[2]
+
+    def invalidate_components(self) -> None:
+        """Drops the cached components, they will be recomputed on the next query"""
+        self._component_cache = None
+
+    def _components_add_node(self, node_id: int, components: Optional[UnionFind]) -> None:
+        """Records in components (the union-find cached before node_id was added) the new isolated node"""
+        if components is not None:
+            components.add(node_id)
+            self._component_cache = (self.nodes, self.nodes.version, components)
+
+    def _components_add_edge(self, src: int, tgt: int) -> None:
+        """Merges the cached components of src and tgt after the addition of an edge between them"""
+        components = self._cached_components()
+        if components is not None:
+            components.union(src, tgt)
+
+    @property
+    def components(self) -> UnionFind:
+        """Returns the union-find of the weakly connected components of all the nodes.
+
+        It is computed once in O(V + E) and cached. It is updated by add_node,
+        add_edge and add_edges_bulk, dropped by the removal of edges or nodes
+        and by any change of the node map.
+        Nodes mutated directly require a call to invalidate_components.
+
+        Returns:
+        --------
+        UnionFind
+            The sets of node ids of the components, not to be modified.
+        """
+        components = self._cached_components()
+        if components is None:
+            components = UnionFind(self.nodes)
+            for node_id, node in self.nodes.items():
+                for child_id in node.children:
+                    components.union(node_id, child_id)
+            self._component_cache = (self.nodes, self.nodes.version, components)
+        return components
 
     @property
     def connected_components(self):
         """Returns the connected components of the digraph.
-        
+
+        Every node belongs to a component. The components are numbered in the
+        order of the inputs, then of the nodes for the components without input.
+
         Returns:
         --------
         nb_components: int
             The number of the connected components.
         output: Hashmap[id, connected_component : int]
-            The list of the connected components.
+            The number of the component of each node.
         """
-        visited = set()
+        components = self.components
+        numbers = {}
         output = {}
-        components = []
-        for id in self.inputs:
-            node = self[id]
-            l = []
-            self.dfs(visited, node, l)
-            components.append(l)
-        components = list(filter(lambda a: a != [], components))
-        nb_component = len(components)
-        k = 0
-        for component in components:
-            component.sort()
-            for id in component:
-                output[id] = k
-            k += 1
-        return nb_component, output
+        for ids in [self.inputs, self.nodes]:
+            for id in ids:
+                root = components.find(id)
+                if not (root in numbers):
+                    numbers[root] = len(numbers)
+                output[id] = numbers[root]
+        return len(numbers), output
@@ -1,12 +1,88 @@
-from typing import Dict, List, Tuple
+from collections import deque
+from heapq import heappop, heappush
+from typing import Callable, Dict, List, Tuple
 
 
 class depth_mx:
-    def dijkstra(
-        self, src: int, tgt: int = None, direction: int = None
+    def neighbour_ids(self, node_id: int, direction: int = None) -> List[int]:
+        """Returns the ids of the neighbours of a node
+
+        Parameters
+        ----------
+        node_id : int
+            The id of the node
+
+        Optionnal Parameters
+        ----------
+        direction : int (default None)
+            Specifes the searched neighours. Should either be None, -1 or 1.
+             1 = children only
+            -1 = parents only
+            None = both
+        """
+        node = self.get_node_by_id(node_id)
+        if direction == None:
+            return node.get_parent_ids + node.get_children_ids
+        elif direction == -1:
+            return node.get_parent_ids
+        elif direction == 1:
+            return node.get_children_ids
+        raise Exception(f"Invalid direction {direction}, should be None, -1 or 1")
+
+    def bfs(
+        self, sources, tgt: int = None, direction: int = None
     ) -> Tuple[Dict[int, int], Dict[int, int]]:
+        """Breadth-first search computing the unit-weight distances from one or several sources
+
+        Parameters
+        ----------
+        sources : int or Iterable[int]
+            The node(s) from which the distances will be calculated.
+            Every source is at distance 0.
+
+        Optionnal Parameters
+        ----------
+        tgt : int (default None)
+            Stops the search when the shortest path to tgt is found
+        direction : int (default None)
+            Specifes the searched neighours, see neighbour_ids
+
+        Returns
+        -------
+        dist : Dict[int, int]
+            Maps node ids with their distance to the closest source
+        prev : Dict[int, int]
+            Maps node ids with the id of the previous node of the path from the closest source
+        """
+        if isinstance(sources, int):
+            sources = [sources]
+        dist = {src: 0 for src in sources}
+        prev = {}
+        if tgt in dist:
+            return dist, prev
+        queue = deque(dist)
+        while queue:
+            u = queue.popleft()
+            for v in self.neighbour_ids(u, direction):
+                if not (v in dist):
+                    dist[v] = dist[u] + 1
+                    prev[v] = u
+                    if v == tgt:
+                        return dist, prev
+                    queue.append(v)
+        return dist, prev
+
+    def dijkstra(
+        self,
+        src: int,
+        tgt: int = None,
+        direction: int = None,
+        weight: Callable[[int, int], float] = None,
+    ) -> Tuple[Dict[int, float], Dict[int, int]]:
         """Dijkstra's algorithm implementation for open_digraph
 
+        Without weight every edge has a weight of 1 and a breadth-first search is used.
+
         Parameters
         ----------
         src : int
@@ -21,6 +97,9 @@ class depth_mx:
              1 = children only
             -1 = parents only
             None = both
+        weight : Callable[[int, int], float] (default None)
+            Returns the non negative weight of the step from node u to its neighbour v,
+            for example the delay of the gate v
 
         Returns
         -------
@@ -29,32 +108,37 @@ class depth_mx:
         prev : Dict[int, int]
             Maps node ids with the id of the previous node of the path from src
         """
-        Q = [src]
+        if weight is None:
+            return self.bfs(src, tgt=tgt, direction=direction)
+
         dist = {src: 0}
         prev = {}
-        while Q != []:
-            u = min(Q, key=lambda k: dist[k])
-            Q.remove(u)
-            if direction == None:
-                neighbours = (
-                    self.get_node_by_id(u).get_parent_ids
-                    + self.get_node_by_id(u).get_children_ids
-                )
-            elif direction == -1:
-                neighbours = self.get_node_by_id(u).get_parent_ids
-            elif direction == 1:
-                neighbours = self.get_node_by_id(u).get_children_ids
-            for v in neighbours:
-                if not (v in dist):
-                    Q.append(v)
-                if not (v in dist) or dist[v] > dist[u] + 1:
-                    dist[v] = dist[u] + 1
+        done = set()
+        heap = [(0, src)]
+        while heap:
+            d, u = heappop(heap)
+            if u in done:
+                continue
+            done.add(u)
+            if u == tgt:
+                break
+            for v in self.neighbour_ids(u, direction):
+                dv = d + weight(u, v)
+                if not (v in dist) or dv < dist[v]:
+                    dist[v] = dv
                     prev[v] = u
-                if tgt != None:
-                    if v == tgt:
-                        return dist, prev
+                    heappush(heap, (dv, v))
         return dist, prev
 
+    def _path(self, prev: Dict[int, int], u: int, v: int) -> List[int]:
+        """Returns the path from u to v stored in prev (u and v are both included)"""
+        path = []
+        while v in prev:
+            path.append(v)
+            v = prev[v]
+        path.append(u)
+        return path[::-1]
+
     def shortest_path(self, u: int, v: int) -> List[int]:
         """Computes the shortest path from u to v
 
@@ -71,13 +155,34 @@ class depth_mx:
             List of the ids of all the nodes of the shortest path from u to v
             (u and v are both included)
         """
-        _, prev = self.dijkstra(u, tgt=v, direction=1)
-        path = []
-        while v in prev:
-            path.append(v)
-            v = prev[v]
-        path.append(u)
-        return path[::-1]
+        _, prev = self.bfs(u, tgt=v, direction=1)
+        return self._path(prev, u, v)
+
+    def shortest_paths(
+        self, pairs: List[Tuple[int, int]]
+    ) -> Dict[Tuple[int, int], List[int]]:
+        """Computes the shortest paths of many pairs, with one search per distinct start node
+
+        Parameters
+        ----------
+        pairs : List[Tuple[int, int]]
+            The (start, end) pairs
+
+        Returns
+        -------
+        paths : Dict[Tuple[int, int], List[int]]
+            Maps each pair to its shortest path, as returned by shortest_path
+        """
+        targets = {}
+        for u, v in pairs:
+            targets.setdefault(u, set()).add(v)
+
+        paths = {}
+        for u, ends in targets.items():
+            _, prev = self.bfs(u, direction=1)
+            for v in ends:
+                paths[(u, v)] = self._path(prev, u, v)
+        return paths
 
     def common_ancestors(self, n1: int, n2: int) -> Dict[int, Tuple[int, int]]:
         """Maps all common ancestor of n1 and n2 to its distance from each node
@@ -95,55 +200,172 @@ class depth_mx:
             Keys are the id of the common ancestors.
             Values are tuple (distance to n1, distance to n2)
         """
-        common_ancestors = {}
-        n1_ances, _ = self.dijkstra(n1, direction=-1)
-        n2_ances, _ = self.dijkstra(n2, direction=-1)
-        for ancester in n1_ances.keys() & n2_ances.keys():
-            common_ancestors[ancester] = (n1_ances[ancester], n2_ances[ancester])
-        return common_ancestors
+        return self.common_ancestors_many([(n1, n2)])[(n1, n2)]
 
-    @property
-    def tri_topologique(self) -> List[List[int]]:
-        """An implementation of a topologic sort
+    def common_ancestors_many(
+        self, pairs: List[Tuple[int, int]]
+    ) -> Dict[Tuple[int, int], Dict[int, Tuple[int, int]]]:
+        """Computes the common ancestors of many pairs, searching the ancestors of each node once
+
+        Parameters
+        ----------
+        pairs : List[Tuple[int, int]]
+            The (n1, n2) pairs
+
+        Returns
+        -------
+        common_ancestors : Dict[Tuple[int, int], Dict[int, Tuple[int, int]]]
+            Maps each pair to its common ancestors, as returned by common_ancestors
+        """
+        ancestors = {}
+        output = {}
+        for n1, n2 in pairs:
+            for node_id in (n1, n2):
+                if not (node_id in ancestors):
+                    ancestors[node_id], _ = self.bfs(node_id, direction=-1)
+            n1_ances, n2_ances = ancestors[n1], ancestors[n2]
+            output[(n1, n2)] = {
+                ancester: (n1_ances[ancester], n2_ances[ancester])
+                for ancester in n1_ances.keys() & n2_ances.keys()
+            }
+        return output
+
+    def _kahn_levels(self) -> List[List[int]]:
+        """Kahn's algorithm on in-degree counters, in O(V + E) and without copying
+        or modifying the graph. Inputs and outputs are ignored.
 
         Returns
         -------
         sort : List[List[int]]
-            The topologic sort. Each element of the list is a sublist containing all nodes
-            of depth equal to the index of the sublist in the list
+            The nodes of each depth, in the order of the graph
         """
-        digraph = self.copy
-        for input in self.inputs:
-            digraph.remove_node_by_id(input)
-        for output in self.outputs:
-            digraph.remove_node_by_id(output)
+        boundary = set(self.inputs) | set(self.outputs)
+        position = {}
+        in_degree = {}
+        level = []
+        for i, node_id in enumerate(self.nodes):
+            if node_id in boundary:
+                continue
+            position[node_id] = i
+            degree = 0
+            for parent_id in self.get_node_by_id(node_id).get_parent_ids:
+                if not (parent_id in boundary):
+                    degree += 1
+            in_degree[node_id] = degree
+            if degree == 0:
+                level.append(node_id)
 
         sort = []
-        while digraph.nodes != {}:
-            roots = []
-            for node_id in digraph.nodes:
-                node = digraph.get_node_by_id(node_id)
-                if node.in_degree == 0:
-                    roots.append(node_id)
+        while level != []:
+            sort.append(level)
+            next_level = []
+            for node_id in level:
+                for child_id in self.get_node_by_id(node_id).get_children_ids:
+                    if child_id in in_degree:
+                        in_degree[child_id] -= 1
+                        if in_degree[child_id] == 0:
+                            next_level.append(child_id)
+            # keeps the nodes of a level in the order of the graph
+            next_level.sort(key=position.__getitem__)
+            level = next_level
+
+        return sort
+
+    def _levels_version(self) -> Tuple[int, int, int]:
+        """Returns the versions of the node map and of the ports, which the level index depends on"""
+        return (
+            getattr(self.nodes, "version", 0),
+            getattr(self.inputs, "version", 0),
+            getattr(self.outputs, "version", 0),
+        )
+
+    def _cached_level_index(self) -> Dict[int, int]:
+        """Returns the cached level index or None if it is missing or outdated"""
+        cache = getattr(self, "_level_cache", None)
+        if cache is None or cache[0] != self._levels_version():
+            return None
+        return cache[1]
+
+    def invalidate_levels(self) -> None:
+        """Drops the cached level index, it will be recomputed on the next query"""
+        self._level_cache = None
+
+    def _levels_add_node(self, node_id: int, index: Dict[int, int]) -> None:
+        """Records in index (the level index cached before node_id was added) the new isolated node"""
+        if index is not None:
+            index[node_id] = 0
+            self._level_cache = (self._levels_version(), index)
+
+    def _levels_add_edge(self, src: int, tgt: int) -> None:
+        """Updates the cached level index after the addition of an edge from src to tgt
+
+        The depths below tgt can only grow, they are pushed down the graph.
+        The index is dropped if the new edge closes a cycle.
+        """
+        index = self._cached_level_index()
+        if index is None or src in self.inputs or tgt in self.outputs:
+            return
+        if not (src in index) or not (tgt in index):
+            self.invalidate_levels()
+            return
 
-            sort.append(roots)
+        stack = [(tgt, index[src] + 1)]
+        while stack != []:
+            node_id, depth = stack.pop()
+            if depth <= index[node_id]:
+                continue
+            if node_id == src:
+                self.invalidate_levels()
+                return
+            index[node_id] = depth
+            for child_id in self.get_node_by_id(node_id).get_children_ids:
+                if child_id in index:
+                    stack.append((child_id, depth + 1))
 
-            for root in roots:
-                digraph.remove_node_by_id(root)
+    @property
+    def level_index(self) -> Dict[int, int]:
+        """Maps each node (inputs and outputs excluded) to its depth
+
+        The index is computed once and cached. It is updated by add_node and add_edge,
+        dropped by the other mutators of the graph and by any change of the node map
+        or of the ports.
+        Nodes mutated directly require a call to invalidate_levels.
+        """
+        index = self._cached_level_index()
+        if index is None:
+            index = {}
+            for depth, level in enumerate(self._kahn_levels()):
+                for node_id in level:
+                    index[node_id] = depth
+            self._level_cache = (self._levels_version(), index)
+        return index
+
+    @property
+    def tri_topologique(self) -> List[List[int]]:
+        """An implementation of a topologic sort, built from the level index
 
+        Returns
+        -------
+        sort : List[List[int]]
+            The topologic sort. Each element of the list is a sublist containing all nodes
+            of depth equal to the index of the sublist in the list
+        """
+        index = self.level_index
+        sort = [[] for i in range(self.depth)]
+        for node_id in self.nodes:
+            if node_id in index:
+                sort[index[node_id]].append(node_id)
         return sort
 
     def node_depth(self, node_id: int) -> int:
         """Returns the depth of the node of id node_id"""
-        tri = self.tri_topologique
-        for level in tri:
-            if node_id in level:
-                return tri.index(level)
+        return self.level_index.get(node_id)
 
     @property
     def depth(self) -> int:
         """Returns the depth of the open digraph"""
-        return len(self.tri_topologique)
+        index = self.level_index
+        return max(index.values()) + 1 if index else 0
 
     def longest_path(self, u: int, v: int) -> Tuple[List[int], int]:
         """Computes the longest path from u to v and its distance
@@ -166,8 +388,7 @@ class depth_mx:
         dist = {u: 0}
         prev = {}
         li = self.tri_topologique
-        lk = li[self.node_depth(u)]
-        for l in li[li.index(lk) + 1 :]:
+        for l in li[self.node_depth(u) + 1 : self.node_depth(v) + 1]:
             for w in l:
                 parents = self.get_node_by_id(w).get_parent_ids
                 inter = list(set(parents) & set(dist.keys()))
@@ -175,8 +396,7 @@ class depth_mx:
                     p = max(inter, key=lambda k: dist[k])
                     dist[w] = dist[p] + 1
                     prev[w] = p
-                if w == v:
-                    break
+        w = v
         path = []
         while w in prev:
             path.append(w)
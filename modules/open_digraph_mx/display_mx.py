@@ -1,38 +1,361 @@
+from collections import Counter, deque
+from itertools import islice
+from typing import Dict, Iterable, List, TextIO, Tuple
+import gzip
 import os
+import re
+
+from modules.containers import PortList
+from modules.exception import ParseError
+
+Token = Tuple[str, str, int, int]
+
+# Lines made of a single edge or a single node attribute, the bulk of the
+# files written by save_sa_dot_file, are matched a chunk at a time
+DOT_LINE = re.compile(
+    r"""^[ \t]*v?(\d+)[ \t]*(?:->[ \t]*v?(\d+)|\[(label|color)=(?:"([^"\\\n]*)"|(\w+))\])"""
+    r"""[ \t]*;?[ \t]*\r?$""",
+    re.MULTILINE,
+)
+DOT_CHUNK = 4096
+DOT_TOKEN = re.compile(
+    r"""\s*(?:(?P<arrow>->)|(?P<punct>[{}\[\]=;,])|(?P<string>"(?:[^"\\]|\\.)*")"""
+    r"""|(?P<id>[A-Za-z0-9_.]+)|(?P<comment>//.*|\#.*)|(?P<error>\S))"""
+)
+
+
+def open_dot(path: str, mode: str = "r") -> TextIO:
+    """Opens a dot file in text mode, compressed with gzip if path ends with .gz
+
+    Parameters
+    ----------
+    path : str
+        The path of the file
+
+    Optionnal Parameters
+    ----------
+    mode : str (default "r")
+        "r" to read the file, "w" to write it
+
+    Returns
+    -------
+    file : TextIO
+        The opened file
+    """
+    if path.endswith(".gz"):
+        return gzip.open(path, mode + "t", encoding="utf-8")
+    return open(path, mode, encoding="utf-8")
+
+
+def tokenize_dot_line(line: str, line_number: int) -> List[Token]:
+    """Splits a line of a dot file into tokens
+
+    Parameters
+    ----------
+    line : str
+        The line
+    line_number : int
+        The number of the line, starting at 1
+
+    Returns
+    -------
+    tokens : List[Token]
+        Tuples (kind, value, line, column). kind is "->", a punctuation character,
+        "string" (value is unquoted) or "id"
+    """
+    tokens = []
+    position = 0
+    length = len(line.rstrip("\n"))
+    while position < length:
+        match = DOT_TOKEN.match(line, position)
+        if match.lastgroup is None:
+            break
+        kind = match.lastgroup
+        column = match.start(kind) + 1
+        position = match.end()
+        if kind == "comment":
+            break
+        if kind == "error":
+            raise ParseError(f"unexpected character {match[kind]!r}", line_number, column)
+        if kind == "arrow":
+            tokens.append(("->", "->", line_number, column))
+        elif kind == "punct":
+            tokens.append((match[kind], match[kind], line_number, column))
+        elif kind == "string":
+            value = re.sub(r"\\(.)", r"\1", match[kind][1:-1])
+            tokens.append(("string", value, line_number, column))
+        else:
+            tokens.append(("id", match[kind], line_number, column))
+    return tokens
+
+
+def indentation(line: str) -> int:
+    """Returns the number of spaces and tabs at the start of line"""
+    return len(line) - len(line.lstrip(" \t"))
+
+
+def parse_dot(
+    lines: Iterable[str],
+) -> Tuple[Dict[int, str], List[int], List[int], Dict[Tuple[int, int], int]]:
+    """Parses in a single pass the dot subset written by save_sa_dot_file
+
+    Node statements may carry any attributes, only label and color (blue for the
+    inputs and red for the outputs) are used. Edge statements may be chained.
+    Graph, node and edge default attributes are skipped. Statements may span
+    several lines, lines holding a single edge or attribute take a fast path.
+
+    Parameters
+    ----------
+    lines : Iterable[str]
+        The lines of the file, for example the file object itself
+
+    Returns
+    -------
+    labels : Dict[int, str]
+        Maps the id of each node to its label, in order of declaration
+        (nodes only appearing in edges come last)
+    inputs : List[int]
+        The ids of the input nodes
+    outputs : List[int]
+        The ids of the output nodes
+    edges : Dict[Tuple[int, int], int]
+        Maps each edge (src, tgt) to its multiplicity
+
+    Raises
+    ------
+    ParseError
+        Raises a ParseError with the line and column of the first syntax error,
+        or of the first statement declaring a port twice
+    """
+    source = iter(lines)
+    read = [0]  # number of lines taken from source
+    pending = deque()
+    buffer = deque()
+    last = [0, ""]
+    labels = {}
+    inputs = PortList()
+    outputs = PortList()
+    edges = Counter()
+
+    def fill() -> bool:
+        """Tokenizes lines until the buffer isn't empty, returns False at the end of the file"""
+        while not buffer:
+            if pending:
+                numbered_line = pending.popleft()
+            else:
+                line = next(source, None)
+                if line is None:
+                    return False
+                read[0] += 1
+                numbered_line = (read[0], line)
+            last[:] = numbered_line
+            buffer.extend(tokenize_dot_line(numbered_line[1], numbered_line[0]))
+        return True
+
+    def next_token() -> Token:
+        if not fill():
+            return ("end", "end of file", last[0], len(last[1].rstrip("\n")) + 1)
+        return buffer.popleft()
+
+    def peek() -> Token:
+        token = next_token()
+        if token[0] != "end":
+            buffer.appendleft(token)
+        return token
+
+    def unexpected(token: Token, expected: str) -> ParseError:
+        found = token[1] if token[0] == "end" else repr(token[1])
+        return ParseError(f"expected {expected} but found {found}", token[2], token[3])
+
+    def expect(kinds: List[str]) -> Token:
+        token = next_token()
+        if not (token[0] in kinds):
+            raise unexpected(token, " or ".join(kinds))
+        return token
+
+    def node_id(token: Token) -> int:
+        name = token[1]
+        digits = name[1:] if name[:1] == "v" else name
+        if not digits.isdigit():
+            raise ParseError(f"invalid node name {name!r}", token[2], token[3])
+        return int(digits)
+
+    def attributes() -> Dict[str, str]:
+        output = {}
+        token = expect(["id", "]"])
+        while token[0] != "]":
+            expect(["="])
+            value = expect(["id", "string"])
+            output[token[1]] = value[1]
+            token = expect(["id", ",", ";", "]"])
+            if token[0] in ",;":
+                token = expect(["id", "]"])
+        return output
+
+    def node(identity: int, attrs: Dict[str, str]) -> None:
+        """Records a node statement, raises a ValueError if it declares a port twice"""
+        labels.setdefault(identity, "")
+        if "label" in attrs:
+            labels[identity] = attrs["label"]
+        if attrs.get("color") == "blue":
+            inputs.append(identity)
+        if attrs.get("color") == "red":
+            outputs.append(identity)
+
+    token = expect(["id"])
+    if token[1] == "strict":
+        token = expect(["id"])
+    if token[1] != "digraph":
+        raise unexpected(token, "digraph")
+    token = expect(["id", "string", "{"])
+    if token[0] != "{":
+        expect(["{"])
+
+    while True:
+        if not buffer and not pending:
+            chunk = list(islice(source, DOT_CHUNK))
+            if chunk == []:
+                raise unexpected(next_token(), "}")
+            first = read[0] + 1
+            read[0] += len(chunk)
+            last[:] = (read[0], chunk[-1])
+            # lines read from a file keep their line breaks, lists of strings may not
+            separator = "" if chunk[0][-1:] == "\n" else "\n"
+            found = DOT_LINE.findall(separator.join(chunk))
+            if len(found) != len(chunk):
+                pending.extend(enumerate(chunk, first))
+                continue
+            # every line of the chunk is a single edge or attribute
+            edges.update([(int(src), int(tgt)) for src, tgt, name, string, value in found if tgt])
+            attrs = [(number, match) for number, match in enumerate(found, first) if not match[1]]
+            try:
+                for number, (src, tgt, name, string, value) in attrs:
+                    node(int(src), {name: string or value})
+            except ValueError as error:
+                column = indentation(chunk[number - first]) + 1
+                raise ParseError(str(error), number, column) from None
+            continue
+
+        if not buffer:
+            numbered_line = pending.popleft()
+            match = DOT_LINE.match(numbered_line[1])
+            if match is None:
+                buffer.extend(tokenize_dot_line(numbered_line[1], numbered_line[0]))
+            elif match[2]:
+                edges[(int(match[1]), int(match[2]))] += 1
+            else:
+                try:
+                    node(int(match[1]), {match[3]: match[4] if match[4] is not None else match[5]})
+                except ValueError as error:
+                    number, line = numbered_line
+                    raise ParseError(str(error), number, indentation(line) + 1) from None
+            continue
+
+        token = next_token()
+        if token[0] == "}":
+            break
+        if token[0] == ";":
+            continue
+        if token[0] != "id":
+            raise unexpected(token, "a statement")
+
+        if token[1] in ["graph", "node", "edge"]:
+            if peek()[0] == "[":
+                next_token()
+                attributes()
+            continue
+
+        if peek()[0] == "=":
+            next_token()
+            expect(["id", "string"])
+            continue
+
+        chain = [node_id(token)]
+        while peek()[0] == "->":
+            next_token()
+            chain.append(node_id(expect(["id"])))
+        attrs = {}
+        if peek()[0] == "[":
+            next_token()
+            attrs = attributes()
+
+        if len(chain) == 1:
+            try:
+                node(chain[0], attrs)
+            except ValueError as error:
+                raise ParseError(str(error), token[2], token[3]) from None
+        for src, tgt in zip(chain, chain[1:]):
+            edges[(src, tgt)] += 1
+
+    # nodes only appearing in edges
+    if not ({node_id for edge in edges for node_id in edge} <= labels.keys()):
+        for src, tgt in edges:
+            labels.setdefault(src, "")
+            labels.setdefault(tgt, "")
+    return labels, inputs, outputs, edges
 
 
 class display_mx:
-    def save_sa_dot_file(self, path: str, verbose: bool = False) -> None:
-        """Saves the digraph in a dot file.
-        Parameters:
-        -----------
-        path: str
-            The path of the file.
-        verbose: bool
-            If True, displays the label of each node.
+    def write_dot(self, stream: TextIO, verbose: bool = False) -> None:
+        """Writes the digraph in the dot format to a text stream
+
+        The lines are written DOT_CHUNK at a time, each edge being repeated
+        according to its multiplicity.
+
+        Parameters
+        ----------
+        stream : TextIO
+            Any writable text stream: a file, a gzip file, io.StringIO...
+
+        Optionnal Parameters
+        ----------
+        verbose : bool (default False)
+            If True, displays the id of each node next to its label
         """
-        with open(path, "w") as file:
-            file.write("digraph G {\n")
+        inputs = self.inputs
+        outputs = self.outputs
+        stream.write("digraph G {\n")
+
+        lines = []
+        for node_id, node in self.nodes.items():
+            label = node.label
+            if '"' in label or "\\" in label:
+                label = label.replace("\\", "\\\\").replace('"', '\\"')
+            if verbose:
+                label = f"{label} id={node_id}"
+
+            if node_id in inputs:
+                lines.append(f"    v{node_id} [color=blue];\n")
+            if node_id in outputs:
+                lines.append(f"    v{node_id} [color=red];\n")
+            lines.append(f'    v{node_id} [label="{label}"];\n')
 
-            for node_id in self.nodes:
-                node = self.get_node_by_id(node_id)
-                label = node.get_label
+            for child_id, multiplicity in node.children.items():
+                edge = f"    v{node_id} -> v{child_id};\n"
+                lines.append(edge if multiplicity == 1 else edge * multiplicity)
 
-                if node_id in self.inputs:
-                    file.write(f"    v{node_id} [color=blue];\n")
-                if node_id in self.outputs:
-                    file.write(f"    v{node_id} [color=red];\n")
+            if len(lines) >= DOT_CHUNK:
+                stream.write("".join(lines))
+                lines.clear()
 
-                if verbose:
-                    file.write(f'    v{node_id} [label="{label} id={node_id}"];\n')
-                else:
-                    file.write(f'    v{node_id} [label="{label}"];\n')
+        lines.append("}")
+        stream.write("".join(lines))
 
-                for child_id in node.children:
-                    for multiplicity in range(node.children[child_id]):
-                        file.write(f"    v{node_id} -> v{child_id};\n")
+    def save_sa_dot_file(self, path: str, verbose: bool = False) -> None:
+        """Saves the digraph in a dot file, compressed with gzip if path ends with .gz
+
+        Parameters
+        ----------
+        path : str
+            The path of the file
 
-            file.write("}")
+        Optionnal Parameters
+        ----------
+        verbose : bool (default False)
+            If True, displays the id of each node next to its label
+        """
+        with open_dot(path, "w") as file:
+            self.write_dot(file, verbose=verbose)
 
     def display(self, verbose: bool = False) -> None:
         """Displays the digraph
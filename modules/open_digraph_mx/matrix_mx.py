@@ -1,8 +1,14 @@
-from typing import Dict, List
-import itertools
+from array import array
+from typing import Dict, List, Tuple
+import math
 import random
 
 Matrix = List[List[int]]
+Edges = Dict[Tuple[int, int], int]
+# (rows, columns, values) : l'arête rows[k] -> columns[k] a la multiplicité values[k]
+CooMatrix = Tuple[array, array, array]
+# (offsets, columns, values) : les arêtes de la ligne i sont aux positions offsets[i] à offsets[i + 1]
+CsrMatrix = Tuple[array, array, array]
 
 
 def random_int_list(n: int, bound: int) -> List[int]:
@@ -43,25 +49,136 @@ def random_matrix(
     Matrix 
         Matrice générée.
     """
+    values = range(bound + 1)
     matrix = []
     for i in range(n):
-        matrix.append(random_int_list(n, bound))
-
-    for i, j in itertools.product(range(n), range(n)):
+        if triangular:
+            # Seuls les éléments au-dessus de la diagonale sont tirés
+            matrix.append([0] * i + random.choices(values, k=n - i))
+        else:
+            matrix.append(random.choices(values, k=n))
         if null_diag:
             matrix[i][i] = 0
-        if triangular:
-            if i > j:
-                matrix[i][j] = 0
-        elif oriented:
-            if matrix[i][j] != 0:
-                matrix[j][i] = 0
-        elif symetric:
-            matrix[i][j] = matrix[j][i]
+
+    if not triangular and oriented:
+        # Une seule des deux arêtes entre i et j est gardée, celle au-dessus de la diagonale en priorité
+        for i in range(n):
+            row = matrix[i]
+            row[i] = 0
+            for j in range(i + 1, n):
+                if row[j] != 0:
+                    matrix[j][i] = 0
+    elif not triangular and symetric:
+        for i in range(n):
+            row = matrix[i]
+            for j in range(i + 1, n):
+                row[j] = matrix[j][i]
 
     return matrix
 
 
+def random_edges(
+    n: int,
+    p: float,
+    bound: int = 1,
+    null_diag: bool = False,
+    triangular: bool = False,
+) -> Edges:
+    """ Génère les arêtes d'un graphe aléatoire G(n, p) sans parcourir les n x n paires.
+
+    Les paires candidates sont parcourues ligne par ligne en sautant directement à
+    la prochaine arête : le nombre de paires sautées suit une loi géométrique de
+    paramètre p, donc le coût est proportionnel au nombre d'arêtes tirées.
+
+    Parameters:
+    -----------
+    n: int
+        Nombre de noeuds, numérotés de 0 à n - 1.
+    p: float
+        Probabilité de chaque arête.
+
+    Optional parameters:
+    --------------------
+    bound: int
+        Multiplicité maximale des arêtes, tirée uniformément entre 1 et bound.
+    null_diag: bool
+        Si True, pas de liens vers sois même.
+    triangular: bool
+        Si True, seules les arêtes i -> j avec i < j sont tirées (DAG).
+
+    Returns:
+    --------
+    Edges
+        Dictionnaire associant chaque arête (i, j) à sa multiplicité.
+    """
+    edges = {}
+    if n == 0 or p <= 0:
+        return edges
+    log_q = math.log(1.0 - p) if p < 1 else None
+    row_length = n - 1 if null_diag else n
+
+    i, offset = 0, -1
+    while True:
+        offset += 1
+        if log_q is not None:
+            offset += int(math.log(1.0 - random.random()) / log_q)
+
+        if triangular:
+            while offset >= n - 1 - i:
+                offset -= n - 1 - i
+                i += 1
+                if i >= n:
+                    return edges
+            j = i + 1 + offset
+        else:
+            if offset >= row_length:
+                i += offset // row_length
+                offset %= row_length
+                if i >= n:
+                    return edges
+            j = offset + 1 if null_diag and offset >= i else offset
+
+        edges[(i, j)] = random.randint(1, bound) if bound > 1 else 1
+
+
+def random_dag_edges(n: int, out_degree: int, bound: int = 1) -> Edges:
+    """ Génère les arêtes d'un DAG aléatoire où chaque noeud a out_degree enfants distincts.
+
+    Le noeud i choisit ses enfants parmi les noeuds i + 1 à n - 1 (tous s'il y en a
+    moins que out_degree).
+
+    Parameters:
+    -----------
+    n: int
+        Nombre de noeuds, numérotés de 0 à n - 1.
+    out_degree: int
+        Nombre d'enfants de chaque noeud.
+
+    Optional parameters:
+    --------------------
+    bound: int
+        Multiplicité maximale des arêtes, tirée uniformément entre 1 et bound.
+
+    Returns:
+    --------
+    Edges
+        Dictionnaire associant chaque arête (i, j) à sa multiplicité.
+    """
+    edges = {}
+    for i in range(n - 1):
+        m = n - 1 - i
+        if 2 * out_degree < m:
+            # Tirage avec rejet des doublons, bien plus rapide que random.sample
+            children = set()
+            while len(children) < out_degree:
+                children.add(i + 1 + int(random.random() * m))
+        else:
+            children = random.sample(range(i + 1, n), min(out_degree, m))
+        for j in children:
+            edges[(i, j)] = random.randint(1, bound) if bound > 1 else 1
+    return edges
+
+
 def print_matrix(mat: Matrix):
     """ Affiche une matrice. """
     print("", end="    ")
@@ -81,11 +198,14 @@ class matrix_mx:
     def enumerate_digraph(self) -> Dict[int, int]:
         """Returns a dic that matches each node id to a unique integer between 0 and the number of nodes
 
+        The integers follow the order of get_node_ids, so the mapping is the same
+        for every export of an unchanged graph, and list(enumerate_digraph) maps
+        the integers back to the ids.
+
         Returns
         ------
         Dict[int, int]
             Dic that matches each node id to a unique integer between 0 and the number of nodes
-        A FINIR
         """
         node_ids = self.get_node_ids
         return {node_id: n for node_id, n in zip(node_ids, range(len(node_ids)))}
@@ -112,3 +232,46 @@ class matrix_mx:
                 matrix[dic[node_id]][dic[child_id]] = children[child_id]
         return matrix
 
+    @property
+    def csr_matrix(self) -> CsrMatrix:
+        """Returns the adjacency matrix of the digraph in CSR form, without building the dense matrix
+
+        Rows and columns are numbered by enumerate_digraph and the columns of each
+        row are sorted. The arrays support the buffer protocol, so they can be
+        handed to linear algebra libraries without copy.
+
+        Returns
+        ------
+        CsrMatrix
+            The arrays (offsets, columns, values): row i holds the columns
+            columns[offsets[i]:offsets[i + 1]] with the multiplicities values[...]
+        """
+        index = self.enumerate_digraph
+        offsets = array("q", [0])
+        columns = array("q")
+        values = array("q")
+        for node_id in index:
+            children = self.get_node_by_id(node_id).children
+            row = sorted(zip(map(index.__getitem__, children), children.values()))
+            columns.extend([column for column, multi in row])
+            values.extend([multi for column, multi in row])
+            offsets.append(len(columns))
+        return offsets, columns, values
+
+    @property
+    def coo_matrix(self) -> CooMatrix:
+        """Returns the adjacency matrix of the digraph in COO form, without building the dense matrix
+
+        The entries are sorted by row then column, numbered by enumerate_digraph.
+
+        Returns
+        ------
+        CooMatrix
+            The arrays (rows, columns, values): the node of index rows[k] has the
+            node of index columns[k] as child with multiplicity values[k]
+        """
+        offsets, columns, values = self.csr_matrix
+        rows = array("q")
+        for i in range(len(offsets) - 1):
+            rows.extend([i] * (offsets[i + 1] - offsets[i]))
+        return rows, columns, values
@@ -4,8 +4,10 @@ import os
 root = os.path.normpath(os.path.join(__file__, "./../.."))
 sys.path.append(root)  # allows us to fetch files from the project root
 import unittest
+import random
 
 from modules.bool_circ_mx.binary_mx import *
+from modules.bool_circ import BoolCirc
 
 class test_open_digraph(unittest.TestCase):
 
@@ -17,5 +19,71 @@ class test_open_digraph(unittest.TestCase):
         self.assertEqual(binary_mx.construct_op("1110001000111111").outputs,self.boolcirc.outputs)
         self.assertEqual(str(binary_mx.construct_op("1110001000111111").nodes) ,str(self.boolcirc.nodes))
 
+    def test_construct_op_truth_table(self):
+        for bits in ["0", "1", "01", "0110", "1110001000111111"]:
+            circ = BoolCirc(binary_mx.construct_op(bits))
+            self.assertEqual(circ.truth_table_bits(), [bits])
+
+    def test_construct_op_forms(self):
+        random.seed(0)
+        cases = ["0", "1", "01", "0110", "1110001000111111", "1" * 32]
+        cases += ["".join(random.choice("01") for i in range(2**n)) for n in range(1, 8)]
+        for bits in cases:
+            for form in CONSTRUCT_FORMS:
+                circ = BoolCirc(binary_mx.construct_op(bits, form))
+                self.assertEqual(circ.validate(), [])
+                self.assertEqual(circ.truth_table_bits(), [bits])
+        self.assertRaises(Exception, binary_mx.construct_op, "01", "cnf")
+
+    def test_construct_op_sop(self):
+        # majority of 3 inputs: x0 & x1 | x0 & x2 | x1 & x2
+        circ = binary_mx.construct_op("00010111", "sop")
+        labels = [node.label for node in circ.get_nodes]
+        self.assertEqual((labels.count("&"), labels.count("~")), (3, 0))
+        # ~x1 & ~x2 & ~x3 | x1 & x2 & x3, the NOT nodes are shared by the terms
+        circ = binary_mx.construct_op("1000000110000001", "sop")
+        self.assertEqual([node.label for node in circ.get_nodes].count("~"), 3)
+        circ = binary_mx.construct_op("1000000110000001")
+        self.assertEqual([node.label for node in circ.get_nodes].count("~"), 8)
+
+    def test_construct_op_esop(self):
+        circ = binary_mx.construct_op("0110100110010110", "esop")
+        self.assertEqual(len(circ.nodes), 10)
+        self.assertEqual(len(circ.get_node_by_id(1).parents), 4)
+
+    def test_prime_implicants(self):
+        ones = [1, 3, 5, 7, 14, 15]
+        self.assertEqual(prime_implicants(4, ones), [(1, 6), (7, 8), (14, 1)])
+        self.assertEqual(greedy_cover(ones, prime_implicants(4, ones)), [(1, 6), (14, 1)])
+
+    def test_expand_primes(self):
+        random.seed(1)
+        for n in range(1, 9):
+            for density in [0.3, 0.9]:
+                ones = [i for i in range(2**n) if random.random() < density]
+                primes = expand_primes(n, ones)
+                exact = set(prime_implicants(n, ones))
+                self.assertTrue(set(primes) <= exact)
+                covered = set()
+                for cube in greedy_cover(ones, primes):
+                    covered.update(cube_minterms(cube))
+                self.assertEqual(covered, set(ones))
+
+    def test_construct_op_sop_large(self):
+        random.seed(2)
+        n = EXACT_SOP_INPUTS + 2
+        bits = "".join("1" if random.random() < 0.9 else "0" for i in range(2**n))
+        circ = BoolCirc(binary_mx.construct_op(bits, "sop"))
+        self.assertEqual(circ.validate(), [])
+        self.assertEqual(circ.truth_table_bits(), [bits])
+
+    def test_reed_muller(self):
+        # x0 ^ x1 on 2 variables: bits 01 10 of the table, terms of positions 1 and 0
+        self.assertEqual(reed_muller(2, 0b0110), 0b0110)
+        self.assertEqual(reed_muller(2, 0b1111), 0b0001)
+        # ~x0 & ~x1 has the single term of polarity 0b11
+        self.assertEqual(reed_muller(2, 0b0001, 0b11), 0b1000)
+        self.assertEqual(esop_polarity(2, 0b0001), 0b11)
+
 if __name__ == "__main__":  # the following code is called only when
     unittest.main()  # precisely this file is run
\ No newline at end of file
@@ -4,6 +4,7 @@ import os
 root = os.path.normpath(os.path.join(__file__, "./../.."))
 sys.path.append(root)  # allows us to fetch files from the project root
 import unittest
+import itertools
 
 from modules.bool_circ import *
 
@@ -31,11 +32,155 @@ class test_open_digraph(unittest.TestCase):
         self.assertEqual(len(BoolCirc.random(2, 2, 1, 1).inputs), 1)
         self.assertEqual(len(BoolCirc.random(2, 2, 1, 1).outputs), 1)
 
+    def test_random_sparse(self):
+        circ = BoolCirc.random(2000, 1, 5, 7, out_degree=2)
+        self.assertEqual((len(circ.inputs), len(circ.outputs)), (5, 7))
+        circ.is_well_formed
+        circ = BoolCirc.random(200, 1, 3, 2, p=0.02)
+        self.assertEqual((len(circ.inputs), len(circ.outputs)), (3, 2))
+
 
     def test_parse_parenthesis(self):
         self.assertEqual(self.v1.inputs, parse_parenthesis("((x0)&((x1)&(x2)))|((x1)&(~(x2)))").inputs)
         self.assertEqual(self.v1.outputs, parse_parenthesis("((x0)&((x1)&(x2)))|((x1)&(~(x2)))").outputs)
         self.assertEqual(str(self.v1.nodes), str(parse_parenthesis("((x0)&((x1)&(x2)))|((x1)&(~(x2)))").nodes))
 
+    def test_parse_parenthesis_semantics(self):
+        circ = BoolCirc(parse_parenthesis("((x0)&((x1)&(x2)))|((x1)&(~(x2)))", "(x0)^(x3)"))
+        self.assertEqual([circ[i].get_label for i in circ.inputs], ["x0", "x1", "x2", "x3"])
+        self.assertEqual(len(circ.outputs), 2)
+        program = circ.compile()
+        for x0, x1, x2, x3 in itertools.product([0, 1], repeat=4):
+            self.assertEqual(
+                program.evaluate([x0, x1, x2, x3]),
+                [(x0 & x1 & x2) | (x1 & (1 - x2)), x0 ^ x3],
+            )
+
+    def test_parse_parenthesis_errors(self):
+        for formula, line, column in [
+            ("((x0)&(x1)", 1, 1),
+            ("(x0))", 1, 5),
+            ("(x0)&(x1)|(x2)", 1, 10),
+            ("(x0)&()", 1, 6),
+            ("x0(x1)", 1, 3),
+            ("(x0 x1)", 1, 5),
+            ("(x0)\n&(x1 &)", 2, 6),
+            ("(x0)~(x1)", 1, 1),
+            ("~", 1, 1),
+            ("(x0)&(~)", 1, 6),
+            ("(x0)&(~(x1)(x2))", 1, 6),
+            ("(x0)(x1)", 1, 1),
+            ("((x0)(x1))&(x2)", 1, 1),
+            ("(&)", 1, 1),
+            ("(x0)|(^)", 1, 6),
+            ("(x0)&", 1, 5),
+            ("((x0)&(x1))|(^(x2))", 1, 14),
+        ]:
+            with self.assertRaises(ParseError) as context:
+                parse_parenthesis(formula)
+            self.assertEqual((context.exception.line, context.exception.column), (line, column))
+        circ = BoolCirc(parse_parenthesis("~(x0)", "(~(x0))&(~~(x1))"))
+        self.assertEqual(circ.validate(), [])
+        with self.assertRaises(ParseError) as context:
+            parse_parenthesis("(x0)", "(x1")
+        self.assertTrue("formula 2" in str(context.exception))
+
+    def test_parse_parenthesis_large(self):
+        formula = "|".join(f"((x{i % 50})&(~(x{(i + 1) % 50})))" for i in range(20000))
+        circ = parse_parenthesis(formula)
+        self.assertEqual(len(circ.inputs), 50)
+        self.assertEqual(circ[circ[circ.outputs[0]].get_parent_ids[0]].in_degree, 20000)
+
+    def test_validate(self):
+        adder = BoolCirc.adder(1)
+        self.assertEqual(adder.validate(), [])
+        self.assertIsNone(BoolCirc(adder).is_well_formed)
+
+        adder[2].set_label("?")
+        adder[5].add_child_id(13)
+        adder[13].add_parent_id(5)
+        self.assertEqual(
+            [node_id for node_id, description in adder.validate()],
+            [13, 2, 5],
+        )
+        # nodes edited directly are checked even if the adder came from a constructor
+        self.assertRaises(IntegrityError, lambda: adder.is_well_formed)
+
+        # circuits given to BoolCirc are always checked
+        adder = BoolCirc.adder(1)
+        self.assertIsNone(BoolCirc(adder).is_well_formed)
+        adder[2].set_label("?")
+        self.assertRaises(IntegrityError, BoolCirc, adder)
+        adder = BoolCirc.adder(1)
+        adder.inputs.append(2)
+        self.assertRaises(IntegrityError, BoolCirc, adder)
+        adder = BoolCirc.adder(1)
+        del adder.nodes[2]
+        self.assertRaises(IntegrityError, BoolCirc, adder)
+
+        adder = BoolCirc.adder(1)
+        adder.add_edge(3, 0)
+        with self.assertRaises(IntegrityError) as context:
+            adder.is_well_formed
+        self.assertTrue("cyclic" in str(context.exception))
+
+        # graphs are checked as boolean circuits
+        adder = BoolCirc.adder(1)
+        graph = OpenDigraph(adder.inputs, adder.outputs, [node.copy for node in adder.nodes.values()])
+        self.assertIsNone(BoolCirc(graph).is_well_formed)
+        graph[2].set_label("?")
+        with self.assertRaises(IntegrityError) as context:
+            BoolCirc(graph)
+        self.assertEqual([node_id for node_id, description in context.exception.violations], [2])
+
+    def test_encoder_decoder(self):
+        for circ, inputs, outputs in [(BoolCirc.encoder(), 4, 7), (BoolCirc.decoder(), 7, 4)]:
+            self.assertEqual(circ.validate(), [])
+            self.assertEqual((len(circ.inputs), len(circ.outputs)), (inputs, outputs))
+            program = circ.compile()
+            self.assertEqual(program.evaluate([0] * inputs), [0] * outputs)
+            for bits in itertools.product([0, 1], repeat=inputs):
+                self.assertEqual(len(program.evaluate(list(bits))), outputs)
+
+
+class test_adders(unittest.TestCase):
+    def add(self, circ, a, b, c):
+        """Adds a and b with carry c using circ, returns the integer read on its outputs"""
+        bits = len(circ.outputs) - 1
+        inputs = []
+        for k in range(bits):
+            inputs += [(a >> k) & 1, (b >> k) & 1] + ([c] if k == 0 else [])
+        outputs = circ.compile().evaluate(inputs)
+        r = outputs[:-2] + outputs[-1:]
+        return sum(bit << k for k, bit in enumerate(r)) + (outputs[-2] << bits)
+
+    def test_adder_ports(self):
+        adder = BoolCirc.adder(1)
+        self.assertEqual(adder.inputs, [9, 10, 11, 23, 24])
+        self.assertEqual(adder.outputs, [13, 26, 27])
+        self.assertEqual(len(BoolCirc.adder(3).nodes), 8 * 12 + 2)
+
+    def test_adders(self):
+        for n in range(3):
+            table = BoolCirc.adder(n).truth_table()
+            self.assertEqual(BoolCirc.carry_lookahead_adder(n).truth_table(), table)
+            self.assertEqual(BoolCirc.carry_lookahead_adder(n, block=3).truth_table(), table)
+            self.assertEqual(BoolCirc.kogge_stone_adder(n).truth_table(), table)
+        for block in [-1, 0, 1]:
+            self.assertRaises(ValueError, BoolCirc.carry_lookahead_adder, 2, block)
+
+    def test_wide_adders(self):
+        a, b = 0xDEADBEEF12345678, 0xFEEDFACE87654321
+        for adder in [BoolCirc.adder, BoolCirc.carry_lookahead_adder, BoolCirc.kogge_stone_adder]:
+            circ = adder(6)
+            self.assertEqual(self.add(circ, a, b, 1), a + b + 1)
+        self.assertTrue(BoolCirc.kogge_stone_adder(6).depth < BoolCirc.adder(6).depth)
+
+    def test_half_adder(self):
+        circ = BoolCirc.half_adder(2)
+        self.assertEqual(len(circ.inputs), 8)
+        self.assertEqual(circ.compile().evaluate([1, 1, 0, 0, 0, 0, 0, 0]), [0, 1, 0, 0, 0])
+
+
 if __name__ == "__main__":  # the following code is called only when
     unittest.main()  # precisely this file is run
\ No newline at end of file
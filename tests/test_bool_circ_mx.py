@@ -7,3 +7,69 @@ import unittest
 
 from modules.bool_circ import *
 
+
+class test_bool_circ_mx(unittest.TestCase):
+    def setUp(self):
+        i0 = Node(0, "", {}, {2: 1})
+        n0 = Node(2, "&", {0: 1, 4: 1}, {3: 1})
+        n1 = Node(3, "", {2: 1}, {4: 1, 5: 1})
+        n2 = Node(4, "~", {3: 1}, {2: 1})
+        o0 = Node(5, "", {3: 1}, {})
+        self.cyclic = OpenDigraph([0], [5], [i0, n0, n1, n2, o0])
+
+    def test_find_cycle(self):
+        before = str(self.cyclic)
+        self.assertEqual(self.cyclic.find_cycle(), [2, 3, 4])
+        self.assertEqual(str(self.cyclic), before)
+        self.assertIsNone(BoolCirc.adder(2).find_cycle())
+
+    def test_is_cyclic(self):
+        self.assertTrue(self.cyclic.is_cyclic)
+        self.cyclic.remove_edges((4, 2))
+        self.assertFalse(self.cyclic.is_cyclic)
+        self.assertFalse(BoolCirc.adder_0().is_cyclic)
+
+    def test_self_loop(self):
+        self.cyclic.remove_edges((4, 2))
+        self.cyclic.add_edge(3, 3)
+        self.assertEqual(self.cyclic.find_cycle(), [3])
+
+    def test_long_chain(self):
+        chain = OpenDigraph.empty()
+        previous = chain.add_node()
+        for i in range(5 * sys.getrecursionlimit()):
+            previous = chain.add_node(parents={previous: 1})
+        self.assertFalse(chain.is_cyclic)
+        chain.add_edge(previous, 0)
+        self.assertEqual(len(chain.find_cycle()), len(chain.nodes))
+
+    def test_connected_components(self):
+        circ = BoolCirc.adder_0().parallel(BoolCirc.adder_0())
+        count, output = circ.connected_components
+        self.assertEqual(count, 2)
+        self.assertEqual(set(output), set(circ.nodes))
+        self.assertEqual(output[circ.inputs[0]], 0)
+        self.assertEqual(output[circ.inputs[3]], 1)
+
+        lonely = circ.add_node("1")
+        self.assertEqual(circ.connected_components[0], 3)
+        circ.add_edge(lonely, circ.outputs[0])
+        self.assertEqual(circ.connected_components[0], 2)
+        circ.add_edges_bulk([(circ.inputs[0], circ.inputs[3])])
+        self.assertEqual(circ.connected_components[0], 1)
+        circ.remove_edges((circ.inputs[0], circ.inputs[3]))
+        self.assertEqual(circ.connected_components[0], 2)
+        circ.remove_node_by_id(lonely)
+        self.assertEqual(circ.connected_components[0], 2)
+
+    def test_components_long_chain(self):
+        chain = OpenDigraph.from_edges(range(2 * 10**4), [(i, i + 1) for i in range(2 * 10**4 - 1)])
+        self.assertEqual(chain.connected_components[0], 1)
+        visited = set()
+        component = []
+        chain.dfs(visited, chain[0], component)
+        self.assertEqual(len(component), 2 * 10**4)
+
+
+if __name__ == "__main__":  # the following code is called only when
+    unittest.main()  # precisely this file is run
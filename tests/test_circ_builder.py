@@ -0,0 +1,70 @@
+import sys
+import os
+
+root = os.path.normpath(os.path.join(__file__, "./../.."))
+sys.path.append(root)  # allows us to fetch files from the project root
+import unittest
+
+from modules.bool_circ import *
+
+
+class test_circ_builder(unittest.TestCase):
+    def test_build(self):
+        builder = CircBuilder()
+        x = builder.input()
+        y = builder.input()
+        builder.output(builder.xor(x, builder.not_(y)))
+        builder.output(builder.and_(x, x, builder.constant(1)))
+        circ = builder.build(BoolCirc)
+
+        self.assertEqual(circ.inputs, [0, 2])
+        self.assertEqual(len(circ.outputs), 2)
+        self.assertEqual(circ.truth_table_bits(), ["1001", "0011"])
+        self.assertEqual(circ[builder.nodes[x].get_children_ids[1]].parents[x], 2)
+
+    def test_single_signal(self):
+        builder = CircBuilder()
+        x = builder.input()
+        self.assertEqual(builder.and_(x), x)
+        self.assertNotEqual(builder.not_(x), x)
+
+    def test_invalid_gates(self):
+        builder = CircBuilder()
+        x = builder.input()
+        y = builder.input()
+        self.assertRaises(ValueError, builder.gate, "~", x, y)
+        self.assertRaises(ValueError, builder.gate, "nand", x, y)
+        self.assertRaises(ValueError, builder.and_, x, 0)
+        self.assertRaises(ValueError, builder.constant, 2)
+        self.assertRaises(ValueError, builder.output, builder.output(x))
+        builder.output(builder.xor(x, y))
+        self.assertEqual(builder.build(BoolCirc).validate(), [])
+
+    def test_build_open_digraph(self):
+        builder = CircBuilder()
+        builder.output(builder.input())
+        digraph = builder.build()
+        self.assertEqual(type(digraph), OpenDigraph)
+        self.assertEqual(str(digraph.nodes), str({0: Node(0, "", {}, {1: 1}), 1: Node(1, "", {0: 1}, {2: 1}), 2: Node(2, "", {1: 1}, {})}))
+
+    def test_hash_consing(self):
+        builder = CircBuilder(hash_consing=True)
+        x = builder.input()
+        y = builder.input()
+        self.assertEqual(builder.and_(x, y), builder.and_(y, x))
+        self.assertNotEqual(builder.and_(x, y), builder.and_(x, x, y))
+        self.assertNotEqual(builder.and_(x, y), builder.or_(x, y))
+        self.assertEqual(builder.not_(x), builder.not_(x))
+        self.assertEqual(builder.constant(1), builder.constant(1))
+        builder.output(builder.and_(x, y))
+        circ = builder.build(BoolCirc)
+        self.assertEqual(circ.validate(), [])
+        self.assertEqual([node.label for node in circ.get_nodes].count("&"), 2)
+
+        plain = CircBuilder()
+        x = plain.input()
+        self.assertNotEqual(plain.not_(x), plain.not_(x))
+
+
+if __name__ == "__main__":  # the following code is called only when
+    unittest.main()  # precisely this file is run
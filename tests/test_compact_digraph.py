@@ -0,0 +1,157 @@
+import sys
+import os
+
+root = os.path.normpath(os.path.join(__file__, "./../.."))
+sys.path.append(root)  # allows us to fetch files from the project root
+import unittest
+from unittest import mock
+import mmap
+import tempfile
+
+from modules.compact_digraph import *
+from modules.bool_circ import BoolCirc
+
+
+class test_compact_digraph(unittest.TestCase):
+    def setUp(self):
+        i0 = Node(10, "i0", {}, {0: 1})
+        i1 = Node(11, "i1", {}, {2: 1})
+
+        n0 = Node(0, "", {10: 1}, {3: 1})
+        n1 = Node(1, "&", {}, {4: 1, 5: 1, 8: 1})
+        n2 = Node(2, "", {11: 1}, {4: 1})
+        n3 = Node(3, "&", {0: 1}, {5: 1, 6: 1, 7: 1})
+        n4 = Node(4, "", {1: 1, 2: 1}, {6: 1})
+        n5 = Node(5, "", {1: 1, 3: 1}, {7: 1})
+        n6 = Node(6, "", {3: 1, 4: 1}, {8: 1, 9: 2})
+        n7 = Node(7, "", {3: 1, 5: 1}, {12: 1})
+        n8 = Node(8, "", {1: 1, 6: 1}, {})
+        n9 = Node(9, "", {6: 2}, {})
+
+        o0 = Node(12, "o0", {7: 1}, {})
+
+        self.digraph = OpenDigraph(
+            [10, 11], [12], [i0, i1, n0, n1, n2, n3, n4, n5, n6, n7, n8, n9, o0]
+        )
+        self.compact = CompactDigraph.from_open_digraph(self.digraph)
+
+    def test_round_trip(self):
+        self.assertEqual(str(self.compact), str(self.digraph))
+        digraph = self.compact.to_open_digraph()
+        self.assertEqual(str(digraph.nodes), str(self.digraph.nodes))
+        self.assertEqual(digraph.inputs, [10, 11])
+        self.assertEqual(digraph.outputs, [12])
+
+    def test_interned_labels(self):
+        self.assertEqual(self.compact.labels, ["i0", "i1", "", "&", "o0"])
+        self.assertEqual(len(self.compact.label_index), 13)
+
+    def test_nodes(self):
+        node = self.compact[6]
+        self.assertEqual(node.get_label, "")
+        self.assertEqual(node.get_parent_ids, [3, 4])
+        self.assertEqual(node.children, {8: 1, 9: 2})
+        self.assertEqual(node.in_degree, 2)
+        self.assertEqual(node.out_degree, 3)
+        self.assertIn(12, self.compact.nodes)
+        self.assertNotIn(13, self.compact.nodes)
+        self.assertEqual(self.compact.get_node_ids, self.digraph.get_node_ids)
+
+    def test_depth_mx(self):
+        self.assertEqual(self.compact.tri_topologique, self.digraph.tri_topologique)
+        self.assertEqual(self.compact.depth, self.digraph.depth)
+        self.assertEqual(self.compact.dijkstra(6), self.digraph.dijkstra(6))
+        self.assertEqual(self.compact.shortest_path(2, 8), [2, 4, 6, 8])
+        self.assertEqual(
+            self.compact.common_ancestors(8, 9), self.digraph.common_ancestors(8, 9)
+        )
+        self.assertEqual(self.compact.longest_path(0, 7), self.digraph.longest_path(0, 7))
+
+    def test_matrix_mx(self):
+        self.assertEqual(self.compact.adjency_matrix, self.digraph.adjency_matrix)
+        self.assertEqual(self.compact.csr_matrix, self.digraph.csr_matrix)
+
+    def test_binary_round_trip(self):
+        path = os.path.join(tempfile.mkdtemp(), "digraph.odg")
+        self.compact.save(path)
+        loaded = CompactDigraph.load(path)
+        self.assertEqual(str(loaded), str(self.digraph))
+        self.assertEqual(loaded.labels, self.compact.labels)
+        self.assertEqual(loaded.inputs, [10, 11])
+        self.assertEqual(loaded[6].children, {8: 1, 9: 2})
+        self.assertEqual(loaded.tri_topologique, self.digraph.tri_topologique)
+
+        # a loaded graph can be saved again
+        loaded.save(path + "2")
+        self.assertEqual(open(path, "rb").read(), open(path + "2", "rb").read())
+        loaded.close()
+        os.remove(path)
+        os.remove(path + "2")
+
+    def test_binary_bool_circ(self):
+        path = os.path.join(tempfile.mkdtemp(), "adder.odg")
+        adder = BoolCirc.adder(2)
+        CompactDigraph.from_open_digraph(adder).save(path)
+        loaded = CompactDigraph.load(path)
+        circ = loaded.to_open_digraph(BoolCirc)
+        loaded.close()
+        os.remove(path)
+        self.assertTrue(isinstance(circ, BoolCirc))
+        self.assertEqual(str(circ), str(adder))
+        self.assertEqual(circ.truth_table(), adder.truth_table())
+
+    def test_binary_errors(self):
+        path = os.path.join(tempfile.mkdtemp(), "digraph.odg")
+        with open(path, "wb") as file:
+            file.write(b"digraph G {}".ljust(64))
+        self.assertRaises(Exception, CompactDigraph.load, path)
+
+        self.compact.save(path)
+        with open(path, "r+b") as file:
+            file.seek(4)
+            file.write(bytes([2]))
+        self.assertRaises(Exception, CompactDigraph.load, path)
+
+        # corrupted out_offsets, then an out of range target
+        n = len(self.compact.ids)
+        out_offsets = BINARY_HEADER_SIZE + 8 * n + 4 * n + padding(4 * n)
+        out_targets = out_offsets + 8 * (n + 1)
+        for position, value in [(out_offsets + 8, 2**31 - 1), (out_targets, n)]:
+            self.compact.save(path)
+            with open(path, "r+b") as file:
+                file.seek(position)
+                file.write(value.to_bytes(4, "little"))
+            with self.assertRaises(Exception) as context:
+                CompactDigraph.load(path)
+            self.assertTrue("isn't a valid binary digraph file" in str(context.exception))
+        os.remove(path)
+
+    def test_binary_errors_release_mapping(self):
+        path = os.path.join(tempfile.mkdtemp(), "digraph.odg")
+        open(path, "wb").close()
+        with self.assertRaises(Exception) as context:
+            CompactDigraph.load(path)
+        self.assertTrue("isn't a binary digraph file" in str(context.exception))
+
+        self.compact.save(path)
+        with open(path, "rb") as file:
+            data = file.read()
+        buffers = []
+        mmap_class = mmap.mmap
+
+        def recording_mmap(*args, **kwargs):
+            buffers.append(mmap_class(*args, **kwargs))
+            return buffers[-1]
+
+        for content in [b"XXXX" + data[4:], data[:4] + bytes([2]) + data[5:], data[:-8], data[:80]]:
+            with open(path, "wb") as file:
+                file.write(content)
+            with mock.patch("mmap.mmap", recording_mmap):
+                self.assertRaises(Exception, CompactDigraph.load, path)
+            self.assertTrue(buffers[-1].closed)
+        self.assertEqual(len(buffers), 4)
+        os.remove(path)
+
+
+if __name__ == "__main__":  # the following code is called only when
+    unittest.main()  # precisely this file is run
@@ -0,0 +1,86 @@
+import sys
+import os
+
+root = os.path.normpath(os.path.join(__file__, "./../.."))
+sys.path.append(root)  # allows us to fetch files from the project root
+import unittest
+import itertools
+
+from modules.bool_circ import *
+
+
+class test_compile_mx(unittest.TestCase):
+    def setUp(self):
+        self.adder_0 = BoolCirc.adder_0()
+        self.adder_1 = BoolCirc.adder(1)
+
+    def test_compile(self):
+        program = self.adder_0.compile()
+        self.assertEqual(len(program), 5)
+        self.assertEqual(program.input_slots, [0, 1, 2])
+        self.assertEqual(len(program.output_slots), 2)
+
+    def test_compile_keeps_graph(self):
+        before = str(self.adder_1.nodes)
+        self.adder_1.compile().evaluate([1, 1, 1, 0, 1])
+        self.assertEqual(str(self.adder_1.nodes), before)
+
+    def test_evaluate(self):
+        program = self.adder_0.compile()
+        for a, b, c in itertools.product([0, 1], repeat=3):
+            carry, r = program.evaluate([a, b, c])
+            self.assertEqual(2 * carry + r, a + b + c)
+
+    def test_evaluate_adder(self):
+        program = self.adder_1.compile()
+        for a0, b0, c, a1, b1 in itertools.product([0, 1], repeat=5):
+            r0, carry, r1 = program.evaluate([a0, b0, c, a1, b1])
+            self.assertEqual(
+                4 * carry + 2 * r1 + r0, (a0 + 2 * a1) + (b0 + 2 * b1) + c
+            )
+
+    def test_evaluate_many(self):
+        program = self.adder_1.compile()
+        assignments = [list(a) for a in itertools.product([0, 1], repeat=5)]
+        self.assertEqual(
+            program.evaluate_many(assignments),
+            [program.evaluate(a) for a in assignments],
+        )
+
+    def test_evaluate_wrong_inputs(self):
+        self.assertRaises(Exception, self.adder_0.compile().evaluate, [0, 1])
+
+    def test_neutral_gates(self):
+        n0 = Node(0, "&", {}, {2: 1})
+        n1 = Node(1, "^", {}, {3: 1})
+        o0 = Node(2, "", {0: 1}, {})
+        o1 = Node(3, "", {1: 1}, {})
+        circ = BoolCirc(OpenDigraph([], [2, 3], [n0, n1, o0, o1]))
+        self.assertEqual(circ.compile().evaluate([], width=4), [15, 0])
+
+    def test_truth_table(self):
+        self.assertEqual(self.adder_0.truth_table(), [0b11101000, 0b10010110])
+        self.assertEqual(self.adder_0.truth_table_bits(), ["00010111", "01101001"])
+
+    def test_truth_table_chunks(self):
+        program = self.adder_1.compile()
+        tables = self.adder_1.truth_table(chunk_bits=3)
+        self.assertEqual(tables, self.adder_1.truth_table())
+        for chunk_bits in [0, 1, 2]:
+            self.assertEqual(self.adder_1.truth_table(chunk_bits=chunk_bits), tables)
+            self.assertEqual(self.adder_0.truth_table(chunk_bits=chunk_bits), self.adder_0.truth_table())
+        for i in range(32):
+            bits = [(i >> (4 - x)) & 1 for x in range(5)]
+            outputs = program.evaluate(bits)
+            self.assertEqual([(table >> i) & 1 for table in tables], outputs)
+
+    def test_equivalent(self):
+        self.assertTrue(self.adder_1.equivalent(BoolCirc.adder(1)))
+        self.assertFalse(self.adder_1.equivalent(self.adder_0))
+        other = BoolCirc(parse_parenthesis("((x0)&(x1))|(x2)"))
+        self.assertTrue(other.equivalent(BoolCirc(parse_parenthesis("(((x0)&(x1))|(x2))|((x0)&(x1))"))))
+        self.assertFalse(other.equivalent(BoolCirc(parse_parenthesis("((x0)&(x1))^(x2)"))))
+
+
+if __name__ == "__main__":  # the following code is called only when
+    unittest.main()  # precisely this file is run
@@ -0,0 +1,170 @@
+import sys
+import os
+
+root = os.path.normpath(os.path.join(__file__, "./../.."))
+sys.path.append(root)  # allows us to fetch files from the project root
+import unittest
+import random
+
+from modules.containers import *
+
+
+class test_port_list(unittest.TestCase):
+    def setUp(self):
+        self.ports = PortList([4, 8, 15, 16, 23, 42])
+
+    def test_list_behaviour(self):
+        self.assertEqual(self.ports, [4, 8, 15, 16, 23, 42])
+        self.assertEqual([4, 8, 15, 16, 23, 42], self.ports)
+        self.assertEqual(str(self.ports), "[4, 8, 15, 16, 23, 42]")
+        self.assertEqual(self.ports[1], 8)
+        self.assertEqual(self.ports[-2:], [23, 42])
+        self.assertEqual(len(self.ports), 6)
+        self.assertTrue(15 in self.ports)
+        self.assertFalse(5 in self.ports)
+
+    def test_remove(self):
+        self.ports.remove(15)
+        self.ports.remove(42)
+        self.assertEqual(self.ports, [4, 8, 16, 23])
+        self.assertEqual(self.ports.index(23), 3)
+        self.assertEqual(self.ports[2], 16)
+        self.assertRaises(ValueError, self.ports.remove, 15)
+        self.assertRaises(ValueError, self.ports.index, 15)
+
+    def test_edit(self):
+        self.ports += [1, 2]
+        self.ports.insert(0, 3)
+        self.ports[1] = 5
+        self.assertEqual(self.ports.pop(), 2)
+        del self.ports[2]
+        self.assertEqual(self.ports, [3, 5, 15, 16, 23, 42, 1])
+        self.assertEqual(self.ports.index(42), 5)
+        self.assertRaises(ValueError, self.ports.append, 16)
+        self.assertRaises(ValueError, self.ports.__setitem__, 0, 16)
+        self.assertRaises(ValueError, self.ports.insert, 0, 16)
+
+    def test_remove_while_iterating(self):
+        ports = PortList([1, 2, 3, 4, 5])
+        seen = []
+        for port_id in ports:
+            seen.append(port_id)
+            if port_id == 2:
+                ports.remove(3)
+        self.assertEqual(seen, [1, 2, 3, 4, 5])
+        self.assertEqual(list(ports), [1, 2, 4, 5])
+
+    def test_version(self):
+        versions = [self.ports.version]
+        for edit in [
+            lambda: self.ports.append(1),
+            lambda: self.ports.remove(1),
+            lambda: self.ports.insert(0, 2),
+            lambda: self.ports.__setitem__(0, 3),
+            lambda: self.ports.reverse(),
+            lambda: self.ports.sort(),
+            lambda: self.ports.pop(),
+            lambda: self.ports.clear(),
+        ]:
+            edit()
+            self.assertNotIn(self.ports.version, versions)
+            versions.append(self.ports.version)
+        self.ports.index
+        list(self.ports)
+        self.assertEqual(self.ports.version, versions[-1])
+
+    def test_copy(self):
+        copy = self.ports.copy()
+        copy.remove(4)
+        self.assertEqual(len(self.ports), 6)
+        self.assertEqual(copy + [1], [8, 15, 16, 23, 42, 1])
+
+    def test_random_edits(self):
+        random.seed(1)
+        ports = PortList()
+        reference = []
+        for k in range(2000):
+            if reference and random.random() < 0.4:
+                port_id = random.choice(reference)
+                ports.remove(port_id)
+                reference.remove(port_id)
+            else:
+                ports.append(k)
+                reference.append(k)
+            if k % 97 == 0:
+                self.assertEqual(ports, reference)
+        self.assertEqual([ports.index(port_id) for port_id in reference], list(range(len(reference))))
+
+    def test_interleaved_positions(self):
+        random.seed(2)
+        ports = PortList(range(3000))
+        reference = list(range(3000))
+        for k in range(3000):
+            if reference and random.random() < 0.6:
+                port_id = random.choice(reference)
+                self.assertEqual(ports.index(port_id), reference.index(port_id))
+                ports.remove(port_id)
+                reference.remove(port_id)
+            else:
+                ports.append(3000 + k)
+                reference.append(3000 + k)
+            if reference:
+                i = random.randrange(-len(reference), len(reference))
+                self.assertEqual(ports[i], reference[i])
+                port_id = random.choice(reference)
+                self.assertEqual(ports.index(port_id), reference.index(port_id))
+            self.assertEqual(len(ports), len(reference))
+        self.assertEqual(ports, reference)
+
+    def test_interleaved_positions_large(self):
+        ports = PortList(range(10**5))
+        for k in range(5 * 10**4):
+            ports.remove(2 * k)
+            self.assertEqual(ports.index(2 * k + 1), k)
+            self.assertEqual(ports[k], 2 * k + 1)
+        self.assertEqual(len(ports), 5 * 10**4)
+
+
+class test_node_map(unittest.TestCase):
+    def test_next_id(self):
+        nodes = NodeMap({3: None, 7: None})
+        self.assertEqual(nodes.next_id, 8)
+        nodes[10] = None
+        del nodes[10]
+        self.assertEqual(nodes.next_id, 11)
+        self.assertEqual(nodes.copy().next_id, 11)
+
+
+
+class test_union_find(unittest.TestCase):
+    def test_union(self):
+        sets = UnionFind(range(6))
+        self.assertEqual((len(sets), sets.count), (6, 6))
+        self.assertTrue(sets.union(0, 1))
+        self.assertTrue(sets.union(2, 1))
+        self.assertFalse(sets.union(0, 2))
+        self.assertTrue(sets.connected(0, 2))
+        self.assertFalse(sets.connected(0, 3))
+        self.assertEqual(sets.count, 4)
+        sets.union(7, 3)
+        self.assertTrue(7 in sets)
+        self.assertEqual((len(sets), sets.count), (7, 4))
+
+    def test_long_chain(self):
+        sets = UnionFind()
+        for i in range(10000):
+            sets.union(i + 1, i)
+        self.assertEqual(sets.count, 1)
+        root = sets.find(0)
+        self.assertTrue(all(sets._parent[i] == root for i in range(10001)))
+
+    def test_copy(self):
+        sets = UnionFind(range(3))
+        other = sets.copy()
+        other.union(0, 1)
+        self.assertFalse(sets.connected(0, 1))
+        self.assertTrue(other.connected(0, 1))
+
+
+if __name__ == "__main__":  # the following code is called only when
+    unittest.main()  # precisely this file is run
@@ -41,6 +41,37 @@ class test_depth_mx(unittest.TestCase):
         self.assertEqual(prev[7], 3)
         self.assertEqual(prev[12], 7)
 
+    def test_bfs_sources(self):
+        dist, prev = self.test_graph.bfs([0, 1], direction=1)
+        self.assertEqual(dist[5], 1)
+        self.assertEqual(dist[7], 2)
+        self.assertEqual(dist[9], 3)
+        self.assertNotIn(2, dist)
+        self.assertEqual(prev[8], 1)
+
+    def test_weighted_dijkstra(self):
+        delays = {3: 5, 4: 1, 6: 1}
+        weight = lambda u, v: delays.get(v, 1)
+        dist, prev = self.test_graph.dijkstra(0, direction=1, weight=weight)
+        self.assertEqual(dist[3], 5)
+        self.assertEqual(dist[7], 6)
+        self.assertEqual(prev[7], 3)
+        dist, prev = self.test_graph.dijkstra(1, tgt=6, direction=1, weight=weight)
+        self.assertEqual(dist[6], 2)
+        self.assertEqual(prev[6], 4)
+
+    def test_shortest_paths(self):
+        pairs = [(0, 7), (2, 8), (1, 8), (0, 9)]
+        paths = self.test_graph.shortest_paths(pairs)
+        for u, v in pairs:
+            self.assertEqual(paths[(u, v)], self.test_graph.shortest_path(u, v))
+
+    def test_common_ancestors_many(self):
+        pairs = [(5, 8), (8, 9), (5, 9)]
+        output = self.test_graph.common_ancestors_many(pairs)
+        for n1, n2 in pairs:
+            self.assertEqual(output[(n1, n2)], self.test_graph.common_ancestors(n1, n2))
+
     def test_shortest_path(self):
         self.assertEqual(self.test_graph.shortest_path(0, 7), [0, 3, 7])
         self.assertEqual(self.test_graph.shortest_path(2, 8), [2, 4, 6, 8])
@@ -75,12 +106,80 @@ class test_depth_mx(unittest.TestCase):
             self.test_graph.tri_topologique, [[0, 1, 2], [3, 4], [5, 6], [7, 8, 9]]
         )
 
+    def test_tri_topologique_keeps_graph(self):
+        before = str(self.test_graph)
+        self.test_graph.tri_topologique
+        self.assertEqual(str(self.test_graph), before)
+        self.assertEqual(self.test_graph.inputs, [10, 11])
+        self.assertEqual(self.test_graph.outputs, [12])
+
+    def test_tri_topologique_cycle(self):
+        self.test_graph.add_edge(8, 1)
+        self.assertEqual(self.test_graph.tri_topologique, [[0, 2], [3]])
+
     def test_node_depth(self):
         self.assertEqual(self.test_graph.node_depth(0), 0)
         self.assertEqual(self.test_graph.node_depth(3), 1)
         self.assertEqual(self.test_graph.node_depth(5), 2)
         self.assertEqual(self.test_graph.node_depth(9), 3)
 
+    def test_level_index(self):
+        index = self.test_graph.level_index
+        self.assertIs(self.test_graph.level_index, index)
+        self.assertEqual(index[9], 3)
+        self.assertNotIn(10, index)
+        self.assertNotIn(12, index)
+
+    def test_level_index_updates(self):
+        self.test_graph.level_index
+        new_id = self.test_graph.add_node(parents={9: 1})
+        self.assertEqual(self.test_graph.node_depth(new_id), 4)
+        self.test_graph.add_edge(new_id, 1)
+        self.assertIsNone(self.test_graph.node_depth(1))
+        self.test_graph.remove_edges((new_id, 1))
+        self.assertEqual(self.test_graph.node_depth(8), 3)
+        self.test_graph.add_edge(7, 2)
+        self.assertEqual(self.test_graph.node_depth(2), 4)
+        self.assertEqual(self.test_graph.node_depth(6), 6)
+        self.test_graph.remove_node_by_id(7)
+        self.assertEqual(self.test_graph.node_depth(6), 2)
+        self.test_graph.fusion(5, 9)
+        self.assertEqual(self.test_graph.node_depth(5), 3)
+
+    def test_level_index_port_edits(self):
+        graph = OpenDigraph.from_edges(range(3), [(0, 1), (1, 2)])
+        self.assertEqual(graph.tri_topologique, [[0], [1], [2]])
+        graph.inputs.append(0)
+        self.assertEqual(graph.tri_topologique, [[1], [2]])
+        graph.outputs.extend([2])
+        self.assertEqual(graph.tri_topologique, [[1]])
+        graph.inputs.remove(0)
+        self.assertEqual(graph.tri_topologique, [[0], [1]])
+        graph.outputs[0] = 1
+        self.assertEqual(graph.tri_topologique, [[0, 2]])
+        self.assertEqual(graph.copy.tri_topologique, [[0, 2]])
+
+    def test_level_index_random_edits(self):
+        for i in range(200):
+            node_ids = [
+                node_id
+                for node_id in self.test_graph.nodes
+                if not (node_id in self.test_graph.inputs)
+                and not (node_id in self.test_graph.outputs)
+            ]
+            src, tgt = random.choice(node_ids), random.choice(node_ids)
+            if i % 3 == 0:
+                self.test_graph.add_node(parents={src: 1})
+            elif tgt in self.test_graph[src].children:
+                self.test_graph.remove_edges((src, tgt))
+            else:
+                self.test_graph.add_edge(src, tgt)
+            expected = {}
+            for depth, level in enumerate(self.test_graph._kahn_levels()):
+                for node_id in level:
+                    expected[node_id] = depth
+            self.assertEqual(self.test_graph.level_index, expected)
+
     def test_depth(self):
         self.assertEqual(self.test_graph.depth, 4)
 
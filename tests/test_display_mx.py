@@ -4,3 +4,124 @@ import os
 root = os.path.normpath(os.path.join(__file__, "./../.."))
 sys.path.append(root)  # allows us to fetch files from the project root
 import unittest
+import tempfile
+import io
+
+from modules.open_digraph import *
+from modules.bool_circ import BoolCirc
+
+
+class test_display_mx(unittest.TestCase):
+    def setUp(self):
+        self.i0 = Node(0, "i0", {}, {2: 1})
+        self.i1 = Node(1, "i1", {}, {2: 1})
+        self.n0 = Node(2, "a", {0: 1, 1: 1, 4: 1}, {3: 1, 4: 1})
+        self.n1 = Node(3, "b", {2: 1}, {4: 2, 5: 1})
+        self.n2 = Node(4, "c", {2: 1, 3: 2}, {2: 1, 6: 1})
+        self.o0 = Node(5, "o0", {3: 1}, {})
+        self.o1 = Node(6, "o1", {4: 1}, {})
+
+        self.od1 = OpenDigraph(
+            [0, 1],
+            [5, 6],
+            [self.i0, self.i1, self.n0, self.n1, self.n2, self.o0, self.o1],
+        )
+        self.path = os.path.join(tempfile.mkdtemp(), "digraph.dot")
+
+    def tearDown(self):
+        if os.path.exists(self.path):
+            os.remove(self.path)
+
+    def test_dot_round_trip(self):
+        self.od1.save_sa_dot_file(self.path)
+        digraph = OpenDigraph.from_dot_file(self.path)
+        self.assertEqual(str(digraph), str(self.od1))
+        self.assertEqual(digraph.inputs, [0, 1])
+        self.assertEqual(digraph.outputs, [5, 6])
+
+    def test_dot_round_trip_gzip(self):
+        path = self.path + ".gz"
+        self.od1.save_sa_dot_file(path)
+        digraph = OpenDigraph.from_dot_file(path)
+        os.remove(path)
+        self.assertEqual(str(digraph), str(self.od1))
+        self.assertEqual(digraph.outputs, [5, 6])
+
+    def test_dot_round_trip_bool_circ(self):
+        adder = BoolCirc.adder_0()
+        adder.save_sa_dot_file(self.path)
+        circ = BoolCirc(OpenDigraph.from_dot_file(self.path))
+        self.assertEqual(str(circ), str(adder))
+        self.assertEqual(circ.compile().evaluate([1, 0, 1]), adder.compile().evaluate([1, 0, 1]))
+        self.assertEqual(circ.truth_table(), adder.truth_table())
+
+    def test_write_dot(self):
+        stream = io.StringIO()
+        self.od1.write_dot(stream)
+        text = stream.getvalue()
+        self.assertTrue(text.startswith("digraph G {\n"))
+        self.assertTrue(text.endswith("}"))
+        self.assertEqual(text.count("    v3 -> v4;\n"), 2)
+        self.assertEqual(text.count("[color=blue]"), 2)
+
+        self.od1.write_dot(stream, verbose=True)
+        self.assertTrue('v2 [label="a id=2"];' in stream.getvalue())
+
+    def test_write_dot_escapes_labels(self):
+        self.od1.get_node_by_id(2).set_label('say "hi" \\')
+        stream = io.StringIO()
+        self.od1.write_dot(stream)
+        labels = parse_dot(stream.getvalue().splitlines())[0]
+        self.assertEqual(labels[2], 'say "hi" \\')
+
+    def test_parse_dot(self):
+        lines = [
+            "digraph G {",
+            '    v0 [label="x \\"y\\"", color=blue, shape=box];',
+            "    v0 -> v1 -> v2 [color=black];  // comment",
+            "    node [shape=circle]",
+            "    v1->v2",
+            "    v2",
+            '    [label="&"]',
+            "    v2 -> v3;",
+            "}",
+        ]
+        labels, inputs, outputs, edges = parse_dot(lines)
+        self.assertEqual(labels, {0: 'x "y"', 2: "&", 1: "", 3: ""})
+        self.assertEqual(inputs, [0])
+        self.assertEqual(outputs, [])
+        self.assertEqual(edges, {(0, 1): 1, (1, 2): 2, (2, 3): 1})
+
+    def test_parse_dot_empty_labels(self):
+        lines = ["digraph G {", '    v0 [label=""];', "    v0 -> v1;"]
+        # short files go through the per-line path, long ones through the chunked one
+        for count in [1, DOT_CHUNK]:
+            labels = parse_dot(lines + ['    v1 [label=""];'] * count + ["}"])[0]
+            self.assertEqual(labels, {0: "", 1: ""})
+
+    def test_parse_dot_errors(self):
+        # a port declared twice, on the chunked, per-line and tokenized paths
+        for lines, line, column in [
+            (["    v0 [color=blue];"] * 2 + ["    v0 -> v1;"] * DOT_CHUNK, 3, 5),
+            (["    v0 [color=blue];", "  v0 [color=blue];", "}"], 3, 3),
+            (["    v0 [color=red];", "    v0 [color=red, label=a];", "}"], 3, 5),
+        ]:
+            with self.assertRaises(ParseError) as context:
+                parse_dot(["digraph G {"] + lines)
+            self.assertEqual((context.exception.line, context.exception.column), (line, column))
+
+        with self.assertRaises(ParseError) as context:
+            parse_dot(["digraph G {", "    v0 -> ;", "}"])
+        self.assertEqual((context.exception.line, context.exception.column), (2, 11))
+
+        with self.assertRaises(ParseError) as context:
+            parse_dot(["digraph G {", "    v0 -> v1;"])
+        self.assertEqual(context.exception.line, 2)
+
+        with self.assertRaises(ParseError) as context:
+            parse_dot(["digraph G {", "    x0 [label=a];", "}"])
+        self.assertEqual((context.exception.line, context.exception.column), (2, 5))
+
+
+if __name__ == "__main__":  # the following code is called only when
+    unittest.main()  # precisely this file is run
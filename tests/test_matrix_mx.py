@@ -36,8 +36,58 @@ class test_open_digraph(unittest.TestCase):
                 if i > j:
                     self.assertEqual(m[i][j], 0)
 
+    def test_random_edges(self):
+        edges = random_edges(50, 0.2, bound=3, null_diag=True)
+        for (i, j), multi in edges.items():
+            self.assertNotEqual(i, j)
+            self.assertTrue(0 <= i < 50 and 0 <= j < 50)
+            self.assertTrue(1 <= multi <= 3)
+        edges = random_edges(50, 0.2, triangular=True)
+        for i, j in edges:
+            self.assertTrue(i < j)
+        self.assertEqual(len(random_edges(10, 1, null_diag=True)), 90)
+        self.assertEqual(len(random_edges(10, 1, triangular=True)), 45)
+        self.assertEqual(random_edges(10, 0), {})
+
+    def test_random_dag_edges(self):
+        edges = random_dag_edges(100, 3)
+        out_degrees = [0] * 100
+        for i, j in edges:
+            self.assertTrue(i < j)
+            out_degrees[i] += 1
+        self.assertEqual(out_degrees, [min(3, 99 - i) for i in range(100)])
+
     def test_adjency_matrix(self):
         self.assertEqual(self.od0.adjency_matrix, [[0, 1], [0, 0]])
+
+    def test_sparse_matrix(self):
+        od = OpenDigraph.random(30, 3, form="free")
+        dense = od.adjency_matrix
+        rows, columns, values = od.coo_matrix
+        self.assertEqual(
+            list(zip(rows, columns, values)),
+            [(i, j, m) for i, row in enumerate(dense) for j, m in enumerate(row) if m],
+        )
+        offsets, csr_columns, csr_values = od.csr_matrix
+        self.assertEqual(len(offsets), 31)
+        self.assertEqual((csr_columns, csr_values), (columns, values))
+        for i in range(30):
+            self.assertEqual(offsets[i + 1] - offsets[i], sum(1 for m in dense[i] if m))
+
+    def test_graph_from_sparse(self):
+        od = OpenDigraph([5], [], [Node(5, "", {}, {9: 2}), Node(9, "", {5: 2}, {}), Node(7, "", {}, {})])
+        ids = list(od.enumerate_digraph)
+        self.assertEqual(ids, [5, 9, 7])
+        for form, matrix in [("coo", od.coo_matrix), ("csr", od.csr_matrix)]:
+            copy = OpenDigraph.graph_from_sparse(matrix, form, n=3, ids=ids)
+            self.assertEqual(copy.get_node_ids, [5, 9, 7])
+            self.assertEqual(copy.adjency_matrix, od.adjency_matrix)
+        # Without n the isolated last node of a COO matrix is lost
+        self.assertEqual(len(OpenDigraph.graph_from_sparse(od.coo_matrix).nodes), 2)
+        summed = OpenDigraph.graph_from_sparse(([0, 0, 1], [1, 1, 1], [1, 2, 0]))
+        self.assertEqual(summed.adjency_matrix, [[0, 3], [0, 0]])
+        self.assertRaises(Exception, OpenDigraph.graph_from_sparse, od.coo_matrix, "csc")
+        self.assertRaises(Exception, OpenDigraph.graph_from_sparse, od.coo_matrix, ids=[1])
         
 
 if __name__ == "__main__":  # the following code is called only when
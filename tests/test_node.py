@@ -31,6 +31,10 @@ class test_node(unittest.TestCase):
 
     def test_copy(self):
         self.assertIsNot(self.n0.copy, self.n0)
+        copy = self.n0.copy
+        copy.add_child_id(5)
+        self.assertEqual(str(copy), "Node(2, a, {0: 1, 1: 1, 4: 1}, {3: 1, 4: 1, 5: 1})")
+        self.assertEqual(self.n0.children, {3: 1, 4: 1})
 
     def test_get_id(self):
         self.assertEqual(self.n0.get_id, 2)
@@ -95,6 +99,25 @@ class test_node(unittest.TestCase):
     def test_degree(self):
         self.assertEqual(self.n0.degree, 5)
 
+    def test_cached_degrees(self):
+        self.n0.add_child_id(3, 3)
+        self.n0.add_child_id(5)
+        self.assertEqual(self.n0.out_degree, 5)
+        self.n0.remove_child_once(3)
+        self.assertEqual(self.n0.children[3], 2)
+        self.n0.remove_child_id(3)
+        self.n0.remove_parent_once(0)
+        self.n0.add_parent_id(1, 4)
+        self.assertEqual((self.n0.in_degree, self.n0.out_degree), (5, 2))
+
+        self.n0.set_parent_ids({7: 2})
+        self.n0.children = {}
+        self.assertEqual((self.n0.in_degree, self.n0.out_degree), (2, 0))
+
+    def test_slots(self):
+        with self.assertRaises(AttributeError):
+            self.n0.colour = "red"
+
 
 if __name__ == "__main__":  # the following code is called only when
     unittest.main()  # precisely this file is run
@@ -6,6 +6,7 @@ sys.path.append(root)  # allows us to fetch files from the project root
 import unittest
 
 from modules.open_digraph import *
+from modules.bool_circ import BoolCirc
 
 
 class test_init(unittest.TestCase):
@@ -69,6 +70,53 @@ class test_open_digraph(unittest.TestCase):
 
     def test_copy(self):
         self.assertIsNot(self.od0.copy, self.od0)
+        copy = self.od1.copy
+        self.assertEqual(str(copy), str(self.od1))
+        copy.add_edge(0, 3)
+        copy.add_input_id(2)
+        self.assertEqual(self.n1.parents, {2: 1})
+        self.assertEqual(self.od1.inputs, [0, 1])
+        self.assertEqual(copy.new_id, self.od1.new_id)
+
+    def test_copy_keeps_class(self):
+        circ = BoolCirc.adder(1)
+        self.assertEqual(type(circ.copy), BoolCirc)
+        self.assertEqual(type(circ.copy_on_write), BoolCirc)
+
+    def test_copy_on_write(self):
+        copy = self.od1.copy_on_write
+        self.assertIs(copy.nodes, self.od1.nodes)
+        self.assertEqual(copy.tri_topologique, self.od1.tri_topologique)
+
+        copy.add_edge(0, 3)
+        self.assertIsNot(copy.nodes, self.od1.nodes)
+        self.assertEqual(self.n1.parents, {2: 1})
+        self.assertEqual(copy[3].parents, {2: 1, 0: 1})
+
+        # the original is the only owner left, it doesn't copy its nodes
+        nodes = self.od1.nodes
+        self.od1.remove_node_by_id(6)
+        self.assertIs(self.od1.nodes, nodes)
+        self.assertTrue(6 in copy.nodes)
+
+    def test_copy_on_write_bool_circ(self):
+        adder = BoolCirc.adder(1)
+        expected = str(adder)
+        circ = BoolCirc(adder.copy_on_write)
+        circ.remove_node_by_id(2)
+        self.assertEqual(str(adder), expected)
+        self.assertFalse(2 in circ.nodes)
+        other = BoolCirc(adder.copy_on_write)
+        adder.remove_node_by_id(3)
+        self.assertEqual(str(other), expected)
+
+    def test_copy_on_write_original_modified(self):
+        copy = self.od1.copy_on_write
+        second = self.od1.copy_on_write
+        self.od1.remove_edges((3, 4))
+        self.assertEqual(copy[3].children, {4: 2, 5: 1})
+        self.assertEqual(second[4].parents, {2: 1, 3: 2})
+        self.assertIs(copy.nodes, second.nodes)
 
     def test_get_input_ids(self):
         self.assertEqual(self.od1.get_input_ids, [0, 1])
@@ -135,6 +183,18 @@ class test_open_digraph(unittest.TestCase):
     def test_new_id(self):
         self.assertNotIn(self.od1.new_id, self.od1.get_node_ids)
 
+    def test_new_id_after_edits(self):
+        self.assertEqual(self.od1.new_id, 7)
+        self.od1.nodes[12] = Node(12, "", {}, {})
+        self.assertEqual(self.od1.new_id, 13)
+        self.od1.remove_node_by_id(12)
+        self.assertEqual(self.od1.new_id, 13)
+        self.od1.shift_indices(5)
+        self.assertNotIn(self.od1.new_id, self.od1.get_node_ids)
+        self.assertEqual(self.od1.new_id, 18)
+        self.od0.iparallel([self.od1])
+        self.assertNotIn(self.od0.new_id, self.od0.get_node_ids)
+
     def test_random_op(self):
         self.assertTrue(self.od1.random_op in self.od1.nodes)
     
@@ -187,10 +247,79 @@ class test_open_digraph(unittest.TestCase):
         self.assertEqual(self.n2.parents, {3: 2})
         self.assertEqual(self.n2.children, {6: 1})
 
-    # def test_is_well_formed(self):
-    #     self.assertIsNone(self.od0.is_well_formed)
-    #     self.assertIsNone(self.od1.is_well_formed)
-    #     self.assertRaises(Exception, self.od2.is_well_formed)
+    def test_is_well_formed(self):
+        self.assertIsNone(self.od0.is_well_formed)
+        self.assertIsNone(self.od1.is_well_formed)
+        with self.assertRaises(IntegrityError) as context:
+            self.od2.is_well_formed
+        self.assertEqual(context.exception.violations, self.od2.validate())
+
+    def test_validate(self):
+        self.assertEqual(self.od1.validate(), [])
+        # every violation is reported, with the node at fault
+        violations = self.od2.validate()
+        self.assertEqual({node_id for node_id, description in violations}, {0, 1, 3, 4})
+        self.assertTrue(len(violations) > 4)
+        self.od1.inputs.append(9)
+        self.n2.children[5] = 1
+        self.assertEqual(
+            self.od1.validate(),
+            [
+                (9, "Input node 9 isn't in the graph"),
+                (4, "Node 5 isn't a child of node 4 or their multiplicity are different"),
+            ],
+        )
+
+    def test_random(self):
+        for form in ["free", "DAG", "oriented", "loop-free", "undirected", "loop-free undirected"]:
+            for p in [None, 0.3]:
+                od = OpenDigraph.random(20, 2, 3, 4, form=form, p=p)
+                od.is_well_formed
+                self.assertEqual(len(od.nodes), 27)
+                self.assertEqual((len(od.inputs), len(od.outputs)), (3, 4))
+                inner = set(range(20))
+                for i in inner:
+                    children = od[i].children
+                    if form in ["DAG", "loop-free", "loop-free undirected", "oriented"]:
+                        self.assertFalse(i in children)
+                    for j in inner & set(children):
+                        if form == "DAG":
+                            self.assertTrue(i < j)
+                        if form == "oriented" and i != j:
+                            self.assertFalse(i in od[j].children)
+                        if form in ["undirected", "loop-free undirected"]:
+                            self.assertEqual(children[j], od[j].children[i])
+        od = OpenDigraph.random(1000, 1, form="DAG", out_degree=2)
+        self.assertEqual(sum(node.out_degree for node in od.get_nodes), 1997)
+        self.assertRaises(Exception, OpenDigraph.random, 10, 1, form="free", out_degree=2)
+        self.assertRaises(Exception, OpenDigraph.random, 10, 1, form="tree")
+
+    def test_from_edges(self):
+        od = OpenDigraph.from_edges(
+            {0: "a", 1: "b", 2: "c"}, [(0, 1), (0, 1), (1, 2, 3), (2, 0, 0)], [], [2]
+        )
+        self.assertEqual(od.get_node_ids, [0, 1, 2])
+        self.assertEqual(od[1].parents, {0: 2})
+        self.assertEqual(od[1].children, {2: 3})
+        self.assertEqual(od[2].get_label, "c")
+        self.assertEqual(od[2].parents, {1: 3})
+        self.assertEqual(od[0].parents, {})
+        self.assertEqual(od.outputs, [2])
+        same = OpenDigraph.from_edges(range(3), {(0, 1): 2, (1, 2): 3}, outputs=[2])
+        self.assertEqual(same.adjency_matrix, od.adjency_matrix)
+        self.assertRaises(Exception, OpenDigraph.from_edges, range(2), [(0, 5)])
+
+    def test_add_edges_bulk(self):
+        od = OpenDigraph.from_edges(range(4), [(0, 1)])
+        depths = od.tri_topologique
+        od.add_edges_bulk([(0, 1), (1, 2), (1, 2, 2), (2, 3)])
+        self.assertEqual(od[0].children, {1: 2})
+        self.assertEqual(od[2].parents, {1: 3})
+        self.assertEqual(od[2].in_degree, 3)
+        self.assertEqual(od.tri_topologique, [[0], [1], [2], [3]])
+        before = str(od)
+        self.assertRaises(Exception, od.add_edges_bulk, [(0, 3), (3, 9)])
+        self.assertEqual(str(od), before)
 
     def test_add_input_node(self):
         self.od1.add_input_node(2)
@@ -0,0 +1,187 @@
+import sys
+import os
+
+root = os.path.normpath(os.path.join(__file__, "./../.."))
+sys.path.append(root)  # allows us to fetch files from the project root
+import unittest
+import random
+
+from modules.bool_circ import *
+
+
+class test_optimize_mx(unittest.TestCase):
+    def assertOptimized(self, circ: BoolCirc) -> dict:
+        """Optimizes circ, checks that it stays a valid circuit of the same function and returns the stats"""
+        table = circ.truth_table()
+        size = len(circ.nodes)
+        stats = circ.optimize()
+        self.assertEqual(circ.validate(), [])
+        self.assertEqual(circ.truth_table(), table)
+        self.assertEqual(stats["removed_nodes"], size - len(circ.nodes))
+        return stats
+
+    def test_constants(self):
+        builder = CircBuilder()
+        x = builder.input()
+        y = builder.input()
+        zero = builder.constant(0)
+        one = builder.constant(1)
+        builder.output(builder.and_(x, one, y))
+        builder.output(builder.or_(x, one))
+        builder.output(builder.xor(x, one, y))
+        builder.output(builder.not_(builder.and_(zero, y)))
+        circ = builder.build(BoolCirc)
+        stats = self.assertOptimized(circ)
+        self.assertTrue(stats["constant_folds"] >= 4)
+        self.assertEqual(sorted(node.label for node in circ.get_nodes if node.label), ["&", "1", "1", "^", "~"])
+
+    def test_double_negation(self):
+        builder = CircBuilder()
+        x = builder.input()
+        builder.output(builder.not_(builder.not_(builder.not_(x))))
+        circ = builder.build(BoolCirc)
+        stats = self.assertOptimized(circ)
+        self.assertEqual(stats["double_negations"], 1)
+        self.assertEqual([node.label for node in circ.get_nodes].count("~"), 1)
+
+    def test_idempotence_and_xor_pairs(self):
+        builder = CircBuilder()
+        x = builder.input()
+        y = builder.input()
+        builder.output(builder.and_(x, x, y))
+        builder.output(builder.xor(x, y, x, x))
+        builder.output(builder.xor(y, y))
+        circ = builder.build(BoolCirc)
+        stats = self.assertOptimized(circ)
+        self.assertEqual(stats["idempotent_inputs"], 1)
+        self.assertEqual(stats["xor_pairs"], 2)
+
+    def test_dead_nodes(self):
+        builder = CircBuilder()
+        x = builder.input()
+        y = builder.input()
+        builder.and_(x, y)
+        builder.output(builder.and_(builder.constant(0), builder.or_(x, y)))
+        circ = builder.build(BoolCirc)
+        stats = self.assertOptimized(circ)
+        self.assertTrue(stats["dead_nodes"] > 0)
+        # every input still has a child and the output reads a constant
+        self.assertEqual(circ.validate(), [])
+        self.assertEqual(circ[circ[circ.outputs[0]].get_parent_ids[0]].label, "0")
+
+    def test_adder_unchanged(self):
+        adder = BoolCirc.adder(2)
+        stats = self.assertOptimized(adder)
+        self.assertEqual(stats["removed_nodes"], 0)
+
+    def test_random(self):
+        random.seed(0)
+        for i in range(100):
+            circ = BoolCirc.random(random.randint(2, 20), 2, random.randint(1, 4), random.randint(1, 3))
+            for input_id in list(circ.inputs)[1:]:
+                if random.random() < 0.3:
+                    circ.inputs.remove(input_id)
+                    circ[input_id].set_label(random.choice("01"))
+            self.assertOptimized(circ)
+
+    def test_long_chain(self):
+        builder = CircBuilder()
+        signal = builder.input()
+        for i in range(20000):
+            signal = builder.not_(signal)
+        builder.output(signal)
+        circ = builder.build(BoolCirc)
+        circ.optimize()
+        self.assertEqual(circ.validate(), [])
+        self.assertTrue(len(circ.nodes) <= 4)
+
+    def test_long_copy_chain(self):
+        # the ids decrease along the chain, so the bottom of the chain comes first
+        n = 20000
+        nodes = {4 * n: ""}
+        edges = []
+        outputs = []
+        parent_id = 4 * n
+        for k in range(n):
+            copy_id = 4 * (n - k) - 1
+            nodes[copy_id] = ""
+            nodes[copy_id - 1] = "~"
+            nodes[copy_id - 2] = ""
+            edges += [(parent_id, copy_id), (copy_id, copy_id - 1), (copy_id - 1, copy_id - 2)]
+            outputs.append(copy_id - 2)
+            parent_id = copy_id
+        nodes = dict(sorted(nodes.items()))
+        circ = BoolCirc(OpenDigraph.from_edges(nodes, edges, [4 * n], outputs))
+        stats = circ.optimize()
+        self.assertEqual(stats["copies"], n - 1)
+        self.assertEqual(circ.validate(), [])
+        self.assertEqual(len(circ[4 * n - 1].children), n)
+
+    def test_structural_hashing(self):
+        builder = CircBuilder()
+        x = builder.input()
+        y = builder.input()
+        builder.output(builder.or_(builder.and_(x, y), builder.and_(y, x), builder.not_(x)))
+        builder.output(builder.xor(builder.not_(x), builder.and_(x, y)))
+        circ = builder.build(BoolCirc)
+        table = circ.truth_table()
+        self.assertEqual(circ.structural_hashing(), 3)
+        self.assertEqual(circ.validate(), [])
+        self.assertEqual(circ.truth_table(), table)
+        labels = [node.label for node in circ.get_nodes]
+        self.assertEqual((labels.count("&"), labels.count("~")), (1, 1))
+        self.assertEqual(circ.structural_hashing(), 0)
+
+    def test_structural_hashing_construct_op(self):
+        random.seed(1)
+        bits = "".join(random.choice("01") for i in range(64))
+        circ = BoolCirc(binary_mx.construct_op(bits))
+        nots = [node.label for node in circ.get_nodes].count("~")
+        merged = circ.structural_hashing()
+        self.assertEqual(merged, nots - 6)
+        self.assertEqual(circ.validate(), [])
+        self.assertEqual(circ.truth_table_bits(), [bits])
+
+    def test_balance_chain(self):
+        formula = "(x15)"
+        for i in range(14, -1, -1):
+            formula = f"(x{i})&({formula})"
+        circ = BoolCirc(parse_parenthesis(formula))
+        reference = circ.copy
+        self.assertEqual(circ.balance(), (17, 6))
+        self.assertEqual(circ.validate(), [])
+        self.assertTrue(circ.equivalent(reference))
+        self.assertEqual(circ.truth_table(), reference.truth_table())
+        self.assertEqual(reference.copy.balance(None), (17, 3))
+        self.assertEqual(circ.balance(), (6, 6))
+        self.assertRaises(Exception, circ.balance, 1)
+
+    def test_balance_keeps_wide_gates(self):
+        circ = BoolCirc(parse_parenthesis("(x0)&(x1)&(x2)&(x3)"))
+        self.assertEqual(circ.balance(), (2, 2))
+
+    def test_balance_random(self):
+        random.seed(2)
+        for i in range(50):
+            builder = CircBuilder()
+            signals = [builder.input() for k in range(6)]
+            for k in range(40):
+                label = random.choice(["&", "|", "^", "~"])
+                operands = [random.choice(signals[-8:]) for m in range(random.randint(2, 3))]
+                signals.append(builder.not_(operands[0]) if label == "~" else builder.gate(label, *operands))
+            builder.output(signals[-1])
+            circ = builder.build(BoolCirc)
+            circ.optimize()
+            reference = circ.copy
+            for arity in [2, 3, None]:
+                balanced = reference.copy
+                before, after = balanced.balance(arity)
+                self.assertEqual(before, reference.depth)
+                self.assertLessEqual(after, before)
+                self.assertEqual(balanced.validate(), [])
+                self.assertTrue(balanced.equivalent(reference))
+                self.assertEqual(balanced.truth_table(), reference.truth_table())
+
+
+if __name__ == "__main__":  # the following code is called only when
+    unittest.main()  # precisely this file is run